@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Verificação do tempo de início do main.py (orçamento de inicialização)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Para cada cenário, mede o melhor tempo de `python main.py ...` descontado o
+início do próprio interpretador e confere, com `-X importtime`, que as
+dependências pesadas não foram carregadas. Termina com código 1 se algum
+cenário passar do orçamento ou importar um módulo proibido.
+
+O orçamento (ORCAMENTO_MS) é o mesmo no `make test`, no CI e no teste
+tests/test_inicio.py.
+
+Uso:
+    python benchmarks/bench_inicio.py
+    python benchmarks/bench_inicio.py --repeticoes 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(RAIZ, 'main.py')
+
+# Dependências que só os caminhos de rede, web scraping, base local e Excel/Parquet usam
+PESADOS = ['requests', 'urllib3', 'lxml', 'bs4', 'pandas', 'numpy', 'openpyxl', 'pyarrow', 'sqlite3']
+
+# Tempo máximo além do início do interpretador, em ms (com folga para máquinas de CI)
+ORCAMENTO_MS = 80
+
+
+def cenarios(diretorio: str) -> list:
+    """(nome, argumentos do main.py)"""
+    return [
+        ('--help', ['--help']),
+        ('--exemplo', ['--exemplo']),
+        ('--exemplo --csv --json --ndjson', ['--exemplo',
+                                             '--csv', os.path.join(diretorio, 'inicio.csv'),
+                                             '--json', os.path.join(diretorio, 'inicio.json'),
+                                             '--ndjson', os.path.join(diretorio, 'inicio.ndjson')]),
+    ]
+
+
+def melhor_tempo(comando: list, repeticoes: int) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def modulos_importados(argumentos: list) -> set:
+    """Módulos de topo importados pelo main.py (saída do -X importtime)"""
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', MAIN] + argumentos, cwd=RAIZ,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modulos = set()
+    for linha in resultado.stderr.splitlines():
+        if linha.startswith('import time:') and '|' in linha:
+            nome = linha.rsplit('|', 1)[1].strip()
+            modulos.add(nome.split('.', 1)[0])
+    return modulos
+
+
+def medir(diretorio: str, repeticoes: int):
+    """Gera (nome, segundos, ms além do interpretador, dependências pesadas importadas) por cenário"""
+    base = melhor_tempo([sys.executable, '-c', 'pass'], repeticoes)
+    for nome, argumentos in cenarios(diretorio):
+        segundos = melhor_tempo([sys.executable, MAIN] + argumentos, repeticoes)
+        pesados = sorted(modulos_importados(argumentos) & set(PESADOS))
+        yield nome, segundos, (segundos - base) * 1000, pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificar o orçamento de inicialização do main.py')
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_MS,
+                        help='Tempo máximo além do início do interpretador, em ms')
+    parser.add_argument('--repeticoes', type=int, default=10, help='Execuções por cenário (vale a melhor)')
+    args = parser.parse_args()
+
+    print(f"Orçamento: {args.orcamento_ms:.0f} ms além do início do interpretador\n")
+
+    falhas = 0
+    with tempfile.TemporaryDirectory(prefix='inicio_pncp_') as diretorio:
+        for nome, segundos, extra_ms, pesados in medir(diretorio, args.repeticoes):
+            situacao = '✓'
+            if extra_ms > args.orcamento_ms:
+                situacao = '✗ acima do orçamento'
+                falhas += 1
+            if pesados:
+                situacao = f"✗ importou {', '.join(pesados)}"
+                falhas += 1
+            print(f"  {nome:<34} {segundos * 1000:7.1f} ms  (+{extra_ms:5.1f} ms)  {situacao}")
+
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
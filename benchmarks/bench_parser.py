@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos analisadores de HTML do web scraper sobre páginas de resultado salvas
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Uso:
+    python benchmarks/bench_parser.py                      # páginas em benchmarks/fixtures
+    python benchmarks/bench_parser.py pagina1.html ...     # páginas salvas do portal
+    python benchmarks/bench_parser.py --gerar 2000         # regrava as páginas de exemplo
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from pncp_html import AnalisadorBS4, AnalisadorLXML  # noqa: E402
+
+FIXTURES = os.path.join(RAIZ, 'benchmarks', 'fixtures')
+
+_ORGAOS = ['MUNICIPIO DE MANDIRITUBA', 'CAMARA MUNICIPAL DE CURITIBA', 'ESTADO DO PARANA',
+           'UNIVERSIDADE FEDERAL DO PARANA', 'MUNICIPIO DE LONDRINA']
+_MODALIDADES = ['Pregão - Eletrônico', 'Credenciamento', 'Concorrência', 'Dispensa']
+
+
+def gerar_pagina(resultados: int, tabela: bool = False, semente: int = 42) -> str:
+    """Página de pesquisa sintética, com cabeçalho, menus e scripts ao redor dos resultados"""
+    rnd = random.Random(semente)
+    partes = ['<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>PNCP - Pesquisa</title>',
+              '<script>window.__config = {"api": "/api", "versao": "1.0"};</script>',
+              '<style>.resultado-item{margin:4px}</style></head><body>',
+              '<header><nav><ul>' + ''.join(f'<li class="menu"><a href="/m{i}">Menu {i}</a></li>' for i in range(30))
+              + '</ul></nav></header><main>',
+              '<aside>' + ''.join(f'<p>Filtro {i}: <span>opção</span></p>' for i in range(50)) + '</aside>']
+    if tabela:
+        partes.append('<div id="resultados"><table><thead><tr><th>Objeto</th><th>Órgão</th><th>Data</th></tr></thead><tbody>')
+    else:
+        partes.append('<div id="resultados">')
+    for i in range(resultados):
+        orgao = rnd.choice(_ORGAOS)
+        data = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2025"
+        url = f"/app/editais/{rnd.randint(10**13, 10**14 - 1)}/2025/{i + 1}"
+        titulo = f"Licitacao nº {i + 1}/2025 - {rnd.choice(_MODALIDADES)}"
+        if tabela:
+            partes.append(f'<tr><td><a href="{url}">{titulo}</a></td><td>{orgao}</td><td>{data}</td></tr>')
+        else:
+            partes.append(
+                f'<div class="card"><div class="resultado-item licitacao">'
+                f'<a href="{url}"><strong>{titulo}</strong></a>'
+                f'<p class="descricao">Aquisição de materiais &amp; serviços, conforme edital.</p>'
+                f'</div><span class="orgao">{orgao}</span> <span class="data">{data}</span>'
+                f'<!-- item {i} --></div>'
+            )
+    partes.append('</tbody></table></div>' if tabela else '</div>')
+    partes.append('</main><footer>' + ''.join(f'<a href="/f{i}">Link {i}</a>' for i in range(40))
+                  + '</footer></body></html>')
+    return '\n'.join(partes)
+
+
+def medir(analisador, conteudo: bytes, repeticoes: int):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        registros = analisador.extrair(conteudo)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, registros
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos analisadores de HTML do web scraper')
+    parser.add_argument('paginas', nargs='*', help='Páginas de resultado salvas (padrão: benchmarks/fixtures/*.html)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por página (vale a melhor)')
+    parser.add_argument('--regiao', help='id do contêiner dos resultados (parse só dessa região)')
+    parser.add_argument('--gerar', type=int, metavar='N', help='Regravar as páginas de exemplo com N resultados')
+    args = parser.parse_args()
+
+    if args.gerar:
+        for nome, tabela in [('pesquisa_resultados.html', False), ('pesquisa_tabela.html', True)]:
+            caminho = os.path.join(FIXTURES, nome)
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(gerar_pagina(args.gerar, tabela))
+            print(f"Página gravada em: {caminho}")
+        return
+
+    paginas = args.paginas or sorted(glob.glob(os.path.join(FIXTURES, 'pesquisa_*.html')))
+    if not paginas:
+        print("Nenhuma página encontrada; use --gerar N para criar as páginas de exemplo")
+        sys.exit(1)
+
+    analisadores = [AnalisadorBS4(args.regiao)]
+    try:
+        analisadores.append(AnalisadorLXML(args.regiao))
+    except ImportError:
+        print("⚠ lxml não instalado: medindo apenas o html.parser")
+
+    divergencias = 0
+    for pagina in paginas:
+        with open(pagina, 'rb') as f:
+            conteudo = f.read()
+        print(f"\n{os.path.basename(pagina)} ({len(conteudo) / 1024:.0f} KB)")
+        referencia = None
+        for analisador in analisadores:
+            segundos, registros = medir(analisador, conteudo, args.repeticoes)
+            if referencia is None:
+                referencia = (segundos, registros)
+                ganho = ''
+            else:
+                ganho = f"  {referencia[0] / segundos:5.1f}x"
+                if registros != referencia[1]:
+                    divergencias += 1
+                    ganho += "  ✗ registros diferentes do html.parser"
+            print(f"  {analisador.nome:<12} {segundos * 1000:9.1f} ms  {len(registros):6d} registros{ganho}")
+
+    if divergencias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
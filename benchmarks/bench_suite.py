@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks offline dos caminhos críticos: paginação da API, parse das
+páginas de pesquisa, formatação, exportadores e alertas
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Tudo roda sobre fixtures gravadas em benchmarks/fixtures (página da API em
+JSON e páginas de pesquisa em HTML), sem acesso à rede. Cada execução é
+gravada em benchmarks/resultados/ e comparada com a anterior (ou com
+--comparar), apontando as regressões.
+
+Uso:
+    python benchmarks/bench_suite.py                          # 1k e 100k registros
+    python benchmarks/bench_suite.py --tamanhos 1k,100k,1M
+    python benchmarks/bench_suite.py --apenas exportar,formatar
+    python benchmarks/bench_suite.py --gravar-fixtures        # regrava api_pagina.json
+"""
+
+import argparse
+import copy
+import glob
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from pncp_alertas import MotorAlertas, PerfilAlerta  # noqa: E402
+from pncp_busca import normalizar_texto  # noqa: E402
+from pncp_exportacao import (EscritorCSV, EscritorExcel, EscritorJSON,  # noqa: E402
+                             EscritorNDJSON, EscritorParquet)
+from pncp_html import AnalisadorBS4, AnalisadorLXML  # noqa: E402
+from pncp_http import SessaoPNCP  # noqa: E402
+from pncp_licitacoes import LicitacaoProcessor, PNCPClient  # noqa: E402
+from pncp_web_scraper import PNCPWebScraper  # noqa: E402
+
+FIXTURES = os.path.join(RAIZ, 'benchmarks', 'fixtures')
+RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+PAGINA_API = os.path.join(FIXTURES, 'api_pagina.json')
+
+GRUPOS = ['paginacao', 'parse', 'formatar', 'exportar', 'alertas']
+PERFIS_ALERTA = 5000
+
+
+def _tamanho(texto: str) -> int:
+    """'1k' -> 1000, '100k' -> 100000, '1M' -> 1000000"""
+    multiplicadores = {'k': 1000, 'm': 1000000}
+    texto = texto.strip()
+    if texto[-1:].lower() in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1].lower()])
+    return int(texto)
+
+
+def _rotulo(n: int) -> str:
+    if n >= 1000000 and n % 1000000 == 0:
+        return f"{n // 1000000}M"
+    if n >= 1000 and n % 1000 == 0:
+        return f"{n // 1000}k"
+    return str(n)
+
+
+def gravar_fixture_api(itens: int = 50):
+    """Página da API no formato de buscar_licitacoes, derivada dos dados de exemplo"""
+    exemplo = PNCPWebScraper(SessaoPNCP(cache=False)).buscar_licitacoes_dados_exemplo()
+    registros = []
+    for i in range(itens):
+        registro = copy.deepcopy(exemplo[i % len(exemplo)])
+        registro['id'] = f"{i:032x}"
+        registro['numero_sequencial'] = str(i + 1)
+        registro['numero_controle_pncp'] = f"{registro['orgao_cnpj']}-1-{i + 1:06d}/{registro['ano']}"
+        registro['valor_global'] = round(1000 + i * 1234.56, 2) if i % 3 else None
+        registros.append(registro)
+    with open(PAGINA_API, 'w', encoding='utf-8') as f:
+        json.dump({"items": registros, "total": itens}, f, ensure_ascii=False, indent=2)
+    print(f"Fixture gravada em: {PAGINA_API}")
+
+
+def _pagina_api() -> Dict:
+    with open(PAGINA_API, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def registros(n: int) -> Iterator[Dict]:
+    """n registros distintos a partir da fixture da API, gerados sob demanda"""
+    base = _pagina_api()['items']
+    for i in range(n):
+        registro = dict(base[i % len(base)])
+        registro['id'] = f"{i:032x}"
+        registro['numero_controle_pncp'] = f"{registro['orgao_cnpj']}-1-{i + 1:06d}/{registro['ano']}"
+        yield registro
+
+
+class AdaptadorGravado(HTTPAdapter):
+    """Responde a toda requisição com o mesmo corpo gravado, sem rede"""
+
+    def __init__(self, corpo: bytes):
+        super().__init__()
+        self.corpo = corpo
+        self.requisicoes = 0
+
+    def send(self, request, **kwargs):
+        self.requisicoes += 1
+        resposta = requests.Response()
+        resposta.status_code = 200
+        resposta._content = self.corpo
+        resposta.headers['Content-Type'] = 'application/json; charset=utf-8'
+        resposta.encoding = 'utf-8'
+        resposta.url = request.url
+        resposta.request = request
+        return resposta
+
+
+def _cronometrar(funcao: Callable[[], int], repeticoes: int) -> Dict:
+    """Melhor tempo entre as repetições; funcao() retorna os registros processados"""
+    melhor = float('inf')
+    processados = 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processados = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return {
+        'segundos': round(melhor, 6),
+        'registros': processados,
+        'registros_por_segundo': round(processados / melhor, 1) if melhor else None,
+    }
+
+
+def bench_paginacao(n: int) -> Callable[[], int]:
+    """PNCPClient.iterar_licitacoes sobre a página gravada (sessão, retentativas e prefetch incluídos)"""
+    pagina = _pagina_api()
+    por_pagina = len(pagina['items'])
+    pagina['total'] = n
+    corpo = json.dumps(pagina, ensure_ascii=False).encode('utf-8')
+    paginas = -(-n // por_pagina)
+
+    def executar():
+        sessao = SessaoPNCP(cache=False)
+        adaptador = AdaptadorGravado(corpo)
+        sessao.mount('https://', adaptador)
+        cliente = PNCPClient(sessao)
+        total = sum(1 for _ in cliente.iterar_licitacoes(tamanho_pagina=por_pagina, max_paginas=paginas))
+        return total
+
+    return executar
+
+
+def bench_parse(analisador, conteudo: bytes, n: int) -> Callable[[], int]:
+    """Parse repetido de uma página de pesquisa até somar n registros"""
+    def executar():
+        total = 0
+        while total < n:
+            total += len(analisador.extrair(conteudo))
+        return total
+    return executar
+
+
+def bench_formatar(n: int, lote: bool) -> Callable[[], int]:
+    """extrair_informacoes_principais registro a registro ou extrair_informacoes_lote em blocos de 1000"""
+    bloco = list(registros(min(n, 1000)))
+    blocos = [bloco] * (n // len(bloco))
+    if n % len(bloco):
+        blocos.append(bloco[:n % len(bloco)])
+
+    def por_registro():
+        extrair = LicitacaoProcessor.extrair_informacoes_principais
+        return sum(1 for dados in blocos for lic in dados if extrair(lic))
+
+    def em_lote():
+        return sum(len(LicitacaoProcessor.extrair_informacoes_lote(dados)) for dados in blocos)
+
+    return em_lote if lote else por_registro
+
+
+def bench_exportar(fabrica: Callable[[str], object], extensao: str, formatado: bool,
+                   n: int, diretorio: str) -> Callable[[], int]:
+    """Escritor alimentado por um fluxo (formatado em lotes quando o formato exige)"""
+    def executar():
+        caminho = os.path.join(diretorio, f"bench{extensao}")
+        fluxo = registros(n)
+        with fabrica(caminho) as escritor:
+            if formatado:
+                for _, info in LicitacaoProcessor.formatar_fluxo(fluxo):
+                    escritor.escrever(info)
+            else:
+                for licitacao in fluxo:
+                    escritor.escrever(licitacao)
+        os.remove(caminho)
+        return escritor.total
+    return executar
+
+
+def bench_alertas(n: int, quantidade: int = PERFIS_ALERTA) -> Callable[[], int]:
+    """MotorAlertas com `quantidade` perfis sintéticos (palavras das próprias fixtures, UFs e faixas de valor)"""
+    import random
+
+    sorteio = random.Random(1)
+    presentes = sorted({palavra for licitacao in registros(1000)
+                        for palavra in normalizar_texto(f"{licitacao.get('title')} {licitacao.get('description')}").split()
+                        if len(palavra) > 3})
+    # As fixtures têm poucas palavras distintas; termos ausentes delas fazem o papel
+    # do vocabulário de uma base real, em que cada licitação atende a poucos perfis
+    vocabulario = presentes + [f"termo{i}" for i in range(100 * len(presentes))]
+    ufs = ['PR', 'SP', 'SC', 'RS', 'MG', 'RJ', 'BA']
+    perfis = [PerfilAlerta(f"perfil {i}",
+                           palavras=sorteio.sample(vocabulario, min(len(vocabulario), sorteio.randint(1, 4))),
+                           ufs=sorteio.sample(ufs, sorteio.randint(0, 2)),
+                           valor_min=sorteio.choice([None, 10000, 100000]))
+              for i in range(quantidade)]
+    motor = MotorAlertas(perfis)
+
+    def executar():
+        for _ in motor.filtrar(registros(n)):
+            pass
+        return n
+    return executar
+
+
+def montar_casos(grupos: List[str], tamanhos: List[int], diretorio: str) -> List[tuple]:
+    """Lista de (nome, função) a medir"""
+    casos = []
+    colunas = LicitacaoProcessor.colunas()
+    paginas_html = sorted(glob.glob(os.path.join(FIXTURES, 'pesquisa_*.html')))
+
+    analisadores = [AnalisadorBS4()]
+    try:
+        analisadores.append(AnalisadorLXML())
+    except ImportError:
+        print("⚠ lxml não instalado: parse medido apenas com html.parser")
+
+    exportadores = [
+        ('csv', lambda c: EscritorCSV(c, colunas), '.csv', True),
+        ('excel', lambda c: EscritorExcel(c, colunas), '.xlsx', True),
+        ('json', EscritorJSON, '.json', False),
+        ('ndjson', EscritorNDJSON, '.ndjson', False),
+    ]
+    if importlib.util.find_spec('pyarrow') is not None:
+        exportadores.append(('parquet', EscritorParquet, '.parquet', False))
+    else:
+        print("⚠ pyarrow não instalado: exportação Parquet não medida")
+
+    for n in tamanhos:
+        rotulo = _rotulo(n)
+        if 'paginacao' in grupos:
+            casos.append((f"paginacao/api/{rotulo}", bench_paginacao(n)))
+        if 'parse' in grupos:
+            for pagina in paginas_html:
+                with open(pagina, 'rb') as f:
+                    conteudo = f.read()
+                nome_pagina = os.path.splitext(os.path.basename(pagina))[0]
+                for analisador in analisadores:
+                    casos.append((f"parse/{nome_pagina}/{analisador.nome}/{rotulo}",
+                                  bench_parse(analisador, conteudo, n)))
+        if 'formatar' in grupos:
+            casos.append((f"formatar/por_registro/{rotulo}", bench_formatar(n, lote=False)))
+            casos.append((f"formatar/lote/{rotulo}", bench_formatar(n, lote=True)))
+        if 'exportar' in grupos:
+            for nome, fabrica, extensao, formatado in exportadores:
+                casos.append((f"exportar/{nome}/{rotulo}",
+                              bench_exportar(fabrica, extensao, formatado, n, diretorio)))
+        if 'alertas' in grupos:
+            casos.append((f"alertas/{PERFIS_ALERTA}_perfis/{rotulo}", bench_alertas(n)))
+    return casos
+
+
+def _versao() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ultimo_resultado() -> Optional[str]:
+    arquivos = sorted(glob.glob(os.path.join(RESULTADOS, '*.json')))
+    return arquivos[-1] if arquivos else None
+
+
+def comparar(atual: Dict, anterior: Dict, limite: float) -> List[str]:
+    """Casos que ficaram mais lentos que o limite (fração) em relação à execução anterior"""
+    regressoes = []
+    for nome, medida in atual['casos'].items():
+        referencia = anterior['casos'].get(nome)
+        if not referencia or not referencia['segundos']:
+            continue
+        variacao = medida['segundos'] / referencia['segundos'] - 1
+        marca = ''
+        if variacao > limite:
+            marca = '  ✗ regressão'
+            regressoes.append(nome)
+        print(f"  {nome:<48} {referencia['segundos']:10.4f}s -> {medida['segundos']:10.4f}s  "
+              f"{variacao * 100:+7.1f}%{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks offline do listador PNCP')
+    parser.add_argument('--tamanhos', default='1k,100k',
+                        help='Quantidades de registros, separadas por vírgula (ex: 1k,100k,1M)')
+    parser.add_argument('--apenas', help=f"Grupos a medir: {', '.join(GRUPOS)} (padrão: todos)")
+    parser.add_argument('--repeticoes', type=int, default=3, help='Execuções por caso (vale a melhor)')
+    parser.add_argument('--saida', help='Arquivo do resultado (padrão: benchmarks/resultados/<data>_<versão>.json)')
+    parser.add_argument('--comparar', help='Resultado anterior para comparação (padrão: o mais recente)')
+    parser.add_argument('--limite', type=float, default=0.2,
+                        help='Aumento de tempo tolerado antes de apontar regressão (0.2 = 20%%)')
+    parser.add_argument('--gravar-fixtures', action='store_true', help='Regravar a página da API em fixtures')
+    args = parser.parse_args()
+
+    if args.gravar_fixtures:
+        gravar_fixture_api()
+        return
+
+    grupos = args.apenas.split(',') if args.apenas else GRUPOS
+    desconhecidos = set(grupos) - set(GRUPOS)
+    if desconhecidos:
+        parser.error(f"grupos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    tamanhos = [_tamanho(t) for t in args.tamanhos.split(',')]
+    referencia = args.comparar or _ultimo_resultado()
+
+    versao = _versao()
+    resultado = {
+        'versao': versao,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'casos': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='bench_pncp_') as diretorio:
+        for nome, funcao in montar_casos(grupos, tamanhos, diretorio):
+            # Casos grandes uma única vez: a variação entre execuções já é pequena
+            repeticoes = args.repeticoes if _tamanho(nome.rsplit('/', 1)[1]) < 1000000 else 1
+            medida = _cronometrar(funcao, repeticoes)
+            resultado['casos'][nome] = medida
+            print(f"  {nome:<48} {medida['segundos']:10.4f}s  {medida['registros_por_segundo'] or 0:14,.0f} reg/s")
+
+    os.makedirs(RESULTADOS, exist_ok=True)
+    saida = args.saida or os.path.join(
+        RESULTADOS, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{versao or 'sem-versao'}.json")
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado gravado em: {saida}")
+
+    if referencia and os.path.exists(referencia):
+        with open(referencia, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        print(f"\nComparação com {os.path.basename(referencia)} ({anterior.get('versao')}):")
+        regressoes = comparar(resultado, anterior, args.limite)
+        if regressoes:
+            print(f"\n✗ {len(regressoes)} caso(s) mais lentos que o limite de {args.limite:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Teste de carga de ponta a ponta: roda o main.py contra o servidor local do PNCP
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Sobe benchmarks/servidor_pncp.py com o conjunto sintético e as falhas pedidas,
+executa o main.py apontado para ele (PNCP_API_URL/PNCP_WEB_URL) e informa
+registros por segundo, pico de memória (RSS) do main.py e latência de cauda
+das respostas do servidor.
+
+Uso:
+    python benchmarks/carga.py --registros 100000
+    python benchmarks/carga.py --latencia-ms 80 --jitter-ms 40 --taxa-429 0.02 --taxa-erro 0.01
+    python benchmarks/carga.py --metodo web --itens-pesquisa 500
+    python benchmarks/carga.py --metodo auto --latencia-api-ms 3000 -- --atraso-web 1
+    python benchmarks/carga.py --registros 5000 --novos-por-requisicao 1   # páginas deslocadas
+    python benchmarks/carga.py -- --uf PR,SP --workers 8         # argumentos extras do main.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVIDOR = os.path.join(RAIZ, 'benchmarks', 'servidor_pncp.py')
+MAIN = os.path.join(RAIZ, 'main.py')
+
+
+def iniciar_servidor(args) -> tuple:
+    """Sobe o servidor em uma porta livre e retorna (processo, url base)"""
+    comando = [sys.executable, SERVIDOR, '--porta', '0',
+               '--registros', str(args.registros),
+               '--latencia-ms', str(args.latencia_ms),
+               '--jitter-ms', str(args.jitter_ms),
+               '--latencia-api-ms', str(args.latencia_api_ms),
+               '--taxa-erro', str(args.taxa_erro),
+               '--taxa-429', str(args.taxa_429),
+               '--retry-after', str(args.retry_after),
+               '--itens-pesquisa', str(args.itens_pesquisa),
+               '--novos-por-requisicao', str(args.novos_por_requisicao),
+               '--semente', '1']
+    processo = subprocess.Popen(comando, stdout=subprocess.PIPE, text=True)
+    linha = processo.stdout.readline().strip()
+    if not linha.startswith('Servidor'):
+        processo.kill()
+        raise RuntimeError(f"Servidor local não iniciou: {linha!r}")
+    return processo, linha.rsplit(' ', 1)[1]
+
+
+def executar_main(url: str, argumentos: list) -> dict:
+    """Executa o main.py e mede tempo total e pico de RSS (KB)"""
+    ambiente = dict(os.environ, PNCP_API_URL=f"{url}/api", PNCP_WEB_URL=url)
+    inicio = time.perf_counter()
+    processo = subprocess.Popen([sys.executable, MAIN] + argumentos, cwd=RAIZ, env=ambiente,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if hasattr(os, 'wait4'):
+        _, status, uso = os.wait4(processo.pid, 0)
+        segundos = time.perf_counter() - inicio
+        codigo = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status >> 8
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        rss_kb = uso.ru_maxrss // 1024 if sys.platform == 'darwin' else uso.ru_maxrss
+        processo.returncode = codigo
+    else:
+        codigo = processo.wait()
+        segundos = time.perf_counter() - inicio
+        rss_kb = None
+    erros = processo.stderr.read().decode('utf-8', 'replace')
+    processo.stderr.close()
+    return {'segundos': segundos, 'codigo_saida': codigo, 'rss_pico_kb': rss_kb, 'stderr': erros}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga do main.py contra o servidor local do PNCP')
+    parser.add_argument('--registros', type=int, default=100000, help='Tamanho do conjunto sintético')
+    parser.add_argument('--latencia-ms', type=float, default=0, help='Latência injetada por resposta')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Variação aleatória da latência (±)')
+    parser.add_argument('--latencia-api-ms', type=float, default=0, help='Latência extra só na API')
+    parser.add_argument('--taxa-erro', type=float, default=0, help='Fração de respostas 503')
+    parser.add_argument('--taxa-429', type=float, default=0, help='Fração de respostas 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After das respostas 429 (segundos)')
+    parser.add_argument('--itens-pesquisa', type=int, default=100, help='Resultados na página /pesquisa')
+    parser.add_argument('--novos-por-requisicao', type=int, default=0,
+                        help='Publicações novas (por UF) a cada página da API, deslocando as seguintes')
+    parser.add_argument('--metodo', choices=['api', 'web', 'auto'], default='api', help='Método usado pelo main.py')
+    parser.add_argument('--tamanho', type=int, default=100, help='Itens por página pedidos pelo main.py')
+    parser.add_argument('--saida', help='Gravar o relatório em JSON')
+    parser.add_argument('extras', nargs=argparse.REMAINDER, help='Argumentos extras do main.py (após --)')
+    args = parser.parse_args()
+
+    extras = args.extras[1:] if args.extras[:1] == ['--'] else args.extras
+    servidor, url = iniciar_servidor(args)
+    try:
+        with tempfile.TemporaryDirectory(prefix='carga_pncp_') as diretorio:
+            arquivo = os.path.join(diretorio, 'licitacoes.ndjson')
+            argumentos = ['--metodo', args.metodo, '--tamanho', str(args.tamanho), '--sem-cache',
+                          '--ndjson', arquivo]
+            if args.metodo != 'web':
+                argumentos.append('--todas-paginas')
+            argumentos += extras
+
+            print(f"Servidor: {url} ({args.registros} registros)")
+            print(f"Executando: main.py {' '.join(argumentos)}")
+            execucao = executar_main(url, argumentos)
+
+            registros = 0
+            if os.path.exists(arquivo):
+                with open(arquivo, 'rb') as f:
+                    registros = sum(1 for _ in f)
+
+        with urllib.request.urlopen(f"{url}/__estatisticas") as resposta:
+            estatisticas = json.load(resposta)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    relatorio = {
+        'cenario': {k: v for k, v in vars(args).items() if k not in ('saida', 'extras')},
+        'argumentos_main': argumentos,
+        'codigo_saida': execucao['codigo_saida'],
+        'segundos': round(execucao['segundos'], 3),
+        'registros': registros,
+        'registros_por_segundo': round(registros / execucao['segundos'], 1) if execucao['segundos'] else None,
+        'rss_pico_mb': round(execucao['rss_pico_kb'] / 1024, 1) if execucao['rss_pico_kb'] else None,
+        'servidor': estatisticas,
+    }
+
+    latencia = estatisticas['latencia_ms']
+    print("\n=== RESULTADO DA CARGA ===")
+    print(f"Código de saída: {relatorio['codigo_saida']}")
+    print(f"Registros: {registros} em {relatorio['segundos']:.2f}s ({relatorio['registros_por_segundo'] or 0:,.0f} reg/s)")
+    print(f"Pico de memória (RSS): {relatorio['rss_pico_mb']} MB")
+    print(f"Requisições: {estatisticas['requisicoes']} {estatisticas['status']}, "
+          f"{estatisticas['bytes_enviados'] / 1024 / 1024:.1f} MB")
+    print(f"Latência do servidor (ms): p50={latencia['p50']} p95={latencia['p95']} "
+          f"p99={latencia['p99']} max={latencia['max']}")
+    if execucao['codigo_saida'] and execucao['stderr'].strip():
+        print(f"\nstderr do main.py:\n{execucao['stderr'].strip()[-2000:]}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório salvo em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
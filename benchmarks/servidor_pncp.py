@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o PNCP para testes de carga
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Serve, a partir de um conjunto sintético de licitações:
+    /api/catalog/items              páginas JSON (page, size, uf)
+    /pesquisa                       página HTML de resultados
+    /compras/{cnpj}/{ano}/{seq}     página de detalhe
+    /__estatisticas                 latências e contagem de respostas (JSON)
+
+Latência, erros 5xx e respostas 429 (com Retry-After) podem ser injetados.
+Para apontar o listador para ele:
+    PNCP_API_URL=http://127.0.0.1:8400/api PNCP_WEB_URL=http://127.0.0.1:8400 python main.py ...
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+UFS = ['AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+       'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO']
+MODALIDADES = [('6', 'Pregão - Eletrônico'), ('12', 'Credenciamento'), ('4', 'Concorrência - Eletrônica'),
+               ('8', 'Dispensa'), ('9', 'Inexigibilidade')]
+SITUACOES = [('1', 'Divulgada no PNCP'), ('2', 'Revogada'), ('3', 'Anulada'), ('4', 'Suspensa')]
+ESFERAS = [('M', 'Municipal'), ('E', 'Estadual'), ('F', 'Federal')]
+OBJETOS = ['Aquisição de material de expediente', 'Contratação de serviços de limpeza',
+           'Registro de preços para medicamentos', 'Credenciamento de clínicas médicas',
+           'Aquisição de gêneros alimentícios para merenda escolar', 'Locação de veículos',
+           'Execução de obra de pavimentação asfáltica', 'Aquisição de equipamentos de informática']
+INICIO = datetime(2025, 10, 17, 12, 0, 0)
+
+
+class ConjuntoSintetico:
+    """
+    Licitações sintéticas determinísticas, geradas sob demanda pelo índice
+
+    O registro i é sempre o mesmo; a publicação decresce com i (como na
+    ordenação padrão da API) e a UF é UFS[i % 27], o que permite paginar
+    com filtro de UF sem varrer o conjunto. publicar() acrescenta registros
+    mais novos (índices negativos) no topo, deslocando as páginas como as
+    publicações que chegam durante uma varredura.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.novos = 0  # sempre múltiplo de len(UFS), para manter i % 27 por UF
+
+    def publicar(self, por_uf: int):
+        self.novos += por_uf * len(UFS)
+
+    def total_uf(self, uf: Optional[str]) -> int:
+        if not uf:
+            return self.total + self.novos
+        j = UFS.index(uf)
+        return max(0, (self.total - j + len(UFS) - 1) // len(UFS)) + self.novos // len(UFS)
+
+    def indice(self, posicao: int, uf: Optional[str]) -> int:
+        base = posicao if not uf else UFS.index(uf) + posicao * len(UFS)
+        return base - self.novos
+
+    def registro(self, i: int) -> Dict:
+        rnd = random.Random(i)
+        cnpj = f"{76105550000000 + i % 5000:014d}"
+        ano = 2025
+        sequencial = i // 5000 + 1
+        modalidade = MODALIDADES[rnd.randrange(len(MODALIDADES))]
+        situacao = SITUACOES[0] if rnd.random() < 0.9 else SITUACOES[rnd.randrange(1, len(SITUACOES))]
+        esfera = ESFERAS[rnd.randrange(len(ESFERAS))]
+        publicacao = INICIO - timedelta(seconds=i * 37)
+        atualizacao = publicacao + timedelta(seconds=rnd.randrange(86400))
+        uf = UFS[i % len(UFS)]
+        return {
+            "id": f"{i:032x}",
+            "index": "catalog2",
+            "doc_type": "_doc",
+            "title": f"Edital nº {sequencial}/{ano}",
+            "description": OBJETOS[rnd.randrange(len(OBJETOS))],
+            "item_url": f"/compras/{cnpj}/{ano}/{sequencial}",
+            "document_type": "edital",
+            "createdAt": atualizacao.isoformat(timespec='microseconds'),
+            "numero": None,
+            "ano": str(ano),
+            "numero_sequencial": str(sequencial),
+            "numero_sequencial_compra_ata": None,
+            "numero_controle_pncp": f"{cnpj}-1-{sequencial:06d}/{ano}",
+            "orgao_id": str(10000 + i % 5000),
+            "orgao_cnpj": cnpj,
+            "orgao_nome": f"MUNICIPIO SINTETICO {i % 5000}",
+            "orgao_subrogado_id": None,
+            "orgao_subrogado_nome": None,
+            "unidade_id": str(50000 + i % 5000),
+            "unidade_codigo": str(400000 + i % 5000),
+            "unidade_nome": f"PREFEITURA MUNICIPAL SINTETICA {i % 5000} - {uf}",
+            "esfera_id": esfera[0],
+            "esfera_nome": esfera[1],
+            "poder_id": "E",
+            "poder_nome": "Executivo",
+            "municipio_id": str(1000 + i % 5000),
+            "municipio_nome": f"Município {i % 5000}",
+            "uf": uf,
+            "modalidade_licitacao_id": modalidade[0],
+            "modalidade_licitacao_nome": modalidade[1],
+            "situacao_id": situacao[0],
+            "situacao_nome": situacao[1],
+            "data_publicacao_pncp": publicacao.isoformat(timespec='microseconds'),
+            "data_atualizacao_pncp": atualizacao.isoformat(timespec='microseconds'),
+            "data_assinatura": None,
+            "data_inicio_vigencia": (publicacao + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M'),
+            "data_fim_vigencia": (publicacao + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M'),
+            "cancelado": situacao[0] != '1',
+            "valor_global": round(rnd.uniform(1000, 5000000), 2) if rnd.random() < 0.7 else None,
+            "tem_resultado": False,
+            "tipo_id": "1",
+            "tipo_nome": "Edital",
+            "tipo_contrato_id": None,
+            "tipo_contrato_nome": None,
+            "fonte_orcamentaria": None,
+            "fonte_orcamentaria_id": None,
+            "fonte_orcamentaria_nome": None,
+            "exigencia_conteudo_nacional": False,
+            "tipo_margem_preferencia": None,
+            "tipo_margem_preferencia_id": None,
+            "tipo_margem_preferencia_nome": None
+        }
+
+    def pagina(self, pagina: int, tamanho: int, uf: Optional[str] = None) -> Dict:
+        total = self.total_uf(uf)
+        inicio = (max(1, pagina) - 1) * tamanho
+        fim = min(total, inicio + tamanho)
+        return {
+            "items": [self.registro(self.indice(p, uf)) for p in range(inicio, fim)],
+            "total": total
+        }
+
+    def localizar(self, cnpj: str, sequencial: int) -> Optional[Dict]:
+        i = (sequencial - 1) * 5000 + int(cnpj) - 76105550000000
+        return self.registro(i) if -self.novos <= i < self.total else None
+
+
+def pagina_pesquisa(registros: List[Dict]) -> str:
+    partes = ['<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>PNCP</title></head>'
+              '<body><main><div id="resultados">']
+    for r in registros:
+        partes.append(
+            f'<div class="card"><div class="resultado-item">'
+            f'<a href="{r["item_url"]}">Licitacao {html.escape(r["title"])}</a></div>'
+            f'<span>{html.escape(r["orgao_nome"])}</span> '
+            f'<span>{datetime.fromisoformat(r["data_publicacao_pncp"]).strftime("%d/%m/%Y")}</span></div>'
+        )
+    partes.append('</div></main></body></html>')
+    return ''.join(partes)
+
+
+def pagina_detalhe(r: Dict) -> str:
+    valor = 'Sigiloso' if r['valor_global'] is None else \
+        'R$ ' + f"{r['valor_global']:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    campos = [('Local', f"{r['municipio_nome']}/{r['uf']}"),
+              ('Modalidade da contratação', r['modalidade_licitacao_nome']),
+              ('Situação', r['situacao_nome']),
+              ('Id contratação PNCP', r['numero_controle_pncp']),
+              ('Valor Total estimado', valor)]
+    itens = ''.join(f'<dt>{rotulo}:</dt><dd>{html.escape(valor)}</dd>' for rotulo, valor in campos)
+    return (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"></head><body>'
+            f'<h1>{html.escape(r["title"])}</h1><dl>{itens}</dl></body></html>')
+
+
+class Estatisticas:
+    """Latências (ms) e contagem de respostas por status"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias: List[float] = []
+        self.status: Dict[str, int] = {}
+        self.bytes_enviados = 0
+
+    def registrar(self, status: int, segundos: float, tamanho: int):
+        with self._lock:
+            self.latencias.append(segundos * 1000)
+            self.status[str(status)] = self.status.get(str(status), 0) + 1
+            self.bytes_enviados += tamanho
+
+    def resumo(self) -> Dict:
+        with self._lock:
+            latencias = sorted(self.latencias)
+            status = dict(self.status)
+            bytes_enviados = self.bytes_enviados
+
+        def percentil(p):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))], 2)
+
+        return {
+            'requisicoes': len(latencias),
+            'status': status,
+            'bytes_enviados': bytes_enviados,
+            'latencia_ms': {'p50': percentil(50), 'p95': percentil(95), 'p99': percentil(99),
+                            'max': round(latencias[-1], 2) if latencias else None},
+        }
+
+
+def criar_servidor(porta: int, dados: ConjuntoSintetico, latencia_ms: float = 0, jitter_ms: float = 0,
+                   taxa_erro: float = 0, taxa_429: float = 0, retry_after: float = 1,
+                   itens_pesquisa: int = 100, semente: Optional[int] = None,
+                   latencia_api_ms: float = 0, novos_por_requisicao: int = 0) -> ThreadingHTTPServer:
+    estatisticas = Estatisticas()
+    sorteio = random.Random(semente)
+    lock_sorteio = threading.Lock()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Cabeçalho e corpo saem em escritas separadas; sem TCP_NODELAY o
+        # keep-alive esbarra no atraso de ACK e cada resposta leva ~40 ms
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status: int, corpo: bytes, tipo: str, cabecalhos: Optional[Dict] = None):
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(corpo)))
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            inicio = time.perf_counter()
+            partes = urlsplit(self.path)
+            consulta = {k: v[0] for k, v in parse_qs(partes.query).items()}
+
+            if partes.path == '/__estatisticas':
+                self._responder(200, json.dumps(estatisticas.resumo()).encode(), 'application/json')
+                return
+
+            with lock_sorteio:
+                atraso = max(0.0, latencia_ms + sorteio.uniform(-jitter_ms, jitter_ms)) / 1000
+                sorteado = sorteio.random()
+            if partes.path.startswith('/api/'):
+                atraso += latencia_api_ms / 1000
+            if atraso:
+                time.sleep(atraso)
+
+            if sorteado < taxa_429:
+                status, corpo, tipo = 429, b'{"erro": "muitas requisicoes"}', 'application/json'
+                cabecalhos = {'Retry-After': str(retry_after)}
+            elif sorteado < taxa_429 + taxa_erro:
+                status, corpo, tipo, cabecalhos = 503, b'{"erro": "indisponivel"}', 'application/json', None
+            else:
+                status, corpo, tipo, cabecalhos = self._conteudo(partes.path, consulta)
+                if status == 200 and partes.path.startswith('/api/'):
+                    # Validador para requisições condicionais (If-None-Match -> 304)
+                    etag = f'"{hashlib.sha1(corpo).hexdigest()[:16]}"'
+                    cabecalhos = dict(cabecalhos or {}, ETag=etag)
+                    if self.headers.get('If-None-Match') == etag:
+                        status, corpo = 304, b''
+
+            self._responder(status, corpo, tipo, cabecalhos)
+            estatisticas.registrar(status, time.perf_counter() - inicio, len(corpo))
+
+        def _conteudo(self, caminho: str, consulta: Dict):
+            if caminho == '/api/catalog/items':
+                uf = consulta.get('uf')
+                if uf and uf not in UFS:
+                    return 200, b'{"items": [], "total": 0}', 'application/json', None
+                with lock_sorteio:
+                    pagina = dados.pagina(int(consulta.get('page', 1)), int(consulta.get('size', 20)), uf)
+                    if novos_por_requisicao:
+                        dados.publicar(novos_por_requisicao)
+                return 200, json.dumps(pagina, ensure_ascii=False).encode('utf-8'), 'application/json', None
+            if caminho == '/pesquisa':
+                uf = consulta.get('uf')
+                registros = dados.pagina(1, itens_pesquisa, uf if uf in UFS else None)['items']
+                return 200, pagina_pesquisa(registros).encode('utf-8'), 'text/html; charset=utf-8', None
+            if caminho.startswith('/compras/'):
+                try:
+                    _, _, cnpj, _, sequencial = caminho.split('/')
+                    registro = dados.localizar(cnpj, int(sequencial))
+                except ValueError:
+                    registro = None
+                if registro:
+                    return 200, pagina_detalhe(registro).encode('utf-8'), 'text/html; charset=utf-8', None
+            return 404, b'Not Found', 'text/plain', None
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), Manipulador)
+    servidor.daemon_threads = True
+    servidor.estatisticas = estatisticas
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita o PNCP (testes de carga)')
+    parser.add_argument('--porta', type=int, default=8400, help='Porta HTTP (0 = qualquer livre)')
+    parser.add_argument('--registros', type=int, default=100000, help='Tamanho do conjunto sintético')
+    parser.add_argument('--latencia-ms', type=float, default=0, help='Latência injetada por resposta')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Variação aleatória da latência (±)')
+    parser.add_argument('--latencia-api-ms', type=float, default=0,
+                        help='Latência extra só na API (/api/...), para exercitar a corrida API x web')
+    parser.add_argument('--novos-por-requisicao', type=int, default=0,
+                        help='Licitações publicadas (por UF) a cada página servida pela API, deslocando as seguintes')
+    parser.add_argument('--taxa-erro', type=float, default=0, help='Fração de respostas 503 (0 a 1)')
+    parser.add_argument('--taxa-429', type=float, default=0, help='Fração de respostas 429 (0 a 1)')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After das respostas 429 (segundos)')
+    parser.add_argument('--itens-pesquisa', type=int, default=100, help='Resultados na página /pesquisa')
+    parser.add_argument('--semente', type=int, help='Semente do sorteio de latência e falhas')
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.porta, ConjuntoSintetico(args.registros), args.latencia_ms, args.jitter_ms,
+                              args.taxa_erro, args.taxa_429, args.retry_after, args.itens_pesquisa, args.semente,
+                              args.latencia_api_ms, args.novos_por_requisicao)
+    # A linha abaixo é lida pelo harness para descobrir a porta
+    print(f"Servidor PNCP local em http://127.0.0.1:{servidor.server_address[1]}", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
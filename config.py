@@ -3,9 +3,12 @@
 Arquivo de configuração para o script de licitações PNCP
 """
 
-# Configurações da API
-API_BASE_URL = "https://pncp.gov.br/api"
-API_TIMEOUT = 30
+import os
+
+# Configurações da API (as variáveis de ambiente permitem apontar para outro servidor)
+API_BASE_URL = os.environ.get('PNCP_API_URL', "https://pncp.gov.br/api")
+WEB_BASE_URL = os.environ.get('PNCP_WEB_URL', "https://pncp.gov.br")
+API_TIMEOUT = int(os.environ.get('PNCP_TIMEOUT', 30))
 
 # Headers padrão para requisições
 DEFAULT_HEADERS = {
@@ -21,11 +24,52 @@ DEFAULT_HEADERS = {
 # Configurações de paginação
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
+PREFETCH_PAGINAS = 2  # páginas lidas antecipadamente em --todas-paginas
+PAGINACAO_CONSISTENTE = True  # descartar registros repetidos quando as páginas se deslocam
+REGISTRO_COMPACTO = False  # itens como Licitacao (pncp_registro.py) em vez de dicts
+JSON_BACKEND = 'auto'  # decodificação das respostas: 'orjson', 'json' ou 'auto' (orjson se instalado)
+JSON_FLUXO = False  # decodificar os itens enquanto o corpo chega (sem cache de respostas)
+JSON_BLOCO = 65536  # bytes lidos por vez na decodificação em fluxo
+
+# Configurações de concorrência
+MAX_WORKERS = 4  # consultas simultâneas em buscas com múltiplos filtros
+MAX_CONEXOES_POR_HOST = 4  # requisições simultâneas por host
+
+# Sincronização incremental (marcas d'água por consulta)
+SYNC_ESTADO_ARQUIVO = '.pncp_sync.json'
+
+# Carga histórica (pncp_backfill.py): fatias UF x mês x modalidade em processos paralelos
+BACKFILL_PROCESSOS = 4
+BACKFILL_CHECKPOINT = '.pncp_backfill.json'
+BACKFILL_CHECKPOINT_SEGUNDOS = 2  # intervalo mínimo entre gravações do checkpoint
+BACKFILL_RELATORIO_SEGUNDOS = 10  # intervalo entre as linhas de progresso geral
+BACKFILL_SQLITE_TIMEOUT = 120  # segundos que um processo espera a base liberada pelos outros
+
+# Base local de licitações (SQLite) usada por --metodo local
+ARMAZEM_ARQUIVO = 'licitacoes_pncp.sqlite3'
+ARMAZEM_TIMEOUT = 5  # segundos de espera por outra conexão que está gravando
+
+# Serviço JSON do painel index.html (pncp_servidor.py)
+SERVIDOR_HOST = '127.0.0.1'
+SERVIDOR_PORTA = 8000
+SERVIDOR_GZIP_MINIMO = 1024  # bytes; respostas menores saem sem compressão
+NOVAS_JANELA_HORAS = 24  # licitações vistas (ou publicadas) neste período contam como novas
+
+# Web scraping: analisador de HTML ('auto' usa lxml se instalado, senão html.parser)
+WEB_PARSER = 'auto'
+WEB_REGIAO_RESULTADOS = None  # id do contêiner dos resultados na página de pesquisa
+DETALHES_ENABLED = True  # completar os resultados com as páginas de detalhe (item_url)
+DETALHES_WORKERS = 8  # páginas de detalhe baixadas em paralelo
+DETALHES_CACHE_MAX = 10000  # páginas de detalhe mantidas em memória por execução
 
 # Configurações de exportação
-EXPORT_FORMATS = ['excel', 'csv', 'json']
+EXPORT_FORMATS = ['excel', 'csv', 'json', 'ndjson', 'parquet']
 DEFAULT_EXCEL_ENGINE = 'openpyxl'
 CSV_ENCODING = 'utf-8-sig'
+PARQUET_LOTE = 10000  # linhas por row group
+PARQUET_COMPRESSAO = 'zstd'
+# Datas do Parquet gravadas em UTC; as que vêm sem fuso são do horário de Brasília (horas em relação a UTC)
+PARQUET_FUSO_PADRAO = -3
 
 # Filtros disponíveis
 MODALIDADES_DISPONIVEIS = [
@@ -86,10 +130,36 @@ ESTADOS_BRASIL = {
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_LEVEL = 'INFO'
 
+# --metodo auto: segundos sem resposta da API até iniciar também o web scraping
+AUTO_ATRASO_WEB = 5.0
+
 # Configurações de retry
 MAX_RETRIES = 3
-RETRY_DELAY = 1  # segundos
+RETRY_DELAY = 1  # segundos (base do backoff exponencial)
+RETRY_MAX_DELAY = 30  # segundos
+
+# Disjuntor (circuit breaker) por host
+CIRCUITO_LIMITE_FALHAS = 5  # falhas consecutivas até abrir o circuito
+CIRCUITO_TEMPO_ABERTO = 60  # segundos com o host bloqueado
+
+# Conexões mantidas no pool da sessão HTTP (por host)
+POOL_CONEXOES = 10
 
-# Configurações de cache (para futuras implementações)
+# Requisições condicionais (ETag/Last-Modified): respostas guardadas para revalidação
+CONDICIONAL_MAX_RESPOSTAS = 64
+
+# Modo vigia (--vigiar): consultas periódicas que emitem só licitações ainda não vistas
+VIGIA_INTERVALO = 60  # segundos entre consultas enquanto aparecem novidades
+VIGIA_INTERVALO_MAX = 900  # limite do intervalo quando nada muda
+VIGIA_FATOR = 2  # multiplicador do intervalo a cada consulta sem novidades
+VIGIA_MAX_PAGINAS = 10  # páginas lidas por consulta até encontrar um registro já visto
+VIGIA_MEMORIA = 100000  # identificadores lembrados (os mais antigos são esquecidos)
+
+# Configurações de cache de respostas HTTP
 CACHE_ENABLED = False
-CACHE_TTL = 300  # segundos
\ No newline at end of file
+CACHE_TTL = 300  # segundos
+CACHE_DIR = '.cache_pncp'
+CACHE_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+
+# Métricas (--metrics-out): limites dos baldes do histograma de latência HTTP, em segundos
+METRICAS_BALDES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
\ No newline at end of file
@@ -7,123 +7,613 @@ Repositório: Thiag086/Licita-oes_geral
 """
 
 import argparse
+import itertools
 import sys
-from pncp_licitacoes import PNCPClient, LicitacaoProcessor
-from pncp_web_scraper import PNCPWebScraper
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import config
+from pncp_erros import ErroPNCP
+from pncp_exportacao import EscritorCSV, EscritorExcel, EscritorJSON, EscritorNDJSON, EscritorParquet
+from pncp_consultas import correr_com_reserva, executar_plano, montar_plano
+from pncp_formatacao import LicitacaoProcessor
+from pncp_html import ANALISADORES
+from pncp_metricas import metricas, perfilar
+
+# requests (pncp_cache, pncp_http, cliente e scraper), lxml/bs4 e sqlite3 são
+# importados só nos caminhos que os usam: --exemplo e --help não os carregam
+
+
+def _espiar(licitacoes):
+    """Retorna o fluxo intacto se tiver ao menos um registro, senão []"""
+    primeiro = next(licitacoes, None)
+    return itertools.chain([primeiro], licitacoes) if primeiro else []
+
+
+def _anotar_alertas(pares, perfis_atendidos: deque) -> Iterator[Dict]:
+    """Gera as licitações de (licitação, perfis), guardando os perfis na ordem para a exibição"""
+    for licitacao, nomes in pares:
+        perfis_atendidos.append(nomes)
+        yield licitacao
+
+
+def buscar_via_api(args, plano: List[Dict], sessao, avisar=print) -> Tuple[object, Optional[str], list]:
+    """
+    Busca pela API conforme os argumentos da linha de comando
+    
+    Returns:
+        (licitações, erro da busca ou None, erros das consultas do plano)
+    """
+    from pncp_licitacoes import PNCPClient
+    from pncp_sync import EstadoSincronizacao, sincronizar
+    
+    multiplas = len(plano) > 1
+    licitacoes = []
+    erro_busca = None
+    erros_consultas = []
+    try:
+        avisar("Tentando buscar via API...")
+        # No modo bruto, os itens são decodificados enquanto cada página chega
+        client = PNCPClient(sessao, compacto=args.compacto, fluxo=args.bruto or config.JSON_FLUXO)
+        
+        if args.sincronizar:
+            estado = EstadoSincronizacao(args.estado_sync)
+            
+            def buscar_api(**filtros):
+                return sincronizar(client, estado, tamanho_pagina=args.tamanho, **filtros)
+            
+            if multiplas:
+                licitacoes = executar_plano(plano, buscar_api, max_workers=args.workers,
+                                            erros=erros_consultas)
+            else:
+                licitacoes = buscar_api(**plano[0])
+            licitacoes = _espiar(licitacoes)
+        elif multiplas:
+            def buscar_api(**filtros):
+                if args.todas_paginas:
+                    return client.iterar_licitacoes(
+                        pagina_inicial=args.pagina,
+                        tamanho_pagina=args.tamanho,
+                        max_paginas=args.max_paginas,
+                        prefetch=0,
+                        **filtros
+                    )
+                if args.bruto:
+                    return client.buscar_licitacoes_em_fluxo(pagina=args.pagina, tamanho_pagina=args.tamanho,
+                                                             **filtros)
+                resultado = client.buscar_licitacoes(pagina=args.pagina, tamanho_pagina=args.tamanho, **filtros)
+                return resultado.get('items', [])
+            
+            avisar(f"Executando {len(plano)} consultas com até {args.workers} em paralelo...")
+            licitacoes = _espiar(executar_plano(plano, buscar_api, max_workers=args.workers,
+                                                erros=erros_consultas))
+        elif args.todas_paginas:
+            licitacoes = client.iterar_licitacoes(
+                uf=args.uf,
+                municipio=args.municipio,
+                orgao=args.cnpj or args.orgao,
+                modalidade=args.modalidade,
+                situacao=args.situacao,
+                data_inicio=args.data_inicio,
+                data_fim=args.data_fim,
+                pagina_inicial=args.pagina,
+                tamanho_pagina=args.tamanho,
+                max_paginas=args.max_paginas
+            )
+            # Espiar o primeiro registro para saber se a API respondeu
+            licitacoes = _espiar(licitacoes)
+        elif args.bruto:
+            # Cada item sai enquanto o corpo da página ainda está chegando
+            licitacoes = _espiar(client.buscar_licitacoes_em_fluxo(
+                pagina=args.pagina, tamanho_pagina=args.tamanho, **plano[0]))
+        elif args.cnpj:
+            resultado = client.buscar_por_cnpj(args.cnpj, args.pagina, args.tamanho)
+            licitacoes = resultado.get('items', [])
+        elif args.municipio:
+            resultado = client.buscar_por_municipio(args.municipio, args.uf, args.pagina, args.tamanho)
+            licitacoes = resultado.get('items', [])
+        else:
+            resultado = client.buscar_licitacoes(
+                uf=args.uf,
+                municipio=args.municipio,
+                orgao=args.orgao,
+                modalidade=args.modalidade,
+                situacao=args.situacao,
+                data_inicio=args.data_inicio,
+                data_fim=args.data_fim,
+                pagina=args.pagina,
+                tamanho_pagina=args.tamanho
+            )
+            licitacoes = resultado.get('items', [])
+        
+        if args.sincronizar and not licitacoes and not erros_consultas:
+            avisar("✓ Nenhuma licitação atualizada desde a última sincronização")
+        elif not (multiplas or args.todas_paginas or args.sincronizar or args.bruto) and 'erro' in resultado:
+            erro_busca = resultado['erro']
+            avisar(f"✗ Erro na API: {erro_busca}")
+        elif (multiplas or args.todas_paginas or args.sincronizar or args.bruto) and licitacoes:
+            avisar("✓ API funcionou! Recebendo resultados...")
+        elif licitacoes:
+            avisar(f"✓ API funcionou! Encontradas {len(licitacoes)} licitações")
+        elif erros_consultas and len(erros_consultas) == len(plano):
+            erro_busca = "todas as consultas falharam"
+            avisar(f"✗ Erro na API: {erro_busca}")
+        else:
+            avisar("⚠ API não retornou dados")
+            
+    except Exception as e:
+        avisar(f"✗ Erro na API: {e}")
+        erro_busca = str(e)
+        licitacoes = []
+    
+    return licitacoes, erro_busca, erros_consultas
+
+
+def buscar_via_web(args, plano: List[Dict], sessao, avisar=print) -> Tuple[object, Optional[str], list]:
+    """
+    Busca por web scraping conforme os argumentos da linha de comando
+    
+    Returns:
+        (licitações, erro da busca ou None, erros das consultas do plano)
+    """
+    from pncp_web_scraper import PNCPWebScraper
+    
+    multiplas = len(plano) > 1
+    licitacoes = []
+    erro_busca = None
+    erros_consultas = []
+    try:
+        avisar("Tentando buscar via web scraping...")
+        scraper = PNCPWebScraper(sessao, analisador=args.parser_html, compacto=args.compacto)
+        if multiplas:
+            avisar(f"Executando {len(plano)} consultas com até {args.workers} em paralelo...")
+            licitacoes = _espiar(executar_plano(plano, scraper.buscar_licitacoes_por_filtros,
+                                                max_workers=args.workers, erros=erros_consultas))
+        else:
+            licitacoes = scraper.buscar_licitacoes_por_filtros(
+                uf=args.uf,
+                municipio=args.municipio,
+                orgao=args.orgao,
+                modalidade=args.modalidade,
+                situacao=args.situacao,
+                data_inicio=args.data_inicio,
+                data_fim=args.data_fim
+            )
+        
+        if multiplas and licitacoes:
+            avisar("✓ Web scraping funcionou! Recebendo resultados...")
+        elif licitacoes:
+            avisar(f"✓ Web scraping funcionou! Encontradas {len(licitacoes)} licitações")
+        elif erros_consultas and len(erros_consultas) == len(plano):
+            erro_busca = "todas as consultas falharam"
+            avisar(f"✗ Erro no web scraping: {erro_busca}")
+        else:
+            avisar("⚠ Web scraping não retornou dados")
+        
+        if licitacoes and args.detalhes:
+            # Município, UF, modalidade, situação, número e valor vêm da página de detalhe
+            licitacoes = scraper.enriquecer_licitacoes(licitacoes)
+            
+    except Exception as e:
+        avisar(f"✗ Erro no web scraping: {e}")
+        erro_busca = str(e)
+        licitacoes = []
+    
+    return licitacoes, erro_busca, erros_consultas
+
+
+def buscar_em_corrida(args, plano: List[Dict], nova_sessao: Callable) -> Tuple[object, Optional[str], list]:
+    """
+    --metodo auto com reserva: o web scraping começa se a API não trouxer
+    resultados em args.atraso_web segundos (0: as duas fontes ao mesmo tempo)
+    
+    Vale o primeiro resultado não vazio; a outra fonte tem a sessão
+    cancelada e as mensagens silenciadas. Informa a fonte vencedora e o
+    tempo economizado em relação a esperar a API antes do web scraping.
+    """
+    sessoes = {'principal': nova_sessao(), 'reserva': nova_sessao()}
+    ativas = {'principal': True, 'reserva': True}
+    
+    def avisar_de(nome: str):
+        def avisar(mensagem: str):
+            if ativas[nome]:
+                print(mensagem)
+        return avisar
+    
+    def cancelar_de(nome: str):
+        def cancelar():
+            ativas[nome] = False
+            sessoes[nome].cancelar()
+        return cancelar
+    
+    corrida = correr_com_reserva(
+        lambda: buscar_via_api(args, plano, sessoes['principal'], avisar_de('principal')),
+        lambda: buscar_via_web(args, plano, sessoes['reserva'], avisar_de('reserva')),
+        atraso=args.atraso_web,
+        valido=lambda resultado: bool(resultado[0]),
+        cancelar={nome: cancelar_de(nome) for nome in sessoes}
+    )
+    
+    vencedor = corrida['vencedor']
+    resultados = corrida['resultados']
+    if vencedor:
+        licitacoes, erro_busca, erros_consultas = resultados[vencedor]
+    else:
+        # Nenhuma fonte trouxe dados: mesmo resultado da execução sequencial
+        licitacoes, erro_busca, erros_consultas = resultados['principal']
+        _, erro_web, erros_consultas = resultados['reserva']
+        erro_busca = erro_web or erro_busca
+    
+    # Sequencialmente, o web scraping só começaria quando a API terminasse
+    inicio_web = corrida['inicio'].get('reserva')
+    fim_api = corrida['fim']['principal']
+    fonte = {'principal': 'API', 'reserva': 'web scraping'}.get(vencedor)
+    detalhe = ''
+    economia = 0.0
+    if vencedor == 'reserva':
+        if fim_api is None:
+            economia = corrida['decisao'] - inicio_web
+            detalhe = f" (API sem resposta; economia de pelo menos {economia:.1f}s)"
+        else:
+            economia = max(0.0, fim_api - inicio_web)
+            detalhe = f" (API terminou sem dados em {fim_api:.1f}s; economia de {economia:.1f}s)"
+    elif vencedor == 'principal' and inicio_web is not None:
+        detalhe = " (web scraping cancelado)"
+    if fonte:
+        print(f"⚡ Corrida API x web: {fonte} venceu em {corrida['decisao']:.1f}s{detalhe}")
+    else:
+        print(f"⚡ Corrida API x web: nenhuma fonte trouxe dados ({corrida['decisao']:.1f}s)")
+    
+    metricas.incrementar('pncp_corrida_total', vencedor={'principal': 'api', 'reserva': 'web'}.get(vencedor, 'nenhum'))
+    metricas.definir('pncp_corrida_economia_segundos', economia)
+    return licitacoes, erro_busca, erros_consultas
+
+
+def buscar_em_vigia(args, plano: List[Dict], limitador) -> Iterator[Dict]:
+    """
+    --vigiar: um único PNCPClient, com requisições condicionais, consultado
+    em intervalos adaptativos; gera só as licitações ainda não vistas
+    """
+    from pncp_http import SessaoPNCP
+    from pncp_licitacoes import PNCPClient
+    from pncp_vigia import VigiaLicitacoes
+    
+    # Sem o cache local: a vigia precisa da resposta atual (as condicionais evitam o download)
+    sessao = SessaoPNCP(limitador, cache=False, max_tentativas=args.tentativas,
+                        pool_conexoes=args.pool_conexoes, condicional=True)
+    ja_vistas = None
+    if args.salvar_local:
+        from pncp_store import ArmazemLocal
+        
+        ja_vistas = ArmazemLocal(args.banco).existentes
+    
+    vigia = VigiaLicitacoes(
+        PNCPClient(sessao, compacto=args.compacto),
+        filtros=plano[0],
+        tamanho_pagina=args.tamanho,
+        intervalo=args.intervalo,
+        intervalo_max=args.intervalo_max,
+        ja_vistas=ja_vistas
+    )
+    
+    def gravar_metricas():
+        if args.metrics_out:
+            metricas.salvar(args.metrics_out)
+    
+    print(f"Vigiando a API a cada {args.intervalo:g}s (até {args.intervalo_max:g}s sem novidades); "
+          f"Ctrl+C para encerrar")
+    return vigia.executar(apos_consulta=gravar_metricas)
 
 
 def main():
     """Função principal que escolhe o melhor método de busca"""
     parser = argparse.ArgumentParser(description='Listar licitações do PNCP')
-    parser.add_argument('--uf', help='Unidade Federativa (ex: PR, SP)')
+    parser.add_argument('--uf', help='Unidade Federativa (ex: PR, SP; lista: PR,SP,SC; todas)')
     parser.add_argument('--municipio', help='Nome do município')
     parser.add_argument('--orgao', help='Nome do órgão')
     parser.add_argument('--cnpj', help='CNPJ do órgão')
-    parser.add_argument('--modalidade', help='Modalidade de licitação')
-    parser.add_argument('--situacao', help='Situação da licitação')
+    parser.add_argument('--modalidade', help='Modalidade de licitação (aceita lista separada por vírgula)')
+    parser.add_argument('--situacao', help='Situação da licitação (aceita lista separada por vírgula)')
     parser.add_argument('--data-inicio', help='Data de início (YYYY-MM-DD)')
     parser.add_argument('--data-fim', help='Data de fim (YYYY-MM-DD)')
     parser.add_argument('--pagina', type=int, default=1, help='Número da página')
     parser.add_argument('--tamanho', type=int, default=20, help='Itens por página')
+    parser.add_argument('--todas-paginas', action='store_true',
+                       help='Percorrer todas as páginas da API (a partir de --pagina)')
+    parser.add_argument('--max-paginas', type=int, help='Limite de páginas em --todas-paginas')
+    parser.add_argument('--sincronizar', action='store_true',
+                       help='Buscar apenas licitações atualizadas desde a última execução (via API)')
+    parser.add_argument('--estado-sync', default=config.SYNC_ESTADO_ARQUIVO,
+                       help='Arquivo com as marcas d\'água da sincronização incremental')
+    parser.add_argument('--janela-dias', type=int,
+                       help='Dividir o período de datas em janelas de N dias (uma consulta por janela)')
+    parser.add_argument('--workers', type=int, default=config.MAX_WORKERS,
+                       help='Consultas simultâneas ao combinar vários filtros')
+    parser.add_argument('--max-por-host', type=int, default=config.MAX_CONEXOES_POR_HOST,
+                       help='Requisições simultâneas por host')
     parser.add_argument('--excel', help='Salvar em Excel (nome do arquivo)')
     parser.add_argument('--csv', help='Salvar em CSV (nome do arquivo)')
     parser.add_argument('--json', help='Salvar em JSON (nome do arquivo)')
+    parser.add_argument('--ndjson', help='Salvar em NDJSON, um registro por linha (nome do arquivo)')
+    parser.add_argument('--parquet', help='Salvar em Parquet com campos tipados, requer pyarrow (nome do arquivo)')
     parser.add_argument('--exemplo', action='store_true', help='Usar dados de exemplo')
-    parser.add_argument('--metodo', choices=['api', 'web', 'auto'], default='auto', 
-                       help='Método de busca: api, web ou auto (padrão)')
+    parser.add_argument('--cache', dest='cache', action='store_true', default=config.CACHE_ENABLED,
+                       help='Usar cache local de respostas HTTP (padrão: config.CACHE_ENABLED)')
+    parser.add_argument('--sem-cache', dest='cache', action='store_false', help='Não usar o cache local')
+    parser.add_argument('--cache-ttl', type=int, default=config.CACHE_TTL,
+                       help='Validade das respostas em cache, em segundos')
+    parser.add_argument('--tentativas', type=int, default=config.MAX_RETRIES,
+                       help='Novas tentativas após falhas transitórias (backoff exponencial)')
+    parser.add_argument('--pool-conexoes', type=int, default=config.POOL_CONEXOES,
+                       help='Conexões mantidas no pool HTTP por host')
+    parser.add_argument('--metodo', choices=['api', 'web', 'auto', 'local'], default='auto', 
+                       help='Método de busca: api, web, auto (padrão) ou local (base SQLite, sem rede)')
+    parser.add_argument('--atraso-web', type=float, default=config.AUTO_ATRASO_WEB,
+                       help='Em --metodo auto, iniciar o web scraping se a API não trouxer resultados '
+                            'em N segundos (0: as duas fontes juntas); vale a primeira com dados')
+    parser.add_argument('--sequencial', action='store_true',
+                       help='Em --metodo auto, esperar a API terminar antes de tentar o web scraping')
+    parser.add_argument('--banco', default=config.ARMAZEM_ARQUIVO,
+                       help='Arquivo da base local de licitações (SQLite)')
+    parser.add_argument('--busca',
+                       help='Busca textual em título, descrição e órgão na base local (implica --metodo local)')
+    parser.add_argument('--salvar-local', action='store_true',
+                       help='Gravar as licitações encontradas na base local (--banco)')
+    parser.add_argument('--detalhes', dest='detalhes', action='store_true', default=config.DETALHES_ENABLED,
+                       help='Completar os resultados do web scraping com as páginas de detalhe (padrão)')
+    parser.add_argument('--sem-detalhes', dest='detalhes', action='store_false',
+                       help='Não baixar as páginas de detalhe no web scraping')
+    parser.add_argument('--parser-html', choices=ANALISADORES, default=config.WEB_PARSER,
+                       help='Analisador de HTML do web scraping (auto: lxml se instalado)')
+    parser.add_argument('--vigiar', action='store_true',
+                       help='Consultar a API periodicamente e mostrar só licitações ainda não vistas (via API)')
+    parser.add_argument('--intervalo', type=float, default=config.VIGIA_INTERVALO,
+                       help='Segundos entre as consultas de --vigiar enquanto houver novidades')
+    parser.add_argument('--intervalo-max', type=float, default=config.VIGIA_INTERVALO_MAX,
+                       help='Limite do intervalo de --vigiar, que dobra a cada consulta sem novidades')
+    parser.add_argument('--bruto', action='store_true',
+                       help='Gravar os registros da API direto em --json/--ndjson/--parquet, sem formatar nem '
+                            'exibir cada licitação; as páginas são decodificadas enquanto chegam')
+    parser.add_argument('--compacto', action='store_true', default=config.REGISTRO_COMPACTO,
+                       help='Manter as licitações em memória como registros compactos (__slots__, textos '
+                            'internados, datas em datetime); as exportações JSON trazem as datas em ISO 8601')
+    parser.add_argument('--alertas',
+                       help='Mostrar/exportar só as licitações que atendem a algum perfil de alerta '
+                            '(arquivo JSON com os perfis; combina com --vigiar)')
+    parser.add_argument('--metrics-out',
+                       help='Gravar métricas da execução (latência, bytes, retentativas, cache, registros e '
+                            'tempo por etapa) em JSON, ou no formato Prometheus se terminar em .prom')
+    parser.add_argument('--profile', help='Gravar um perfil cProfile da execução (nome do arquivo)')
     
     args = parser.parse_args()
+    if args.busca:
+        args.metodo = 'local'
+    if args.bruto and (args.excel or args.csv):
+        parser.error('--bruto grava os registros sem formatar: use --json, --ndjson ou --parquet')
+    if args.bruto and not (args.json or args.ndjson or args.parquet):
+        parser.error('--bruto precisa de um arquivo de saída: --json, --ndjson ou --parquet')
+    if args.vigiar and (args.exemplo or args.metodo in ('web', 'local') or args.sincronizar):
+        parser.error('--vigiar usa a API: não combina com --exemplo, --metodo web/local ou --sincronizar')
     
+    inicio = time.perf_counter()
+    try:
+        with perfilar(args.profile):
+            executar(args)
+    except KeyboardInterrupt:
+        print("\nInterrompido.")
+        sys.exit(130)
+    finally:
+        # Também em falhas (sys.exit), quando as métricas são mais úteis
+        if args.metrics_out:
+            metricas.definir('pncp_execucao_segundos', time.perf_counter() - inicio)
+            metricas.salvar(args.metrics_out)
+            print(f"Métricas salvas em: {args.metrics_out}")
+
+
+def executar(args):
+    """Busca, exibe e exporta as licitações conforme os argumentos da linha de comando"""
     processor = LicitacaoProcessor()
     licitacoes = []
+    erro_busca = None  # falha de rede/API, distinta de uma busca sem resultados
+    erros_consultas = []
+    cache = None
+    
+    # Cada combinação de UF x modalidade x situação x janela vira uma consulta
+    plano = montar_plano(
+        uf=args.uf,
+        municipio=args.municipio,
+        orgao=args.cnpj or args.orgao,
+        modalidade=args.modalidade,
+        situacao=args.situacao,
+        data_inicio=args.data_inicio,
+        data_fim=args.data_fim,
+        janela_dias=args.janela_dias
+    )
+    
+    motor_alertas = None
+    if args.alertas:
+        from pncp_alertas import MotorAlertas
+        
+        try:
+            motor_alertas = MotorAlertas.carregar(args.alertas)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"✗ Não foi possível carregar os perfis de alerta de {args.alertas}: {e}")
+            sys.exit(1)
+        print(f"✓ {len(motor_alertas.perfis)} perfis de alerta carregados de {args.alertas}")
     
     if args.exemplo:
+        from pncp_exemplo import dados_exemplo
+        
         print("Usando dados de exemplo...")
-        scraper = PNCPWebScraper()
-        licitacoes = scraper.buscar_licitacoes_dados_exemplo()
+        licitacoes = dados_exemplo()
+        if args.compacto:
+            from pncp_registro import Licitacao
+            
+            licitacoes = [Licitacao(licitacao) for licitacao in licitacoes]
+    elif args.metodo == 'local':
+        from pncp_store import ArmazemLocal
+        
+        inicio = time.perf_counter()
+        armazem = ArmazemLocal(args.banco)
+        filtros = {
+            'uf': args.uf,
+            'municipio': args.municipio,
+            'orgao': args.cnpj or args.orgao,
+            'modalidade': args.modalidade,
+            'situacao': args.situacao,
+            'data_inicio': args.data_inicio,
+            'data_fim': args.data_fim
+        }
+        
+        if args.busca:
+            resultado = armazem.buscar_texto(args.busca, pagina=args.pagina, tamanho_pagina=args.tamanho, **filtros)
+            licitacoes = resultado['items']
+            print(f"✓ Busca \"{args.busca}\": {resultado['total']} licitações na base local "
+                  f"({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+        elif args.todas_paginas:
+            licitacoes = _espiar(armazem.iterar_licitacoes(**filtros))
+            print(f"✓ Consultando a base local ({armazem.contar()} licitações armazenadas)")
+        else:
+            resultado = armazem.buscar_licitacoes(pagina=args.pagina, tamanho_pagina=args.tamanho, **filtros)
+            licitacoes = resultado['items']
+            print(f"✓ Base local: {resultado['total']} licitações atendem aos filtros "
+                  f"({(time.perf_counter() - inicio) * 1000:.1f} ms)")
     else:
-        # Tentar API primeiro se método for 'auto' ou 'api'
-        if args.metodo in ['api', 'auto']:
-            try:
-                print("Tentando buscar via API...")
-                client = PNCPClient()
-                
-                if args.cnpj:
-                    resultado = client.buscar_por_cnpj(args.cnpj, args.pagina, args.tamanho)
-                elif args.municipio:
-                    resultado = client.buscar_por_municipio(args.municipio, args.uf, args.pagina, args.tamanho)
-                else:
-                    resultado = client.buscar_licitacoes(
-                        uf=args.uf,
-                        municipio=args.municipio,
-                        orgao=args.orgao,
-                        modalidade=args.modalidade,
-                        situacao=args.situacao,
-                        data_inicio=args.data_inicio,
-                        data_fim=args.data_fim,
-                        pagina=args.pagina,
-                        tamanho_pagina=args.tamanho
-                    )
-                
-                licitacoes = resultado.get('items', [])
-                if licitacoes:
-                    print(f"✓ API funcionou! Encontradas {len(licitacoes)} licitações")
-                else:
-                    print("⚠ API não retornou dados")
-                    
-            except Exception as e:
-                print(f"✗ Erro na API: {e}")
-                licitacoes = []
-        
-        # Se API falhou e método é 'auto' ou 'web', tentar web scraping
-        if not licitacoes and args.metodo in ['web', 'auto']:
-            try:
-                print("Tentando buscar via web scraping...")
-                scraper = PNCPWebScraper()
-                licitacoes = scraper.buscar_licitacoes_por_filtros(
-                    uf=args.uf,
-                    municipio=args.municipio,
-                    orgao=args.orgao,
-                    modalidade=args.modalidade,
-                    situacao=args.situacao,
-                    data_inicio=args.data_inicio,
-                    data_fim=args.data_fim
-                )
-                
+        from pncp_cache import CacheRespostas
+        from pncp_http import LimitadorHosts, SessaoPNCP
+        
+        cache = CacheRespostas(ttl=args.cache_ttl) if args.cache else None
+        limitador = LimitadorHosts(args.max_por_host)
+        
+        def nova_sessao():
+            return SessaoPNCP(
+                limitador,
+                cache=cache or False,
+                max_tentativas=args.tentativas,
+                pool_conexoes=max(args.pool_conexoes, args.workers)
+            )
+        
+        if args.vigiar:
+            if len(plano) > 1:
+                print("✗ --vigiar aceita uma única consulta (sem listas de UF, modalidade ou situação)")
+                sys.exit(1)
+            licitacoes = buscar_em_vigia(args, plano, limitador)
+        # A sincronização incremental depende da API, então não há corrida
+        elif args.metodo == 'auto' and not args.sincronizar and not args.sequencial:
+            licitacoes, erro_busca, erros_consultas = buscar_em_corrida(args, plano, nova_sessao)
+        else:
+            sessao = nova_sessao()
+            
+            # Tentar API primeiro se método for 'auto' ou 'api'
+            if args.metodo in ['api', 'auto']:
+                licitacoes, erro_busca, erros_consultas = buscar_via_api(args, plano, sessao)
+            
+            # Se API falhou e método é 'auto' ou 'web', tentar web scraping
+            # (a sincronização incremental depende da API)
+            if not licitacoes and args.metodo in ['web', 'auto'] and not args.sincronizar:
+                licitacoes, erro_web, erros_consultas = buscar_via_web(args, plano, sessao)
                 if licitacoes:
-                    print(f"✓ Web scraping funcionou! Encontradas {len(licitacoes)} licitações")
-                else:
-                    print("⚠ Web scraping não retornou dados")
-                    
-            except Exception as e:
-                print(f"✗ Erro no web scraping: {e}")
-                licitacoes = []
+                    erro_busca = None
+                elif erro_web:
+                    erro_busca = erro_web
+    
+    if args.salvar_local and licitacoes and args.metodo != 'local':
+        from pncp_store import ArmazemLocal
+        
+        armazem = ArmazemLocal(args.banco)
+        if isinstance(licitacoes, list):
+            print(f"{armazem.salvar(licitacoes)} licitações gravadas em {args.banco}")
+        else:
+            # Na vigia, cada licitação é gravada assim que aparece
+            licitacoes = armazem.gravar_fluxo(licitacoes, lote=1 if args.vigiar else 500)
+    
+    # A base local recebe tudo; exibição e arquivos, só o que atende aos alertas
+    perfis_atendidos = None
+    if motor_alertas is not None and licitacoes:
+        perfis_atendidos = deque()
+        fluxo_alertas = _anotar_alertas(motor_alertas.filtrar(licitacoes), perfis_atendidos)
+        licitacoes = list(fluxo_alertas) if isinstance(licitacoes, list) else fluxo_alertas
     
     # Exibir resultados
     print(f"\n=== RESULTADOS DA BUSCA ===")
-    print(f"Total de licitações encontradas: {len(licitacoes)}")
-    print()
+    if isinstance(licitacoes, list):
+        print(f"Total de licitações encontradas: {len(licitacoes)}")
+        print()
     
     if licitacoes:
-        for i, licitacao in enumerate(licitacoes, 1):
-            info = processor.extrair_informacoes_principais(licitacao)
-            print(f"--- LICITAÇÃO {i} ---")
-            for chave, valor in info.items():
-                print(f"{chave}: {valor}")
-            print()
-        
-        # Salvar em arquivos se solicitado
+        # Os arquivos são gravados à medida que os registros chegam, então
+        # nem o fluxo de --todas-paginas é acumulado em memória
+        colunas = processor.colunas()
+        escritores = []
+        if args.parquet:
+            # Primeiro, para falhar antes de criar os demais arquivos se faltar o pyarrow
+            try:
+                escritores.append(EscritorParquet(args.parquet))
+            except ImportError as e:
+                print(f"✗ {e}")
+                sys.exit(1)
         if args.excel:
-            processor.salvar_para_excel(licitacoes, args.excel)
-        
+            escritores.append(EscritorExcel(args.excel, colunas))
         if args.csv:
-            processor.salvar_para_csv(licitacoes, args.csv)
-        
+            escritores.append(EscritorCSV(args.csv, colunas))
         if args.json:
-            import json
-            with open(args.json, 'w', encoding='utf-8') as f:
-                json.dump({"items": licitacoes, "total": len(licitacoes)}, f, ensure_ascii=False, indent=2)
-            print(f"Dados salvos em: {args.json}")
+            escritores.append(EscritorJSON(args.json))
+        if args.ndjson:
+            escritores.append(EscritorNDJSON(args.ndjson))
+        total = 0
+        # Tempo de exibição e de gravação de cada formato, somado a cada registro
+        # e registrado no fim (uma entrada de métrica por registro pesaria mais)
+        tempo_exibicao = 0.0
+        tempos_escrita = [0.0] * len(escritores)
+        relogio = time.perf_counter
+        
+        try:
+            if args.bruto:
+                # Sem formatação nem exibição: cada registro vai direto para os arquivos
+                fluxo = ((licitacao, None) for licitacao in licitacoes)
+            else:
+                # Formatação em lotes do tamanho da página, para não atrasar a exibição
+                fluxo = processor.formatar_fluxo(licitacoes, lote=1 if args.vigiar else args.tamanho)
+            for i, (licitacao, info) in enumerate(fluxo, 1):
+                alertas = perfis_atendidos.popleft() if perfis_atendidos is not None else None
+                if not args.bruto:
+                    inicio = relogio()
+                    print(f"--- LICITAÇÃO {i} ---")
+                    for chave, valor in info.items():
+                        print(f"{chave}: {valor}")
+                    if alertas:
+                        print(f"Alertas: {', '.join(alertas)}")
+                    print()
+                    tempo_exibicao += relogio() - inicio
+                total = i
+                for n, escritor in enumerate(escritores):
+                    inicio = relogio()
+                    escritor.escrever(info if escritor.formatado else licitacao)
+                    if args.vigiar:
+                        escritor.descarregar()
+                    tempos_escrita[n] += relogio() - inicio
+        except ErroPNCP as e:
+            # Falha no meio da paginação: o resultado está incompleto
+            print(f"✗ {e}")
+            erro_busca = str(e)
+        finally:
+            metricas.incrementar('pncp_etapa_segundos_total', tempo_exibicao, etapa='exibicao')
+            for escritor, segundos in zip(escritores, tempos_escrita):
+                inicio = relogio()
+                escritor.fechar()
+                segundos += relogio() - inicio
+                metricas.incrementar('pncp_etapa_segundos_total', segundos, etapa=f'exportacao_{escritor.formato}')
+                metricas.incrementar('pncp_registros_total', escritor.total, origem=f'exportacao_{escritor.formato}')
+                print(f"Dados salvos em: {escritor.nome_arquivo}")
+        
+        if erros_consultas:
+            erro_busca = f"{len(erros_consultas)} de {len(plano)} consultas falharam"
+        
+        if not isinstance(licitacoes, list):
+            print(f"Total de licitações encontradas: {total}\n")
+    elif perfis_atendidos is not None:
+        print("Nenhuma licitação atende aos perfis de alerta.")
     else:
         print("Nenhuma licitação encontrada com os filtros especificados.")
         print("\nDicas:")
@@ -131,6 +621,16 @@ def main():
         print("- Verifique se os filtros estão corretos")
         print("- Tente usar --metodo web para web scraping")
         print("- Tente usar --metodo api para API (se disponível)")
+    
+    if cache is not None:
+        stats = cache.estatisticas()
+        print(f"\nCache: {stats['acertos']} acertos, {stats['falhas']} falhas, "
+              f"{stats['entradas']} entradas ({stats['tamanho_bytes'] / 1024:.1f} KB)")
+    
+    if erro_busca:
+        # Código de saída distinto para não confundir falha com resultado vazio
+        print(f"\n✗ A busca não foi concluída: {erro_busca}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Alertas: confronta cada licitação com todos os perfis salvos de uma só vez
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Um perfil reúne palavras-chave (basta uma aparecer no título ou na
+descrição), UFs, modalidades e uma faixa de valor_global; critérios
+ausentes não restringem. As palavras de todos os perfis formam um único
+autômato de Aho-Corasick sobre as palavras do texto normalizado, e os
+perfis sem palavras-chave ficam indexados por UF, modalidade e faixa de
+valor, então o custo por licitação depende do tamanho do texto e dos
+perfis atendidos, não da quantidade de perfis.
+"""
+
+import json
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pncp_busca import normalizar_texto
+from pncp_metricas import metricas
+
+
+class PerfilAlerta:
+    """Critérios de um alerta salvo"""
+
+    __slots__ = ('nome', 'palavras', 'ufs', 'modalidades', 'valor_min', 'valor_max')
+
+    def __init__(self,
+                 nome: str,
+                 palavras: Iterable[str] = (),
+                 ufs: Iterable[str] = (),
+                 modalidades: Iterable[str] = (),
+                 valor_min: Optional[float] = None,
+                 valor_max: Optional[float] = None):
+        self.nome = nome
+        self.palavras = [p for p in (normalizar_texto(p) for p in palavras) if p]
+        self.ufs = frozenset(uf.strip().upper() for uf in ufs if uf.strip())
+        # Modalidade por id ('6') ou por nome, comparado sem acentos/maiúsculas
+        self.modalidades = frozenset(m for m in (_chave_modalidade(m) for m in modalidades) if m)
+        self.valor_min = valor_min
+        self.valor_max = valor_max
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'PerfilAlerta':
+        return cls(
+            nome=dados['nome'],
+            palavras=dados.get('palavras') or [],
+            ufs=dados.get('ufs') or [],
+            modalidades=dados.get('modalidades') or [],
+            valor_min=dados.get('valor_min'),
+            valor_max=dados.get('valor_max'),
+        )
+
+    def atende_atributos(self, uf: Optional[str], modalidades: Tuple[str, ...], valor: Optional[float]) -> bool:
+        if self.ufs and uf not in self.ufs:
+            return False
+        if self.modalidades and not any(m in self.modalidades for m in modalidades):
+            return False
+        if self.valor_min is not None or self.valor_max is not None:
+            if valor is None:
+                return False
+            if self.valor_min is not None and valor < self.valor_min:
+                return False
+            if self.valor_max is not None and valor > self.valor_max:
+                return False
+        return True
+
+
+def _chave_modalidade(valor) -> str:
+    texto = str(valor).strip() if valor is not None else ''
+    return texto if texto.isdigit() else normalizar_texto(texto)
+
+
+def _valor(licitacao: Dict) -> Optional[float]:
+    valor = licitacao.get('valor_global')
+    try:
+        return float(valor) if valor not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _Automato:
+    """Aho-Corasick com palavras como símbolos; cada padrão é uma sequência de palavras"""
+
+    def __init__(self):
+        self.transicoes: List[Dict[str, int]] = [{}]
+        self.falha: List[int] = [0]
+        self.saidas: List[Tuple[int, ...]] = [()]
+        self.vocabulario = set()
+
+    def adicionar(self, palavras: Tuple[str, ...], valor: int):
+        estado = 0
+        for palavra in palavras:
+            proximo = self.transicoes[estado].get(palavra)
+            if proximo is None:
+                proximo = len(self.transicoes)
+                self.transicoes[estado][palavra] = proximo
+                self.transicoes.append({})
+                self.falha.append(0)
+                self.saidas.append(())
+            estado = proximo
+        self.vocabulario.update(palavras)
+        if valor not in self.saidas[estado]:
+            self.saidas[estado] += (valor,)
+
+    def construir(self):
+        """Calcula os elos de falha (busca em largura) e herda as saídas"""
+        fila = deque(self.transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for palavra, proximo in self.transicoes[estado].items():
+                fila.append(proximo)
+                recuo = self.falha[estado]
+                while recuo and palavra not in self.transicoes[recuo]:
+                    recuo = self.falha[recuo]
+                destino = self.transicoes[recuo].get(palavra, 0)
+                self.falha[proximo] = destino if destino != proximo else 0
+                herdadas = tuple(v for v in self.saidas[self.falha[proximo]] if v not in self.saidas[proximo])
+                self.saidas[proximo] += herdadas
+
+    def buscar(self, palavras: Iterable[Optional[str]], encontrados: set):
+        """Acrescenta a `encontrados` as saídas dos padrões presentes (None separa trechos)"""
+        transicoes, falha, saidas, vocabulario = self.transicoes, self.falha, self.saidas, self.vocabulario
+        estado = 0
+        for palavra in palavras:
+            if palavra not in vocabulario:
+                # A maioria das palavras não aparece em nenhum perfil
+                estado = 0
+                continue
+            while estado and palavra not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(palavra, 0)
+            if saidas[estado]:
+                encontrados.update(saidas[estado])
+
+
+class _FaixasValor:
+    """
+    Perfis indexados pela faixa de valor_global
+
+    Os limites de todas as faixas dividem a reta em segmentos (cada limite
+    e o intervalo aberto entre dois limites seguidos), cada um com os
+    perfis que o cobrem; a consulta é uma busca binária.
+    """
+
+    def __init__(self, faixas: Iterable[Tuple[Optional[float], Optional[float], int]]):
+        faixas = list(faixas)
+        self.sem_faixa = tuple(sorted(i for minimo, maximo, i in faixas if minimo is None and maximo is None))
+        com_faixa = [faixa for faixa in faixas if faixa[0] is not None or faixa[1] is not None]
+        self.limites = sorted({v for minimo, maximo, _ in com_faixa for v in (minimo, maximo) if v is not None})
+
+        # Segmento 2k+1: exatamente limites[k]; 2k: entre limites[k-1] e limites[k]
+        quantidade = 2 * len(self.limites) + 1
+        entram: List[List[int]] = [[] for _ in range(quantidade + 1)]
+        saem: List[List[int]] = [[] for _ in range(quantidade + 1)]
+        for minimo, maximo, indice in com_faixa:
+            inicio = 0 if minimo is None else 2 * bisect_left(self.limites, minimo) + 1
+            fim = quantidade - 1 if maximo is None else 2 * bisect_left(self.limites, maximo) + 1
+            if inicio <= fim:
+                entram[inicio].append(indice)
+                saem[fim + 1].append(indice)
+
+        # Segmentos seguidos sem mudança compartilham a mesma tupla
+        self.segmentos: List[Tuple[int, ...]] = []
+        ativos = set()
+        atual: Tuple[int, ...] = ()
+        for segmento in range(quantidade):
+            if entram[segmento] or saem[segmento]:
+                ativos.difference_update(saem[segmento])
+                ativos.update(entram[segmento])
+                atual = tuple(sorted(ativos))
+            self.segmentos.append(atual)
+
+    def buscar(self, valor: Optional[float], encontrados: set):
+        """Acrescenta a `encontrados` os perfis cuja faixa contém o valor"""
+        encontrados.update(self.sem_faixa)
+        if valor is None or not self.limites:
+            return
+        k = bisect_left(self.limites, valor)
+        exato = k < len(self.limites) and self.limites[k] == valor
+        encontrados.update(self.segmentos[2 * k + 1 if exato else 2 * k])
+
+
+class MotorAlertas:
+    """
+    Avalia licitações contra todos os perfis em uma passada
+
+    Perfis com palavras-chave só são examinados quando o autômato encontra
+    uma delas; os demais ficam agrupados por (UF, modalidade), cada grupo
+    indexado por faixa de valor, e só os que atendem aos três critérios
+    são examinados.
+    """
+
+    def __init__(self, perfis: Iterable[PerfilAlerta]):
+        self.perfis: List[PerfilAlerta] = list(perfis)
+        self._automato = _Automato()
+        # (UF, modalidade) -> faixas de valor; None no grupo = sem restrição
+        grupos: Dict[Tuple[Optional[str], Optional[str]], List[Tuple[Optional[float], Optional[float], int]]] = {}
+
+        for indice, perfil in enumerate(self.perfis):
+            if perfil.palavras:
+                for palavra in perfil.palavras:
+                    self._automato.adicionar(tuple(palavra.split()), indice)
+                continue
+            for uf in perfil.ufs or (None,):
+                for modalidade in perfil.modalidades or (None,):
+                    grupos.setdefault((uf, modalidade), []).append((perfil.valor_min, perfil.valor_max, indice))
+        self._automato.construir()
+
+        self._sem_palavras = {grupo: _FaixasValor(faixas) for grupo, faixas in grupos.items()}
+
+    @classmethod
+    def carregar(cls, caminho: str) -> 'MotorAlertas':
+        """Perfis de um arquivo JSON: lista de objetos ou {"perfis": [...]}"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        if isinstance(dados, dict):
+            dados = dados.get('perfis', [])
+        return cls(PerfilAlerta.de_dict(perfil) for perfil in dados)
+
+    def avaliar(self, licitacao: Dict) -> List[str]:
+        """Nomes dos perfis atendidos pela licitação, na ordem em que foram cadastrados"""
+        candidatos = set()
+        self._automato.buscar(
+            normalizar_texto(licitacao.get('title') or '').split()
+            + [None]
+            + normalizar_texto(licitacao.get('description') or '').split(),
+            candidatos
+        )
+
+        uf = (licitacao.get('uf') or '').upper() or None
+        modalidades = tuple(m for m in (_chave_modalidade(licitacao.get('modalidade_licitacao_id')),
+                                        _chave_modalidade(licitacao.get('modalidade_licitacao_nome'))) if m)
+        valor = _valor(licitacao)
+        if self._sem_palavras:
+            for chave_uf in (uf, None) if uf else (None,):
+                for modalidade in modalidades + (None,):
+                    faixas = self._sem_palavras.get((chave_uf, modalidade))
+                    if faixas is not None:
+                        faixas.buscar(valor, candidatos)
+        if not candidatos:
+            return []
+        return [self.perfis[i].nome for i in sorted(candidatos)
+                if self.perfis[i].atende_atributos(uf, modalidades, valor)]
+
+    def filtrar(self, licitacoes: Iterable[Dict]) -> Iterator[Tuple[Dict, List[str]]]:
+        """Gera (licitação, perfis atendidos) apenas para as que atendem a algum perfil"""
+        for licitacao in licitacoes:
+            nomes = self.avaliar(licitacao)
+            if nomes:
+                metricas.incrementar('pncp_alertas_total')
+                yield licitacao, nomes
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Carga histórica do PNCP em processos paralelos, retomável a partir de um checkpoint
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+O período é dividido em fatias UF x mês x modalidade. Um processo pega
+uma fatia por vez e grava cada página no destino (NDJSON, um arquivo por
+fatia, ou a base local SQLite). O checkpoint (JSON) guarda, por fatia, o
+estado, a próxima página e a posição confirmada no destino. Ele funciona
+como fila persistente: uma execução interrompida, por Ctrl+C ou por queda
+do processo, continua na página em que parou.
+
+Uso:
+    python pncp_backfill.py --data-inicio 2023-01-01 --data-fim 2024-12-31 --destino ndjson:historico
+    python pncp_backfill.py                       # retoma o checkpoint existente
+    python pncp_backfill.py --data-inicio 2024-01-01 --uf PR,SC --destino sqlite:licitacoes_pncp.sqlite3
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import re
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import config
+from pncp_busca import remover_acentos
+from pncp_consultas import expandir_lista, janelas_mensais
+from pncp_registro import para_json
+
+
+# Mais antigas primeiro: publicações novas entram no fim e não deslocam as páginas já gravadas
+ORDENACAO = 'data_publicacao_pncp,asc'
+
+
+def _identificador(uf: Optional[str], data_inicio: str, modalidade: Optional[str]) -> str:
+    """Nome da fatia, também usado como nome de arquivo (ex: 'PR_2024-03_pregao-eletronico')"""
+    partes = [uf or 'BR', data_inicio[:7]]
+    if modalidade:
+        partes.append(re.sub(r'[^0-9a-z]+', '-', remover_acentos(modalidade).lower()).strip('-'))
+    return '_'.join(partes)
+
+
+def montar_fatias(data_inicio: str,
+                  data_fim: Optional[str] = None,
+                  uf: Optional[str] = 'todas',
+                  modalidade: Optional[str] = None) -> List[Dict]:
+    """
+    Divide a carga em fatias UF x mês x modalidade
+
+    `uf` e `modalidade` aceitam listas separadas por vírgula e 'todas'
+    (config.ESTADOS_BRASIL e config.MODALIDADES_DISPONIVEIS); sem
+    modalidade, cada fatia traz todas as modalidades do mês.
+
+    Returns:
+        Lista de fatias (dicts com 'id', os filtros e o progresso inicial)
+    """
+    fatias = []
+    for uf_, modalidade_, (inicio, fim) in itertools.product(
+            expandir_lista(uf, config.ESTADOS_BRASIL),
+            expandir_lista(modalidade, config.MODALIDADES_DISPONIVEIS),
+            janelas_mensais(data_inicio, data_fim)):
+        fatias.append({
+            'id': _identificador(uf_, inicio, modalidade_),
+            'uf': uf_,
+            'modalidade': modalidade_,
+            'data_inicio': inicio,
+            'data_fim': fim,
+            'estado': 'pendente',
+            'pagina': 1,
+            'posicao': None,
+            'registros': 0,
+            'paginas': 0,
+            'segundos': 0.0,
+            'total': None,
+            'erro': None,
+        })
+    return fatias
+
+
+class CheckpointBackfill:
+    """
+    Fatias da carga e o progresso de cada uma, gravados em um arquivo JSON
+
+    Só o processo principal grava o arquivo (de forma atômica). As
+    gravações de progresso são espaçadas em `intervalo` segundos; mudanças
+    de estado de uma fatia são gravadas na hora.
+    """
+
+    def __init__(self, caminho: str = config.BACKFILL_CHECKPOINT,
+                 intervalo: float = config.BACKFILL_CHECKPOINT_SEGUNDOS):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.parametros: Dict = {}
+        self.fatias: Dict[str, Dict] = {}
+        self._gravado_em = 0.0
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            self.parametros = dados['parametros']
+            self.fatias = {fatia['id']: fatia for fatia in dados['fatias']}
+
+    def iniciar(self, parametros: Dict, fatias: List[Dict]):
+        self.parametros = parametros
+        self.fatias = {fatia['id']: fatia for fatia in fatias}
+        self.salvar()
+
+    def pendentes(self) -> List[Dict]:
+        """Fatias ainda não concluídas (as que falharam são tentadas de novo)"""
+        return [fatia for fatia in self.fatias.values() if fatia['estado'] != 'concluida']
+
+    def atualizar(self, ident: str, **campos):
+        self.fatias[ident].update(campos)
+
+    def salvar(self, forcar: bool = True):
+        agora = time.monotonic()
+        if not forcar and agora - self._gravado_em < self.intervalo:
+            return
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': self.parametros, 'fatias': list(self.fatias.values())},
+                      f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+        self._gravado_em = agora
+
+
+class DestinoBackfill:
+    """
+    Destino dos registros da carga histórica
+
+    Cada processo recebe uma cópia do destino (ele precisa ser serializável
+    com pickle) e trabalha em uma fatia por vez: abrir(), gravar() e
+    confirmar() a cada página, fechar() no fim. A posição devolvida por
+    confirmar() vai para o checkpoint; ao retomar, abrir() a recebe de
+    volta e deve descartar o que foi gravado depois dela, ou a gravação
+    precisa ser idempotente (uma página pode ser gravada de novo).
+    """
+
+    formato = ''
+
+    def __init__(self, alvo: str):
+        self.alvo = alvo
+
+    def preparar(self):
+        """Chamado uma vez no processo principal, antes de iniciar os processos"""
+
+    def abrir(self, fatia: str, posicao):
+        raise NotImplementedError
+
+    def gravar(self, registros: List[Dict]):
+        raise NotImplementedError
+
+    def confirmar(self):
+        """Torna a página durável e devolve a posição a guardar no checkpoint"""
+        return None
+
+    def fechar(self):
+        pass
+
+
+class DestinoNDJSON(DestinoBackfill):
+    """Um arquivo NDJSON por fatia no diretório `alvo`; a posição é o tamanho do arquivo"""
+
+    formato = 'ndjson'
+
+    def preparar(self):
+        os.makedirs(self.alvo, exist_ok=True)
+
+    def abrir(self, fatia: str, posicao):
+        caminho = os.path.join(self.alvo, f"{fatia}.ndjson")
+        self._arquivo = open(caminho, 'ab')
+        # Linhas gravadas depois do último checkpoint serão pedidas de novo
+        self._arquivo.truncate(posicao or 0)
+        self._arquivo.seek(posicao or 0)
+
+    def gravar(self, registros: List[Dict]):
+        self._arquivo.write(''.join(json.dumps(registro, ensure_ascii=False, default=para_json) + '\n'
+                                    for registro in registros).encode('utf-8'))
+
+    def confirmar(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        return self._arquivo.tell()
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class DestinoSQLite(DestinoBackfill):
+    """
+    Base local (ArmazemLocal) no arquivo `alvo`; o upsert torna a regravação inofensiva
+
+    Os processos gravam no mesmo arquivo, um de cada vez: cada um espera até
+    config.BACKFILL_SQLITE_TIMEOUT segundos pela vez, em vez dos 5 segundos
+    padrão, para que a disputa não marque a fatia como falha.
+    """
+
+    formato = 'sqlite'
+
+    def preparar(self):
+        from pncp_store import ArmazemLocal
+
+        # Cria o esquema antes que vários processos abram a base ao mesmo tempo
+        ArmazemLocal(self.alvo, timeout=config.BACKFILL_SQLITE_TIMEOUT).fechar()
+
+    def abrir(self, fatia: str, posicao):
+        from pncp_store import ArmazemLocal
+
+        self._armazem = ArmazemLocal(self.alvo, timeout=config.BACKFILL_SQLITE_TIMEOUT)
+
+    def gravar(self, registros: List[Dict]):
+        self._armazem.salvar(registros)
+
+    def fechar(self):
+        self._armazem.fechar()
+
+
+DESTINOS = {
+    'ndjson': DestinoNDJSON,
+    'sqlite': DestinoSQLite,
+}
+
+
+def criar_destino(especificacao: str) -> DestinoBackfill:
+    """
+    Destino a partir de 'formato:alvo' (ex: 'ndjson:historico', 'sqlite:base.sqlite3')
+
+    Raises:
+        ValueError: se o formato não estiver em DESTINOS
+    """
+    formato, _, alvo = especificacao.partition(':')
+    if formato not in DESTINOS or not alvo:
+        raise ValueError(f"Destino inválido: {especificacao} (use {', '.join(f'{f}:alvo' for f in DESTINOS)})")
+    return DESTINOS[formato](alvo)
+
+
+# Estado de cada processo de trabalho, criado por _iniciar_processo
+_PROCESSO: Dict = {}
+
+
+def _iniciar_processo(fila, parar, destino: DestinoBackfill, tamanho_pagina: int, tentativas: int):
+    from pncp_http import SessaoPNCP
+    from pncp_licitacoes import PNCPClient
+
+    # Ctrl+C é tratado pelo processo principal, que pede a parada pelo evento `parar`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Sem o cache local: cada página é lida uma única vez
+    sessao = SessaoPNCP(cache=False, max_tentativas=tentativas)
+    _PROCESSO.update(fila=fila, parar=parar, destino=destino, tamanho_pagina=tamanho_pagina,
+                     client=PNCPClient(sessao))
+
+
+def _processar_fatia(fatia: Dict):
+    """
+    Lê as páginas da fatia a partir da guardada no checkpoint, gravando cada uma no destino
+
+    O progresso vai para o processo principal pela fila: ('pagina', id, dados)
+    a cada página confirmada e, no fim, ('concluida' | 'interrompida' | 'falhou', id, erro).
+    """
+    fila, parar, destino = _PROCESSO['fila'], _PROCESSO['parar'], _PROCESSO['destino']
+    ident = fatia['id']
+    if parar.is_set():
+        fila.put(('interrompida', ident, None))
+        return
+    fila.put(('iniciada', ident, None))
+    try:
+        destino.abrir(ident, fatia['posicao'])
+        try:
+            pagina = fatia['pagina']
+            inicio = time.perf_counter()
+            for resultado in _PROCESSO['client'].iterar_paginas(
+                    pagina_inicial=pagina,
+                    tamanho_pagina=_PROCESSO['tamanho_pagina'],
+                    ordenacao=ORDENACAO,
+                    uf=fatia['uf'],
+                    modalidade=fatia['modalidade'],
+                    data_inicio=fatia['data_inicio'],
+                    data_fim=fatia['data_fim']):
+                itens = resultado.get('items') or []
+                destino.gravar(itens)
+                posicao = destino.confirmar()
+                pagina += 1
+                agora = time.perf_counter()
+                fila.put(('pagina', ident, {'pagina': pagina, 'posicao': posicao, 'registros': len(itens),
+                                            'segundos': agora - inicio, 'total': resultado.get('total')}))
+                inicio = agora
+                if parar.is_set():
+                    fila.put(('interrompida', ident, None))
+                    return
+        finally:
+            destino.fechar()
+    except Exception as e:
+        fila.put(('falhou', ident, str(e)))
+        return
+    fila.put(('concluida', ident, None))
+
+
+def _descrever(fatia: Dict) -> str:
+    return ' '.join(str(v) for v in (fatia['uf'] or 'BR', fatia['data_inicio'][:7], fatia['modalidade']) if v)
+
+
+def executar_backfill(checkpoint: CheckpointBackfill,
+                      destino: DestinoBackfill,
+                      processos: int = config.BACKFILL_PROCESSOS,
+                      tamanho_pagina: int = config.MAX_PAGE_SIZE,
+                      tentativas: int = config.MAX_RETRIES,
+                      relatorio: float = config.BACKFILL_RELATORIO_SEGUNDOS,
+                      avisar: Callable[[str], None] = print) -> Dict:
+    """
+    Processa as fatias pendentes do checkpoint em até `processos` processos
+
+    O checkpoint é atualizado a cada página confirmada no destino (gravado
+    no máximo a cada checkpoint.intervalo segundos) e na conclusão de cada
+    fatia. Ao fim de cada fatia é informada sua vazão; a cada `relatorio`
+    segundos, o progresso geral. Com Ctrl+C, as fatias em andamento
+    terminam a página atual e o checkpoint é gravado antes de sair.
+
+    Returns:
+        Dict com 'concluidas', 'falharam', 'pendentes', 'registros' (nesta
+        execução), 'segundos' e 'interrompido'
+    """
+    pendentes = checkpoint.pendentes()
+    total_fatias = len(checkpoint.fatias)
+    concluidas = total_fatias - len(pendentes)
+    falharam = 0
+    registros = 0
+    em_andamento = set()
+    interrompido = False
+    inicio = time.perf_counter()
+    ultimo_relatorio = inicio
+
+    destino.preparar()
+    fila = multiprocessing.Queue()
+    parar = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=max(1, processos), initializer=_iniciar_processo,
+                                   initargs=(fila, parar, destino, tamanho_pagina, tentativas))
+    futuros = []
+    esperar = True
+    try:
+        futuros = [executor.submit(_processar_fatia, fatia) for fatia in pendentes]
+        abertas = len(futuros)
+        while abertas:
+            try:
+                try:
+                    tipo, ident, dados = fila.get(timeout=0.5)
+                except queue.Empty:
+                    # Um processo que morreu não avisa pela fila: o executor marca os futuros
+                    for futuro in futuros:
+                        if futuro.done() and not futuro.cancelled() and futuro.exception():
+                            raise futuro.exception()
+                    tipo = None
+            except KeyboardInterrupt:
+                if interrompido:
+                    raise
+                interrompido = True
+                parar.set()
+                canceladas = sum(futuro.cancel() for futuro in futuros)
+                abertas -= canceladas
+                avisar(f"\n⚠ Interrompendo: {len(em_andamento)} fatia(s) terminam a página atual "
+                       f"(Ctrl+C de novo encerra sem esperar)")
+                continue
+
+            if tipo == 'iniciada':
+                em_andamento.add(ident)
+            elif tipo == 'pagina':
+                fatia = checkpoint.fatias[ident]
+                checkpoint.atualizar(ident, pagina=dados['pagina'], posicao=dados['posicao'],
+                                     registros=fatia['registros'] + dados['registros'],
+                                     paginas=fatia['paginas'] + 1,
+                                     segundos=fatia['segundos'] + dados['segundos'],
+                                     total=dados['total'])
+                registros += dados['registros']
+                checkpoint.salvar(forcar=False)
+            elif tipo is not None:
+                abertas -= 1
+                em_andamento.discard(ident)
+                fatia = checkpoint.fatias[ident]
+                if tipo == 'concluida':
+                    concluidas += 1
+                    checkpoint.atualizar(ident, estado='concluida', erro=None)
+                    vazao = fatia['registros'] / fatia['segundos'] if fatia['segundos'] else 0.0
+                    avisar(f"✓ [{concluidas}/{total_fatias}] {_descrever(fatia)}: {fatia['registros']} registros, "
+                           f"{fatia['paginas']} páginas em {fatia['segundos']:.1f}s ({vazao:.0f} registros/s)")
+                elif tipo == 'falhou':
+                    falharam += 1
+                    checkpoint.atualizar(ident, estado='falhou', erro=dados)
+                    avisar(f"✗ {_descrever(fatia)}: {dados} (parou na página {fatia['pagina']})")
+                checkpoint.salvar()
+
+            agora = time.perf_counter()
+            if agora - ultimo_relatorio >= relatorio:
+                ultimo_relatorio = agora
+                avisar(f"… {concluidas}/{total_fatias} fatias concluídas, {len(em_andamento)} em andamento; "
+                       f"{registros} registros nesta execução ({registros / (agora - inicio):.0f} registros/s)")
+    except BaseException:
+        # Ctrl+C duplo ou processo morto: as fatias restantes não são esperadas
+        esperar = False
+        parar.set()
+        for futuro in futuros:
+            futuro.cancel()
+        raise
+    finally:
+        checkpoint.salvar()
+        executor.shutdown(wait=esperar)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'concluidas': concluidas,
+        'falharam': falharam,
+        'pendentes': len(checkpoint.pendentes()),
+        'registros': registros,
+        'segundos': segundos,
+        'interrompido': interrompido,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Carga histórica do PNCP em fatias UF x mês x modalidade, retomável')
+    parser.add_argument('--data-inicio', help='Início do período (YYYY-MM-DD); sem ele, retoma o checkpoint')
+    parser.add_argument('--data-fim', help='Fim do período (YYYY-MM-DD; padrão: hoje)')
+    parser.add_argument('--uf', default='todas', help='UFs das fatias (ex: PR,SP; padrão: todas)')
+    parser.add_argument('--modalidade',
+                        help='Modalidades das fatias (lista separada por vírgula ou todas; padrão: sem divisão)')
+    parser.add_argument('--destino', default='ndjson:historico',
+                        help=f"Onde gravar, como formato:alvo ({', '.join(DESTINOS)}; padrão: ndjson:historico)")
+    parser.add_argument('--checkpoint', default=config.BACKFILL_CHECKPOINT,
+                        help='Arquivo com as fatias e o progresso de cada uma')
+    parser.add_argument('--processos', type=int, default=config.BACKFILL_PROCESSOS,
+                        help='Fatias processadas em paralelo (um processo por fatia)')
+    parser.add_argument('--tamanho', type=int, default=config.MAX_PAGE_SIZE, help='Itens por página')
+    parser.add_argument('--tentativas', type=int, default=config.MAX_RETRIES,
+                        help='Novas tentativas após falhas transitórias (backoff exponencial)')
+    args = parser.parse_args()
+
+    checkpoint = CheckpointBackfill(args.checkpoint)
+    if args.data_inicio:
+        parametros = {
+            'data_inicio': args.data_inicio,
+            # Sem --data-fim, vale o fim gravado no checkpoint (a carga pode ter começado ontem)
+            'data_fim': args.data_fim or checkpoint.parametros.get('data_fim') or time.strftime('%Y-%m-%d'),
+            'uf': args.uf,
+            'modalidade': args.modalidade,
+            'destino': args.destino,
+            'tamanho': args.tamanho,
+        }
+        if not checkpoint.fatias:
+            try:
+                criar_destino(args.destino)
+            except ValueError as e:
+                parser.error(str(e))
+            try:
+                fatias = montar_fatias(parametros['data_inicio'], parametros['data_fim'], args.uf, args.modalidade)
+            except ValueError as e:
+                parser.error(f"data inválida: {e}")
+            checkpoint.iniciar(parametros, fatias)
+        elif checkpoint.parametros != parametros:
+            print(f"✗ {args.checkpoint} pertence a outra carga ({checkpoint.parametros}); "
+                  f"rode sem --data-inicio para retomá-la ou use outro --checkpoint")
+            sys.exit(1)
+    elif not checkpoint.fatias:
+        parser.error(f"{args.checkpoint} não existe: informe --data-inicio para iniciar uma carga")
+
+    parametros = checkpoint.parametros
+    try:
+        destino = criar_destino(parametros['destino'])
+    except ValueError as e:
+        parser.error(str(e))
+
+    pendentes = len(checkpoint.pendentes())
+    retomada = pendentes < len(checkpoint.fatias) or any(f['paginas'] for f in checkpoint.pendentes())
+    print(f"{'Retomando' if retomada else 'Iniciando'} a carga {parametros['data_inicio']} a {parametros['data_fim']}: "
+          f"{pendentes} de {len(checkpoint.fatias)} fatias pendentes, {args.processos} processos, "
+          f"destino {parametros['destino']}")
+    if not pendentes:
+        print("✓ Nada a fazer: todas as fatias já foram concluídas")
+        return
+
+    try:
+        resumo = executar_backfill(checkpoint, destino, processos=args.processos,
+                                   tamanho_pagina=parametros['tamanho'], tentativas=args.tentativas)
+    except KeyboardInterrupt:
+        print(f"\nInterrompido; o progresso está em {args.checkpoint}.")
+        sys.exit(130)
+    except Exception as e:
+        # Ex: um processo de trabalho morreu (BrokenProcessPool)
+        print(f"✗ A carga parou: {e!r}; rode de novo para retomar de {args.checkpoint}")
+        sys.exit(1)
+
+    print(f"\n{resumo['registros']} registros em {resumo['segundos']:.1f}s "
+          f"({resumo['registros'] / resumo['segundos']:.0f} registros/s); "
+          f"{resumo['concluidas']} fatias concluídas, {resumo['falharam']} com falha, "
+          f"{resumo['pendentes']} pendentes")
+    if resumo['interrompido']:
+        print(f"Interrompido; rode de novo para retomar de {args.checkpoint}.")
+        sys.exit(130)
+    if resumo['pendentes']:
+        print("✗ Há fatias pendentes; rode de novo para tentá-las outra vez")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Normalização de texto em português para a busca textual
+(remoção de acentos, palavras vazias e redução a radicais)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+
+_RE_NAO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+PALAVRAS_VAZIAS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelas pelo pelos
+por que se sem sob sobre um uma umas uns n
+""".split())
+
+# Regras aplicadas sobre palavras já sem acento, em ordem; cada regra é
+# (sufixo, substituição, tamanho mínimo do radical restante)
+_REGRAS_PLURAL = [
+    ('oes', 'ao', 1), ('aes', 'ao', 1), ('ais', 'al', 1), ('eis', 'el', 2),
+    ('ois', 'ol', 1), ('les', 'l', 2), ('res', 'r', 2), ('ns', 'm', 1), ('s', '', 2),
+]
+_REGRAS_FEMININO = [
+    ('inha', 'inho', 3), ('eira', 'eiro', 3), ('ona', 'ao', 3), ('ora', 'or', 3),
+    ('osa', 'oso', 3), ('ica', 'ico', 3), ('ada', 'ado', 2), ('ida', 'ido', 3),
+    ('iva', 'ivo', 3), ('ima', 'imo', 3), ('esa', 'es', 3),
+]
+_REGRAS_ADVERBIO = [('mente', '', 4)]
+_REGRAS_GRAU = [('issimo', '', 3), ('zinho', '', 3), ('inho', '', 3), ('zao', '', 2)]
+_REGRAS_SUBSTANTIVO = [
+    ('amento', '', 3), ('imento', '', 3), ('mento', '', 4), ('acao', '', 3), ('icao', '', 3),
+    ('ucao', '', 3), ('cao', '', 3), ('idade', '', 4), ('ancia', '', 3), ('encia', '', 3),
+    ('ismo', '', 3), ('ista', '', 4), ('avel', '', 2), ('ivel', '', 3), ('ador', '', 3),
+    ('edor', '', 3), ('idor', '', 3), ('ante', '', 2), ('ente', '', 3), ('ario', '', 3),
+    ('orio', '', 3), ('eiro', '', 3), ('ico', '', 4), ('ivo', '', 4), ('oso', '', 3),
+]
+_REGRAS_VERBO = [
+    ('ariam', '', 2), ('eriam', '', 2), ('iriam', '', 2), ('aram', '', 2), ('eram', '', 2),
+    ('iram', '', 2), ('ando', '', 2), ('endo', '', 3), ('indo', '', 3), ('ado', '', 2),
+    ('ido', '', 3), ('ava', '', 2), ('ar', '', 2), ('er', '', 2), ('ir', '', 3), ('ou', '', 3),
+]
+_REGRAS_VOGAL = [('a', '', 3), ('e', '', 3), ('o', '', 3)]
+
+
+def remover_acentos(texto: str) -> str:
+    """Remove acentos e cedilhas ('Licitação' -> 'Licitacao')"""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos e apenas letras/dígitos separados por espaço"""
+    if not texto:
+        return ''
+    return _RE_NAO_ALFANUMERICO.sub(' ', remover_acentos(texto).lower()).strip()
+
+
+def _aplicar(palavra: str, regras) -> tuple:
+    for sufixo, substituicao, minimo in regras:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= minimo:
+            return palavra[:-len(sufixo)] + substituicao, True
+    return palavra, False
+
+
+@lru_cache(maxsize=65536)
+def radical(palavra: str) -> str:
+    """
+    Reduz uma palavra normalizada ao seu radical (versão enxuta do RSLP)
+
+    'credenciamento', 'credenciar' e 'credenciada' viram 'credenci'.
+    """
+    if len(palavra) <= 3 or palavra.isdigit():
+        return palavra
+
+    palavra, _ = _aplicar(palavra, _REGRAS_PLURAL)
+    palavra, _ = _aplicar(palavra, _REGRAS_FEMININO)
+    palavra, _ = _aplicar(palavra, _REGRAS_ADVERBIO)
+    palavra, _ = _aplicar(palavra, _REGRAS_GRAU)
+    palavra, removido = _aplicar(palavra, _REGRAS_SUBSTANTIVO)
+    if not removido:
+        palavra, removido = _aplicar(palavra, _REGRAS_VERBO)
+    if not removido:
+        palavra, _ = _aplicar(palavra, _REGRAS_VOGAL)
+    return palavra
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Radicais das palavras do texto, sem palavras vazias"""
+    return [radical(p) for p in normalizar_texto(texto).split() if p not in PALAVRAS_VAZIAS]
+
+
+def texto_indexavel(texto: str) -> str:
+    """Texto reduzido a radicais, no formato gravado no índice"""
+    return ' '.join(tokenizar(texto))
+
+
+def consulta_fts(termo: str) -> str:
+    """
+    Converte o termo digitado em expressão MATCH do FTS5
+
+    Todas as palavras precisam aparecer (E lógico); a última também casa
+    como prefixo, para permitir palavras incompletas.
+    """
+    radicais = tokenizar(termo)
+    if not radicais:
+        return ''
+    partes = [f'"{r}"' for r in radicais[:-1]]
+    partes.append(f'"{radicais[-1]}"*')
+    return ' '.join(partes)
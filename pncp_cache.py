@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de respostas HTTP (SQLite) compartilhado pelos clientes do PNCP
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import config
+
+
+# Cabeçalhos que não fazem sentido em uma resposta servida do cache
+# (o corpo já está descomprimido e completo)
+_CABECALHOS_IGNORADOS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+def normalizar_url(url: str, params: Optional[Dict] = None) -> str:
+    """
+    Normaliza URL e parâmetros para uso como chave de cache
+
+    Esquema e host em minúsculas, fragmento descartado e parâmetros
+    (da URL e de `params`) ordenados, ignorando valores None.
+    """
+    partes = urlsplit(url)
+    consulta = parse_qsl(partes.query, keep_blank_values=True)
+    for chave, valor in (params or {}).items():
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple)):
+            consulta.extend((chave, str(v)) for v in valor)
+        else:
+            consulta.append((chave, str(valor)))
+
+    return urlunsplit((
+        partes.scheme.lower(),
+        partes.netloc.lower(),
+        partes.path or '/',
+        urlencode(sorted(consulta)),
+        ''
+    ))
+
+
+class CacheRespostas:
+    """
+    Cache em disco de respostas HTTP com expiração (TTL) e remoção LRU
+
+    As entradas ficam em um banco SQLite em `diretorio`; quando o total
+    armazenado passa de `max_bytes`, as menos acessadas recentemente são
+    removidas. Pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self,
+                 diretorio: str = config.CACHE_DIR,
+                 ttl: int = config.CACHE_TTL,
+                 max_bytes: int = config.CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.removidos = 0
+
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = os.path.join(diretorio, 'respostas.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                cabecalhos TEXT NOT NULL,
+                encoding TEXT,
+                conteudo BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_respostas_acesso ON respostas (acessado_em)')
+        # Total armazenado mantido por gatilhos, na mesma transação de cada
+        # gravação ou remoção (vale também para outros processos no mesmo cache)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS total (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO total VALUES (1, 0);
+            CREATE TRIGGER IF NOT EXISTS respostas_total_ai AFTER INSERT ON respostas BEGIN
+                UPDATE total SET bytes = bytes + new.tamanho WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS respostas_total_ad AFTER DELETE ON respostas BEGIN
+                UPDATE total SET bytes = bytes - old.tamanho WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS respostas_total_au AFTER UPDATE OF tamanho ON respostas BEGIN
+                UPDATE total SET bytes = bytes - old.tamanho + new.tamanho WHERE id = 1;
+            END;
+        """)
+        # A soma completa só na abertura (também corrige caches de versões sem a tabela)
+        self._conn.execute('UPDATE total SET bytes = (SELECT COALESCE(SUM(tamanho), 0) FROM respostas) WHERE id = 1')
+
+    @staticmethod
+    def chave(metodo: str, url: str, params: Optional[Dict] = None) -> str:
+        """Gera a chave de cache para a requisição"""
+        normalizada = f"{metodo.upper()} {normalizar_url(url, params)}"
+        return hashlib.sha256(normalizada.encode('utf-8')).hexdigest()
+
+    def obter(self, chave: str) -> Optional[requests.Response]:
+        """Retorna a resposta armazenada, ou None se ausente ou expirada"""
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute(
+                'SELECT url, status, cabecalhos, encoding, conteudo, criado_em FROM respostas WHERE chave = ?',
+                (chave,)
+            ).fetchone()
+
+            if linha is None:
+                self.falhas += 1
+                return None
+
+            url, status, cabecalhos, encoding, conteudo, criado_em = linha
+            if agora - criado_em > self.ttl:
+                self._conn.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+                self.expirados += 1
+                self.falhas += 1
+                return None
+
+            self._conn.execute('UPDATE respostas SET acessado_em = ? WHERE chave = ?', (agora, chave))
+            self.acertos += 1
+
+        resposta = requests.Response()
+        resposta.status_code = status
+        resposta.headers = CaseInsensitiveDict(json.loads(cabecalhos))
+        resposta.encoding = encoding
+        resposta.url = url
+        resposta._content = conteudo
+        resposta.from_cache = True
+        return resposta
+
+    def armazenar(self, chave: str, resposta: requests.Response):
+        """Armazena a resposta (apenas status 200) e aplica o limite de tamanho"""
+        if resposta.status_code != 200:
+            return
+
+        conteudo = resposta.content
+        if len(conteudo) > self.max_bytes:
+            return
+
+        cabecalhos = {k: v for k, v in resposta.headers.items() if k.lower() not in _CABECALHOS_IGNORADOS}
+        agora = time.time()
+        with self._lock:
+            # Upsert em vez de INSERT OR REPLACE: a remoção implícita do REPLACE não dispara gatilhos
+            self._conn.execute(
+                'INSERT INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(chave) DO UPDATE SET url = excluded.url, status = excluded.status, '
+                'cabecalhos = excluded.cabecalhos, encoding = excluded.encoding, conteudo = excluded.conteudo, '
+                'tamanho = excluded.tamanho, criado_em = excluded.criado_em, acessado_em = excluded.acessado_em',
+                (chave, resposta.url, resposta.status_code, json.dumps(cabecalhos), resposta.encoding,
+                 conteudo, len(conteudo), agora, agora)
+            )
+            self._remover_excedente()
+
+    def _remover_excedente(self):
+        """Remove as entradas menos acessadas até caber em max_bytes"""
+        total = self._conn.execute('SELECT bytes FROM total WHERE id = 1').fetchone()[0]
+        while total > self.max_bytes:
+            # Em lotes: em geral poucas entradas precisam sair
+            lote = self._conn.execute(
+                'SELECT chave, tamanho FROM respostas ORDER BY acessado_em LIMIT 32').fetchall()
+            if not lote:
+                break
+            for chave, tamanho in lote:
+                self._conn.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+                self.removidos += 1
+                total -= tamanho
+                if total <= self.max_bytes:
+                    break
+
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._conn.execute('DELETE FROM respostas')
+
+    def estatisticas(self) -> Dict:
+        """Contadores de uso do cache"""
+        with self._lock:
+            entradas, tamanho = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas').fetchone()
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'expirados': self.expirados,
+            'removidos': self.removidos,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            'entradas': entradas,
+            'tamanho_bytes': tamanho
+        }
+
+
+_cache_padrao: Optional[CacheRespostas] = None
+_cache_padrao_lock = threading.Lock()
+
+
+def obter_cache_padrao() -> Optional[CacheRespostas]:
+    """Cache compartilhado do processo, ou None se config.CACHE_ENABLED for falso"""
+    global _cache_padrao
+    if not config.CACHE_ENABLED:
+        return None
+    with _cache_padrao_lock:
+        if _cache_padrao is None:
+            _cache_padrao = CacheRespostas()
+        return _cache_padrao
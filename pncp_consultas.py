@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Planejamento e execução concorrente de múltiplas consultas ao PNCP
+(combinações de UFs, modalidades, situações e janelas de datas) e corrida
+entre fontes equivalentes (API x web)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import itertools
+import queue
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+
+
+def expandir_lista(valor: Optional[str], todos: Optional[Iterable[str]] = None) -> List[Optional[str]]:
+    """
+    Converte um argumento separado por vírgulas em lista de valores
+
+    Args:
+        valor: Texto como 'PR,SP,SC' (None = sem filtro)
+        todos: Valores usados quando `valor` for 'todas' ou 'todos'
+
+    Returns:
+        Lista de valores; [None] quando não há filtro
+    """
+    if not valor:
+        return [None]
+    if todos is not None and valor.strip().lower() in ('todas', 'todos'):
+        return list(todos)
+
+    valores = [v.strip() for v in valor.split(',') if v.strip()]
+    # Remover repetições preservando a ordem
+    return list(dict.fromkeys(valores)) or [None]
+
+
+def janelas_de_datas(data_inicio: Optional[str],
+                     data_fim: Optional[str],
+                     dias: Optional[int]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Divide o período [data_inicio, data_fim] em janelas de `dias` dias
+
+    Args:
+        data_inicio: Data de início (YYYY-MM-DD)
+        data_fim: Data de fim (YYYY-MM-DD); hoje, se omitida
+        dias: Tamanho de cada janela (None = período inteiro)
+
+    Returns:
+        Lista de pares (data_inicio, data_fim) no formato YYYY-MM-DD
+    """
+    if not dias or not data_inicio:
+        return [(data_inicio, data_fim)]
+
+    inicio = date.fromisoformat(data_inicio)
+    fim = date.fromisoformat(data_fim) if data_fim else date.today()
+
+    janelas = []
+    while inicio <= fim:
+        fim_janela = min(inicio + timedelta(days=dias - 1), fim)
+        janelas.append((inicio.isoformat(), fim_janela.isoformat()))
+        inicio = fim_janela + timedelta(days=1)
+    return janelas
+
+
+def janelas_mensais(data_inicio: str, data_fim: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Divide o período [data_inicio, data_fim] nos meses do calendário
+
+    O primeiro e o último mês são cortados nas datas informadas.
+
+    Args:
+        data_inicio: Data de início (YYYY-MM-DD)
+        data_fim: Data de fim (YYYY-MM-DD); hoje, se omitida
+
+    Returns:
+        Lista de pares (data_inicio, data_fim) no formato YYYY-MM-DD, um por mês
+    """
+    inicio = date.fromisoformat(data_inicio)
+    fim = date.fromisoformat(data_fim) if data_fim else date.today()
+
+    janelas = []
+    while inicio <= fim:
+        proximo_mes = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+        fim_janela = min(proximo_mes - timedelta(days=1), fim)
+        janelas.append((inicio.isoformat(), fim_janela.isoformat()))
+        inicio = proximo_mes
+    return janelas
+
+
+def montar_plano(uf: Optional[str] = None,
+                 municipio: Optional[str] = None,
+                 orgao: Optional[str] = None,
+                 modalidade: Optional[str] = None,
+                 situacao: Optional[str] = None,
+                 data_inicio: Optional[str] = None,
+                 data_fim: Optional[str] = None,
+                 janela_dias: Optional[int] = None) -> List[Dict]:
+    """
+    Monta o plano de consultas (produto cartesiano dos filtros)
+
+    `uf`, `modalidade` e `situacao` aceitam listas separadas por vírgula;
+    `uf='todas'` usa todos os estados de config.ESTADOS_BRASIL.
+
+    Returns:
+        Lista de dicts de filtros, um por consulta
+    """
+    plano = []
+    for uf_, modalidade_, situacao_, (inicio, fim) in itertools.product(
+            expandir_lista(uf, config.ESTADOS_BRASIL),
+            expandir_lista(modalidade),
+            expandir_lista(situacao),
+            janelas_de_datas(data_inicio, data_fim, janela_dias)):
+        plano.append({
+            'uf': uf_,
+            'municipio': municipio,
+            'orgao': orgao,
+            'modalidade': modalidade_,
+            'situacao': situacao_,
+            'data_inicio': inicio,
+            'data_fim': fim
+        })
+    return plano
+
+
+_FIM = object()
+
+
+def executar_plano(plano: List[Dict],
+                   buscar: Callable[..., Iterable[Dict]],
+                   max_workers: int = config.MAX_WORKERS,
+                   tamanho_fila: int = 1000,
+                   erros: Optional[List[Tuple[Dict, Exception]]] = None) -> Iterator[Dict]:
+    """
+    Executa as consultas do plano em paralelo e gera um fluxo único
+
+    As consultas são divididas entre até `max_workers` threads daemon (uma
+    consulta presa em uma requisição não segura o fim do processo); os
+    registros são entregues na ordem em que chegam, por uma fila limitada
+    a `tamanho_fila`.
+
+    Args:
+        plano: Lista de filtros gerada por montar_plano
+        buscar: Função chamada como buscar(**filtros), retornando licitações
+        max_workers: Quantidade máxima de consultas simultâneas
+        tamanho_fila: Registros aguardando consumo antes de pausar as consultas
+        erros: Lista que recebe (filtros, exceção) de cada consulta que falhar
+
+    Returns:
+        Iterador de licitações (Dict) de todas as consultas
+    """
+    fila = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+
+    def colocar(item) -> bool:
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def executar(filtros: Dict):
+        try:
+            for licitacao in buscar(**filtros):
+                if not colocar(licitacao):
+                    return
+        except Exception as e:
+            if parar.is_set():
+                # Consumidor já encerrou (ex.: fluxo descartado): ninguém espera o erro
+                return
+            descricao = ', '.join(f"{k}={v}" for k, v in filtros.items() if v)
+            print(f"Erro na consulta ({descricao}): {e}")
+            if erros is not None:
+                erros.append((filtros, e))
+        finally:
+            colocar(_FIM)
+
+    a_iniciar = queue.Queue()
+    for filtros in plano:
+        a_iniciar.put(filtros)
+
+    def trabalhar():
+        while not parar.is_set():
+            try:
+                filtros = a_iniciar.get_nowait()
+            except queue.Empty:
+                return
+            executar(filtros)
+
+    for i in range(min(max(1, max_workers), len(plano))):
+        threading.Thread(target=trabalhar, name=f'pncp-consulta-{i}', daemon=True).start()
+
+    pendentes = len(plano)
+    try:
+        while pendentes:
+            item = fila.get()
+            if item is _FIM:
+                pendentes -= 1
+                continue
+            yield item
+    finally:
+        # Consumidor encerrou: as consultas ainda não iniciadas são descartadas
+        parar.set()
+
+
+def correr_com_reserva(principal: Callable[[], object],
+                       reserva: Callable[[], object],
+                       atraso: float,
+                       valido: Callable[[object], bool] = bool,
+                       cancelar: Optional[Dict[str, Callable[[], None]]] = None) -> Dict:
+    """
+    Execução com reserva (hedged request) de duas tarefas equivalentes
+
+    A tarefa `principal` começa na hora; a `reserva` começa depois de
+    `atraso` segundos sem resultado válido, ou assim que a principal
+    terminar sem resultado válido (com atraso 0, as duas começam juntas).
+    Vale o primeiro resultado aceito por `valido`; a tarefa que ainda
+    estiver rodando é cancelada com cancelar[nome]() e seu resultado,
+    descartado. As tarefas rodam em threads daemon, então uma requisição
+    em andamento na perdedora não segura o fim do processo.
+
+    Args:
+        principal, reserva: Funções sem argumentos que produzem o resultado
+        atraso: Segundos até iniciar a reserva
+        valido: Critério de resultado aceito (padrão: não vazio)
+        cancelar: Funções de cancelamento por nome ('principal', 'reserva')
+
+    Returns:
+        Dict com 'vencedor' ('principal', 'reserva' ou None se nenhuma
+        tarefa produziu resultado válido), 'resultados' (nome -> resultado
+        ou exceção, das tarefas que terminaram) e os tempos em segundos
+        desde o início: 'inicio' e 'fim' por nome (None se não terminou)
+        e 'decisao'
+    """
+    fila = queue.Queue()
+    relogio = time.perf_counter
+    comeco = relogio()
+    tarefas = {'principal': principal, 'reserva': reserva}
+    inicio: Dict[str, float] = {}
+    fim: Dict[str, Optional[float]] = {}
+    resultados: Dict[str, object] = {}
+
+    def correr(nome: str):
+        try:
+            resultado = tarefas[nome]()
+        except Exception as e:
+            resultado = e
+        fila.put((nome, resultado, relogio() - comeco))
+
+    def iniciar(nome: str):
+        inicio[nome] = relogio() - comeco
+        threading.Thread(target=correr, args=(nome,), name=f'pncp-corrida-{nome}', daemon=True).start()
+
+    iniciar('principal')
+    if atraso <= 0:
+        iniciar('reserva')
+
+    vencedor = None
+    while len(resultados) < 2:
+        try:
+            espera = None if 'reserva' in inicio else max(0.0, atraso - (relogio() - comeco))
+            nome, resultado, quando = fila.get(timeout=espera)
+        except queue.Empty:
+            iniciar('reserva')
+            continue
+        resultados[nome] = resultado
+        fim[nome] = quando
+        if not isinstance(resultado, Exception) and valido(resultado):
+            vencedor = nome
+            break
+        if 'reserva' not in inicio:
+            iniciar('reserva')
+
+    for nome in inicio:
+        if nome not in resultados and cancelar and nome in cancelar:
+            cancelar[nome]()
+    for nome in tarefas:
+        fim.setdefault(nome, None)
+
+    return {
+        'vencedor': vencedor,
+        'resultados': resultados,
+        'inicio': inicio,
+        'fim': fim,
+        'decisao': relogio() - comeco,
+    }
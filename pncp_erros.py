@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Exceções do PNCP que não dependem de requests (podem ser tratadas sem
+carregar a pilha de rede)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+
+class ErroPNCP(Exception):
+    """Falha ao consultar o PNCP (distinta de uma busca sem resultados)"""
+
+
+class RequisicaoCancelada(ErroPNCP):
+    """Requisição interrompida porque a sessão foi cancelada (ex.: perdeu a corrida API x web)"""
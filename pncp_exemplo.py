@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Licitações de exemplo (--exemplo), sem acesso à rede
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+from typing import Dict, List
+
+
+def dados_exemplo() -> List[Dict]:
+    """
+    Retorna os dados de exemplo fornecidos pelo usuário
+    para demonstração do script
+    """
+    return [
+        {
+            "id": "33eef20234def233056514e1dec9915e",
+            "index": "catalog2",
+            "doc_type": "_doc",
+            "title": "Edital nº 90039/2025",
+            "description": "Registro de preços para futuras e eventuais aquisições de eletrodomésticos, eletrônicos e utensílios de cozinha",
+            "item_url": "/compras/76105550000137/2025/85",
+            "document_type": "edital",
+            "createdAt": "2025-10-17T07:42:39.162889",
+            "numero": None,
+            "ano": "2025",
+            "numero_sequencial": "85",
+            "numero_sequencial_compra_ata": None,
+            "numero_controle_pncp": "76105550000137-1-000085/2025",
+            "orgao_id": "38904",
+            "orgao_cnpj": "76105550000137",
+            "orgao_nome": "MUNICIPIO DE MANDIRITUBA",
+            "orgao_subrogado_id": None,
+            "orgao_subrogado_nome": None,
+            "unidade_id": "58391",
+            "unidade_codigo": "455978",
+            "unidade_nome": "PREFEITURA MUNICIPAL DE MANDIRITUBA - PR",
+            "esfera_id": "M",
+            "esfera_nome": "Municipal",
+            "poder_id": "N",
+            "poder_nome": "Não se aplica",
+            "municipio_id": "4111",
+            "municipio_nome": "Mandirituba",
+            "uf": "PR",
+            "modalidade_licitacao_id": "6",
+            "modalidade_licitacao_nome": "Pregão - Eletrônico",
+            "situacao_id": "1",
+            "situacao_nome": "Divulgada no PNCP",
+            "data_publicacao_pncp": "2025-09-24T07:28:16.330332",
+            "data_atualizacao_pncp": "2025-10-17T07:42:39.136772030",
+            "data_assinatura": None,
+            "data_inicio_vigencia": "2025-09-24T08:00",
+            "data_fim_vigencia": "2025-10-30T09:00",
+            "cancelado": False,
+            "valor_global": None,
+            "tem_resultado": False,
+            "tipo_id": "1",
+            "tipo_nome": "Edital",
+            "tipo_contrato_id": None,
+            "tipo_contrato_nome": None,
+            "fonte_orcamentaria": None,
+            "fonte_orcamentaria_id": None,
+            "fonte_orcamentaria_nome": None,
+            "exigencia_conteudo_nacional": False,
+            "tipo_margem_preferencia": None,
+            "tipo_margem_preferencia_id": None,
+            "tipo_margem_preferencia_nome": None
+        },
+        {
+            "id": "7ea0d533ca27d20107d9ef5a06821ad5",
+            "index": "catalog2",
+            "doc_type": "_doc",
+            "title": "Edital de Chamamento Público nº 1/2025",
+            "description": "Credenciamento de Agências de Viagens e Turismo, objetivando o menor preço por grupo no dia da cotação, para reserva de hotéis e aquisição de passagens aéreas, incluindo cotação, reserva, emissão, entrega, transferência, endosso, marcação/remarcação e reembolso de bilhetes de passagens aéreas para trechos nacionais",
+            "item_url": "/compras/00942395000141/2025/10",
+            "document_type": "edital",
+            "createdAt": "2025-08-15T16:12:04.256732",
+            "numero": None,
+            "ano": "2025",
+            "numero_sequencial": "10",
+            "numero_sequencial_compra_ata": None,
+            "numero_controle_pncp": "00942395000141-1-000010/2025",
+            "orgao_id": "48015",
+            "orgao_cnpj": "00942395000141",
+            "orgao_nome": "CAMARA MUNICIPAL DE MANDIRITUBA",
+            "orgao_subrogado_id": None,
+            "orgao_subrogado_nome": None,
+            "unidade_id": "2455820",
+            "unidade_codigo": "930228",
+            "unidade_nome": "CAMARA MUNICIPAL DE MANDIRITUBA - PR",
+            "esfera_id": "M",
+            "esfera_nome": "Municipal",
+            "poder_id": "L",
+            "poder_nome": "Legislativo",
+            "municipio_id": "4111",
+            "municipio_nome": "Mandirituba",
+            "uf": "PR",
+            "modalidade_licitacao_id": "12",
+            "modalidade_licitacao_nome": "Credenciamento",
+            "situacao_id": "1",
+            "situacao_nome": "Divulgada no PNCP",
+            "data_publicacao_pncp": "2025-08-15T16:12:02.065839",
+            "data_atualizacao_pncp": "2025-08-15T16:12:02.065839",
+            "data_assinatura": None,
+            "data_inicio_vigencia": "2025-08-19T08:00",
+            "data_fim_vigencia": "2026-08-19T08:00",
+            "cancelado": False,
+            "valor_global": None,
+            "tem_resultado": False,
+            "tipo_id": "4",
+            "tipo_nome": "Edital de Chamamento Público",
+            "tipo_contrato_id": None,
+            "tipo_contrato_nome": None,
+            "fonte_orcamentaria": None,
+            "fonte_orcamentaria_id": None,
+            "fonte_orcamentaria_nome": None,
+            "exigencia_conteudo_nacional": False,
+            "tipo_margem_preferencia": None,
+            "tipo_margem_preferencia_id": None,
+            "tipo_margem_preferencia_nome": None
+        },
+        {
+            "id": "865c14e7edc4768d63dc2ec5f8dba240",
+            "index": "catalog2",
+            "doc_type": "_doc",
+            "title": "Edital de Chamamento Público nº 1/2026",
+            "description": "CREDENCIAMENTO DE PESSOA(S) FÍSICA(S), EMPRESÁRIOS UNIPESSOAL (SLU) E PESSOA(S) JURÍDICA(S) PARA PRESTAÇÃO DOS SEGUINTES SERVIÇOS: PEDIATRIA, PSIQUIATRIA, NEUROLOGIA, NEUROPEDIATRIA, GINECOLOGIA, ENFERMAGEM E PLANTÕES MÉDICOS (CLÍNICO GERAL), MÉDICO CLINICO GERAL, PLANTÕES DE ENFERMEIROS, PLANTÕES DE TÉCNICOS EM ENFERMAGEM, A SEREM REALIZADOS NO HOSPITAL MUNICIPAL DE MANDIRITUBA (AMBULATÓRIO E UNIDADE DE PRONTO ATENDIMENTO) 24 HORAS, POLICLÍNICA MUNICIPAL E CENTRO DE ATENÇÃO PSICOSSOCIAL (CAPS).",
+            "item_url": "/compras/76105550000137/2026/1",
+            "document_type": "edital",
+            "createdAt": "2025-03-31T15:20:47.325071",
+            "numero": None,
+            "ano": "2026",
+            "numero_sequencial": "1",
+            "numero_sequencial_compra_ata": None,
+            "numero_controle_pncp": "76105550000137-1-000001/2026",
+            "orgao_id": "38904",
+            "orgao_cnpj": "76105550000137",
+            "orgao_nome": "MUNICIPIO DE MANDIRITUBA",
+            "orgao_subrogado_id": None,
+            "orgao_subrogado_nome": None,
+            "unidade_id": "58391",
+            "unidade_codigo": "455978",
+            "unidade_nome": "PREFEITURA MUNICIPAL DE MANDIRITUBA - PR",
+            "esfera_id": "M",
+            "esfera_nome": "Municipal",
+            "poder_id": "N",
+            "poder_nome": "Não se aplica",
+            "municipio_id": "4111",
+            "municipio_nome": "Mandirituba",
+            "uf": "PR",
+            "modalidade_licitacao_id": "12",
+            "modalidade_licitacao_nome": "Credenciamento",
+            "situacao_id": "1",
+            "situacao_nome": "Divulgada no PNCP",
+            "data_publicacao_pncp": "2025-03-31T15:20:00.784926",
+            "data_atualizacao_pncp": "2025-03-31T15:20:00.784926",
+            "data_assinatura": None,
+            "data_inicio_vigencia": "2025-04-01T08:00",
+            "data_fim_vigencia": "2025-12-31T18:00",
+            "cancelado": False,
+            "valor_global": None,
+            "tem_resultado": False,
+            "tipo_id": "4",
+            "tipo_nome": "Edital de Chamamento Público",
+            "tipo_contrato_id": None,
+            "tipo_contrato_nome": None,
+            "fonte_orcamentaria": "",
+            "fonte_orcamentaria_id": "",
+            "fonte_orcamentaria_nome": "",
+            "exigencia_conteudo_nacional": False,
+            "tipo_margem_preferencia": "",
+            "tipo_margem_preferencia_id": "",
+            "tipo_margem_preferencia_nome": ""
+        }
+    ]
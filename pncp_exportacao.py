@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Escritores incrementais (memória constante) para exportar licitações em
+CSV, Excel, JSON, NDJSON e Parquet
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import csv
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import config
+from pncp_registro import para_json
+from pncp_sync import ler_data_iso
+
+
+# Campos brutos gravados no Parquet e seus tipos; 'categoria' são textos de
+# poucos valores distintos, gravados com codificação de dicionário
+CAMPOS_PARQUET = [
+    ('id', 'texto'),
+    ('numero_controle_pncp', 'texto'),
+    ('title', 'texto'),
+    ('description', 'texto'),
+    ('item_url', 'texto'),
+    ('document_type', 'categoria'),
+    ('createdAt', 'data'),
+    ('numero', 'texto'),
+    ('ano', 'texto'),
+    ('numero_sequencial', 'texto'),
+    ('numero_sequencial_compra_ata', 'texto'),
+    ('orgao_id', 'texto'),
+    ('orgao_cnpj', 'texto'),
+    ('orgao_nome', 'texto'),
+    ('orgao_subrogado_id', 'texto'),
+    ('orgao_subrogado_nome', 'texto'),
+    ('unidade_id', 'texto'),
+    ('unidade_codigo', 'texto'),
+    ('unidade_nome', 'texto'),
+    ('esfera_id', 'categoria'),
+    ('esfera_nome', 'categoria'),
+    ('poder_id', 'categoria'),
+    ('poder_nome', 'categoria'),
+    ('municipio_id', 'texto'),
+    ('municipio_nome', 'texto'),
+    ('uf', 'categoria'),
+    ('modalidade_licitacao_id', 'categoria'),
+    ('modalidade_licitacao_nome', 'categoria'),
+    ('situacao_id', 'categoria'),
+    ('situacao_nome', 'categoria'),
+    ('data_publicacao_pncp', 'data'),
+    ('data_atualizacao_pncp', 'data'),
+    ('data_assinatura', 'data'),
+    ('data_inicio_vigencia', 'data'),
+    ('data_fim_vigencia', 'data'),
+    ('cancelado', 'booleano'),
+    ('valor_global', 'numero'),
+    ('tem_resultado', 'booleano'),
+    ('tipo_id', 'categoria'),
+    ('tipo_nome', 'categoria'),
+    ('tipo_contrato_id', 'categoria'),
+    ('tipo_contrato_nome', 'categoria'),
+    ('fonte_orcamentaria_id', 'texto'),
+    ('fonte_orcamentaria_nome', 'texto'),
+    ('exigencia_conteudo_nacional', 'booleano'),
+    ('tipo_margem_preferencia_id', 'texto'),
+    ('tipo_margem_preferencia_nome', 'texto'),
+]
+
+
+def _para_texto(valor) -> Optional[str]:
+    return None if valor is None or valor == '' else str(valor)
+
+
+def _para_data(valor) -> Optional[datetime]:
+    if isinstance(valor, datetime):
+        return valor
+    # Fração limitada a microssegundos, fuso preservado; data impossível (ex: 2025-02-30) vira None
+    return ler_data_iso(valor) if isinstance(valor, str) else None
+
+
+def _para_numero(valor) -> Optional[float]:
+    if valor is None or valor == '':
+        return None
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _para_booleano(valor) -> Optional[bool]:
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, str):
+        return valor.strip().lower() in ('true', '1', 's', 'sim')
+    return bool(valor)
+
+
+_CONVERSORES = {
+    'texto': _para_texto,
+    'categoria': _para_texto,
+    'data': _para_data,
+    'numero': _para_numero,
+    'booleano': _para_booleano,
+}
+
+
+class EscritorLicitacoes:
+    """
+    Base dos escritores: recebe um registro por vez e grava no arquivo
+
+    Escritores com `formatado = True` esperam as colunas de exibição
+    (LicitacaoProcessor.extrair_informacoes_principais); os demais
+    recebem o registro bruto da API. `formato` identifica o escritor nas
+    métricas de exportação.
+    """
+
+    formato = ''
+    formatado = False
+
+    def __init__(self, nome_arquivo: str):
+        self.nome_arquivo = nome_arquivo
+        self.total = 0
+
+    def escrever(self, registro: Dict):
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+    def descarregar(self):
+        """Envia ao disco o que já foi escrito (formatos gravados em texto)"""
+        arquivo = getattr(self, '_arquivo', None)
+        if arquivo is not None:
+            arquivo.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class EscritorCSV(EscritorLicitacoes):
+    """CSV no mesmo formato do DataFrame.to_csv usado anteriormente"""
+
+    formato = 'csv'
+    formatado = True
+
+    def __init__(self, nome_arquivo: str, colunas: Optional[List[str]] = None):
+        super().__init__(nome_arquivo)
+        self.colunas = colunas
+        self._arquivo = open(nome_arquivo, 'w', encoding=config.CSV_ENCODING, newline='')
+        self._csv = csv.writer(self._arquivo, lineterminator=os.linesep)
+        if colunas:
+            self._csv.writerow(colunas)
+
+    def escrever(self, registro: Dict):
+        if self.colunas is None:
+            self.colunas = list(registro.keys())
+            self._csv.writerow(self.colunas)
+        self._csv.writerow([registro.get(coluna) for coluna in self.colunas])
+        self.total += 1
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class EscritorExcel(EscritorLicitacoes):
+    """Excel gravado no modo write-only do openpyxl (linhas não ficam em memória)"""
+
+    formato = 'excel'
+    formatado = True
+
+    def __init__(self, nome_arquivo: str, colunas: Optional[List[str]] = None):
+        from openpyxl import Workbook
+
+        super().__init__(nome_arquivo)
+        self.colunas = None
+        self._workbook = Workbook(write_only=True)
+        self._planilha = self._workbook.create_sheet('Sheet1')
+        if colunas:
+            self._escrever_cabecalho(colunas)
+
+    def _escrever_cabecalho(self, colunas: List[str]):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        # Mesmo estilo de cabeçalho que o pandas aplica em to_excel
+        borda = Side(style='thin')
+        cabecalho = []
+        for coluna in colunas:
+            celula = WriteOnlyCell(self._planilha, value=coluna)
+            celula.font = Font(bold=True)
+            celula.border = Border(left=borda, right=borda, top=borda, bottom=borda)
+            celula.alignment = Alignment(horizontal='center', vertical='top')
+            cabecalho.append(celula)
+        self._planilha.append(cabecalho)
+        self.colunas = colunas
+
+    def escrever(self, registro: Dict):
+        if self.colunas is None:
+            self._escrever_cabecalho(list(registro.keys()))
+        self._planilha.append([registro.get(coluna) for coluna in self.colunas])
+        self.total += 1
+
+    def fechar(self):
+        self._workbook.save(self.nome_arquivo)
+
+
+class EscritorJSON(EscritorLicitacoes):
+    """JSON no formato {"items": [...], "total": N}, gravado item a item"""
+
+    formato = 'json'
+
+    def __init__(self, nome_arquivo: str):
+        super().__init__(nome_arquivo)
+        self._arquivo = open(nome_arquivo, 'w', encoding='utf-8')
+        self._arquivo.write('{\n  "items": [')
+
+    def escrever(self, registro: Dict):
+        texto = json.dumps(registro, ensure_ascii=False, indent=2, default=para_json).replace('\n', '\n    ')
+        self._arquivo.write(('\n    ' if self.total == 0 else ',\n    ') + texto)
+        self.total += 1
+
+    def fechar(self):
+        if self.total:
+            self._arquivo.write('\n  ')
+        self._arquivo.write(f'],\n  "total": {self.total}\n}}')
+        self._arquivo.close()
+
+
+class EscritorNDJSON(EscritorLicitacoes):
+    """NDJSON: um registro JSON por linha"""
+
+    formato = 'ndjson'
+
+    def __init__(self, nome_arquivo: str):
+        super().__init__(nome_arquivo)
+        self._arquivo = open(nome_arquivo, 'w', encoding='utf-8')
+
+    def escrever(self, registro: Dict):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False, default=para_json))
+        self._arquivo.write('\n')
+        self.total += 1
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class EscritorParquet(EscritorLicitacoes):
+    """
+    Parquet (Apache Arrow) com os campos brutos tipados
+
+    valor_global é numérico, as datas são timestamps em UTC (as que vêm sem
+    fuso são lidas no fuso config.PARQUET_FUSO_PADRAO) e cancelado/tem_resultado
+    são booleanos; campos categóricos (uf, modalidade, situação, esfera...)
+    usam codificação de dicionário. Os registros são acumulados em colunas e
+    gravados a cada `lote` linhas, como um row group, então a memória fica
+    limitada ao tamanho do lote. Requer o pacote opcional pyarrow.
+    """
+
+    formato = 'parquet'
+
+    def __init__(self, nome_arquivo: str,
+                 lote: int = config.PARQUET_LOTE,
+                 compressao: str = config.PARQUET_COMPRESSAO):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("A exportação Parquet requer o pacote pyarrow (pip install pyarrow)") from e
+
+        super().__init__(nome_arquivo)
+        self._pa = pa
+        self.lote = max(1, lote)
+        tipos = {
+            'texto': pa.string(),
+            'categoria': pa.dictionary(pa.int32(), pa.string()),
+            'data': pa.timestamp('us', tz='UTC'),
+            'numero': pa.float64(),
+            'booleano': pa.bool_(),
+        }
+        self._esquema = pa.schema([(campo, tipos[tipo]) for campo, tipo in CAMPOS_PARQUET])
+        fuso_padrao = timezone(timedelta(hours=config.PARQUET_FUSO_PADRAO))
+
+        def para_instante(valor) -> Optional[datetime]:
+            data = _para_data(valor)
+            return data.replace(tzinfo=fuso_padrao) if data is not None and data.tzinfo is None else data
+
+        conversores = dict(_CONVERSORES, data=para_instante)
+        self._conversores = [(campo, conversores[tipo]) for campo, tipo in CAMPOS_PARQUET]
+        self._colunas: Dict[str, list] = {campo: [] for campo, _ in CAMPOS_PARQUET}
+        self._pendentes = 0
+        self._parquet = pq.ParquetWriter(nome_arquivo, self._esquema, compression=compressao)
+
+    def escrever(self, registro: Dict):
+        for campo, converter in self._conversores:
+            self._colunas[campo].append(converter(registro.get(campo)))
+        self._pendentes += 1
+        self.total += 1
+        if self._pendentes >= self.lote:
+            self._gravar_lote()
+
+    def _gravar_lote(self):
+        pa = self._pa
+        arrays = []
+        for campo in self._esquema:
+            valores = self._colunas[campo.name]
+            if pa.types.is_dictionary(campo.type):
+                arrays.append(pa.array(valores, pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(valores, campo.type))
+            valores.clear()
+        self._parquet.write_table(pa.Table.from_arrays(arrays, schema=self._esquema))
+        self._pendentes = 0
+
+    def fechar(self):
+        if self._pendentes:
+            self._gravar_lote()
+        self._parquet.close()
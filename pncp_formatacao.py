@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Formatação das licitações para exibição e exportação (LicitacaoProcessor),
+sem depender da pilha de rede (requests)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import itertools
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pncp_exportacao import EscritorCSV, EscritorExcel, EscritorJSON, EscritorParquet
+from pncp_metricas import metricas
+
+
+# Datas ISO que qualquer versão do datetime.fromisoformat aceita; nelas o texto
+# de exibição sai direto por fatias da string (o dia ainda é validado)
+_RE_DATA_ISO = re.compile(
+    r'[1-9]\d{3}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])[T ]'
+    r'(?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d{3}(?:\d{3})?)?)?'
+    r'(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?\Z'
+)
+
+# Colunas de exibição: (título, campo da API); as datas e o valor têm tratamento próprio
+_CAMPOS_TEXTO = [
+    ('Título', 'title'),
+    ('Número PNCP', 'numero_controle_pncp'),
+    ('Órgão', 'orgao_nome'),
+    ('Município', 'municipio_nome'),
+    ('UF', 'uf'),
+    ('Modalidade', 'modalidade_licitacao_nome'),
+    ('Situação', 'situacao_nome'),
+]
+_CAMPOS_DATA = [
+    ('Data Publicação', 'data_publicacao_pncp'),
+    ('Data Início Vigência', 'data_inicio_vigencia'),
+    ('Data Fim Vigência', 'data_fim_vigencia'),
+]
+
+
+class LicitacaoProcessor:
+    """Processador para analisar e formatar dados das licitações"""
+    
+    @staticmethod
+    def formatar_data(data_str) -> str:
+        """Formata data para exibição"""
+        if not data_str:
+            return "N/A"
+        if isinstance(data_str, datetime):
+            return data_str.strftime('%d/%m/%Y %H:%M')
+        try:
+            dt = datetime.fromisoformat(data_str.replace('Z', '+00:00'))
+            return dt.strftime('%d/%m/%Y %H:%M')
+        except (ValueError, TypeError, AttributeError):
+            # Texto fora do formato ISO ou valor que não é texto: exibido como veio
+            return data_str
+    
+    @staticmethod
+    def extrair_informacoes_principais(licitacao: Dict) -> Dict:
+        """Extrai informações principais de uma licitação"""
+        return {
+            'Título': licitacao.get('title', 'N/A'),
+            'Número PNCP': licitacao.get('numero_controle_pncp', 'N/A'),
+            'Órgão': licitacao.get('orgao_nome', 'N/A'),
+            'Município': licitacao.get('municipio_nome', 'N/A'),
+            'UF': licitacao.get('uf', 'N/A'),
+            'Modalidade': licitacao.get('modalidade_licitacao_nome', 'N/A'),
+            'Situação': licitacao.get('situacao_nome', 'N/A'),
+            'Data Publicação': LicitacaoProcessor.formatar_data(licitacao.get('data_publicacao_pncp')),
+            'Data Início Vigência': LicitacaoProcessor.formatar_data(licitacao.get('data_inicio_vigencia')),
+            'Data Fim Vigência': LicitacaoProcessor.formatar_data(licitacao.get('data_fim_vigencia')),
+            'Valor Global': f"R$ {licitacao.get('valor_global', 0):,.2f}" if licitacao.get('valor_global') else 'N/A',
+            'URL': f"https://pncp.gov.br{licitacao.get('item_url', '')}"
+        }
+    
+    @staticmethod
+    def formatar_datas(valores: Iterable) -> List[str]:
+        """
+        Formata uma coluna de datas (texto ou datetime) de uma vez, com o mesmo resultado de formatar_data
+
+        Datas no formato ISO usual são formatadas por fatias do texto, sem
+        criar objetos datetime; a validade de cada dia é verificada uma única
+        vez por lote. Os demais valores passam por formatar_data.
+        """
+        dias_validos: Dict[str, bool] = {}
+        casa_iso = _RE_DATA_ISO.match
+        formatadas = []
+        for valor in valores:
+            if not valor:
+                formatadas.append("N/A")
+                continue
+            if isinstance(valor, datetime):
+                # Licitacao já traz as datas convertidas
+                formatadas.append(f"{valor.day:02d}/{valor.month:02d}/{valor.year} {valor.hour:02d}:{valor.minute:02d}")
+                continue
+            if isinstance(valor, str) and casa_iso(valor):
+                dia = valor[:10]
+                valido = dias_validos.get(dia)
+                if valido is None:
+                    try:
+                        date(int(valor[:4]), int(valor[5:7]), int(valor[8:10]))
+                        valido = True
+                    except ValueError:
+                        valido = False
+                    dias_validos[dia] = valido
+                if valido:
+                    formatadas.append(f"{valor[8:10]}/{valor[5:7]}/{valor[:4]} {valor[11:16]}")
+                    continue
+            formatadas.append(LicitacaoProcessor.formatar_data(valor))
+        return formatadas
+    
+    @staticmethod
+    def formatar_valores(valores: Iterable) -> List[str]:
+        """Formata uma coluna de valores como moeda ('N/A' para vazio ou zero)"""
+        moeda = "R$ {:,.2f}".format
+        return [moeda(valor) if valor else 'N/A' for valor in valores]
+    
+    @staticmethod
+    def extrair_informacoes_lote(licitacoes) -> List[Dict]:
+        """
+        Extrai as informações principais de várias licitações de uma vez
+        
+        Aceita uma lista de registros ou um DataFrame (uma linha por registro)
+        e produz exatamente o mesmo que extrair_informacoes_principais aplicado
+        a cada um, processando coluna a coluna.
+        """
+        if hasattr(licitacoes, 'columns'):
+            # DataFrame: colunas ausentes e células vazias (NaN/None/NaT)
+            # equivalem a chaves ausentes no registro
+            total = len(licitacoes)
+            
+            def coluna(campo, padrao):
+                if campo in licitacoes.columns:
+                    serie = licitacoes[campo]
+                    return [padrao if ausente else valor
+                            for valor, ausente in zip(serie.tolist(), serie.isna().tolist())]
+                return [padrao] * total
+        else:
+            licitacoes = list(licitacoes)
+            
+            def coluna(campo, padrao):
+                return [lic.get(campo, padrao) for lic in licitacoes]
+        
+        colunas = {titulo: coluna(campo, 'N/A') for titulo, campo in _CAMPOS_TEXTO}
+        for titulo, campo in _CAMPOS_DATA:
+            colunas[titulo] = LicitacaoProcessor.formatar_datas(coluna(campo, None))
+        colunas['Valor Global'] = LicitacaoProcessor.formatar_valores(coluna('valor_global', None))
+        colunas['URL'] = [f"https://pncp.gov.br{url}" for url in coluna('item_url', '')]
+        
+        titulos = list(colunas.keys())
+        return [dict(zip(titulos, linha)) for linha in zip(*colunas.values())]
+    
+    @staticmethod
+    def formatar_fluxo(licitacoes: Iterable[Dict], lote: int = 1000) -> Iterator[Tuple[Dict, Dict]]:
+        """Gera pares (licitação, informações principais), formatando `lote` registros por vez"""
+        licitacoes = iter(licitacoes)
+        while True:
+            bloco = list(itertools.islice(licitacoes, lote))
+            if not bloco:
+                return
+            with metricas.etapa('formatacao'):
+                informacoes = LicitacaoProcessor.extrair_informacoes_lote(bloco)
+            metricas.incrementar('pncp_registros_total', len(bloco), origem='formatacao')
+            yield from zip(bloco, informacoes)
+    
+    @staticmethod
+    def salvar_para_excel(licitacoes: Iterable[Dict], nome_arquivo: str = None) -> int:
+        """Salva licitações em arquivo Excel, uma linha por vez (memória constante)"""
+        if not nome_arquivo:
+            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        
+        with EscritorExcel(nome_arquivo, LicitacaoProcessor.colunas()) as escritor:
+            for _, info in LicitacaoProcessor.formatar_fluxo(licitacoes):
+                escritor.escrever(info)
+        print(f"Dados salvos em: {nome_arquivo}")
+        return escritor.total
+    
+    @staticmethod
+    def salvar_para_csv(licitacoes: Iterable[Dict], nome_arquivo: str = None) -> int:
+        """Salva licitações em arquivo CSV, uma linha por vez (memória constante)"""
+        if not nome_arquivo:
+            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        with EscritorCSV(nome_arquivo, LicitacaoProcessor.colunas()) as escritor:
+            for _, info in LicitacaoProcessor.formatar_fluxo(licitacoes):
+                escritor.escrever(info)
+        print(f"Dados salvos em: {nome_arquivo}")
+        return escritor.total
+    
+    @staticmethod
+    def salvar_para_json(licitacoes: Iterable[Dict], nome_arquivo: str = None) -> int:
+        """Salva licitações brutas em JSON ({"items": [...], "total": N}) sem acumulá-las"""
+        if not nome_arquivo:
+            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        with EscritorJSON(nome_arquivo) as escritor:
+            for lic in licitacoes:
+                escritor.escrever(lic)
+        print(f"Dados salvos em: {nome_arquivo}")
+        return escritor.total
+    
+    @staticmethod
+    def salvar_para_parquet(licitacoes: Iterable[Dict], nome_arquivo: str = None) -> int:
+        """Salva licitações brutas, com tipos preservados, em arquivo Parquet (requer pyarrow)"""
+        if not nome_arquivo:
+            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+        
+        with EscritorParquet(nome_arquivo) as escritor:
+            for lic in licitacoes:
+                escritor.escrever(lic)
+        print(f"Dados salvos em: {nome_arquivo}")
+        return escritor.total
+    
+    @staticmethod
+    def colunas() -> List[str]:
+        """Nomes das colunas exportadas (chaves de extrair_informacoes_principais)"""
+        return list(LicitacaoProcessor.extrair_informacoes_principais({}).keys())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Analisadores de HTML para as páginas de resultado do PNCP
+(BeautifulSoup com html.parser ou lxml)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+import config
+from pncp_busca import normalizar_texto
+
+
+# Seletores pré-compilados: classes dos blocos de resultado, datas e siglas de órgão
+_RE_CLASSE_RESULTADO = re.compile(r'licitacao|item|resultado')
+_RE_DATA = re.compile(r'\d{2}/\d{2}/\d{4}')
+_RE_ORGAO = re.compile(r'[A-Z]{2,}')
+
+ANALISADORES = ['auto', 'lxml', 'html.parser']
+
+# Rótulos da página de detalhe (já normalizados) e o campo que cada um preenche
+_ROTULOS_DETALHE = {
+    'local': 'local',
+    'municipio': 'municipio_nome',
+    'uf': 'uf',
+    'modalidade da contratacao': 'modalidade_licitacao_nome',
+    'modalidade': 'modalidade_licitacao_nome',
+    'situacao': 'situacao_nome',
+    'situacao da contratacao': 'situacao_nome',
+    'id contratacao pncp': 'numero_controle_pncp',
+    'numero de controle pncp': 'numero_controle_pncp',
+    'valor total estimado': 'valor_global',
+    'valor global': 'valor_global',
+}
+_RE_VALOR = re.compile(r'-?\d{1,3}(?:\.\d{3})*(?:,\d+)?|-?\d+(?:,\d+)?')
+# /editais/{cnpj}/{ano}/{sequencial} ou /compras/{cnpj}/{ano}/{sequencial}
+_RE_URL_COMPRA = re.compile(r'/(?:editais|compras)/(\d{14})/(\d{4})/(\d+)')
+
+
+def registro_raspado(titulo: str, url: str, orgao: Optional[str], data: Optional[str]) -> Dict:
+    """Registro no formato da API com os campos que a página de pesquisa oferece"""
+    return {
+        'title': titulo,
+        'item_url': url,
+        'orgao_nome': orgao,
+        'data_publicacao_pncp': data,
+        'municipio_nome': None,
+        'uf': None,
+        'modalidade_licitacao_nome': None,
+        'situacao_nome': None,
+        'numero_controle_pncp': None,
+        'valor_global': None
+    }
+
+
+def numero_controle_da_url(url: Optional[str]) -> Optional[str]:
+    """Número de controle PNCP deduzido da URL da contratação ('/compras/{cnpj}/{ano}/{seq}')"""
+    m = _RE_URL_COMPRA.search(url or '')
+    if not m:
+        return None
+    cnpj, ano, sequencial = m.groups()
+    return f"{cnpj}-1-{int(sequencial):06d}/{ano}"
+
+
+def _valor_monetario(texto: str) -> Optional[float]:
+    # 'R$ 1.234.567,89' -> 1234567.89; textos como 'Sigiloso' ficam sem valor
+    m = _RE_VALOR.search(texto)
+    if not m:
+        return None
+    return float(m.group().replace('.', '').replace(',', '.'))
+
+
+def campos_detalhe(textos: Iterable[str]) -> Dict:
+    """
+    Campos da licitação encontrados nos textos de uma página de detalhe
+
+    Reconhece pares 'Rótulo: valor' no mesmo texto ou o rótulo seguido do
+    valor no texto seguinte; vale a primeira ocorrência de cada campo.
+    """
+    campos: Dict = {}
+    textos = [t for t in textos if t]
+    for i, texto in enumerate(textos):
+        rotulo, separador, valor = texto.partition(':')
+        campo = _ROTULOS_DETALHE.get(normalizar_texto(rotulo))
+        if not campo or campo in campos:
+            continue
+        valor = valor.strip() if separador else ''
+        if not valor and i + 1 < len(textos):
+            valor = textos[i + 1]
+        if valor:
+            campos[campo] = valor
+
+    local = campos.pop('local', None)
+    if local and '/' in local:
+        municipio, _, uf = local.rpartition('/')
+        campos.setdefault('municipio_nome', municipio.strip())
+        campos.setdefault('uf', uf.strip())
+    if 'valor_global' in campos:
+        campos['valor_global'] = _valor_monetario(campos['valor_global'])
+    return campos
+
+
+class AnalisadorBS4:
+    """
+    BeautifulSoup com o html.parser (Python puro, sem dependências extras)
+
+    Com `regiao` (id do contêiner dos resultados), só esse trecho da página
+    é convertido em árvore.
+    """
+
+    nome = 'html.parser'
+
+    def __init__(self, regiao: Optional[str] = None):
+        self.regiao = regiao
+
+    def extrair(self, conteudo: bytes) -> List[Dict]:
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        somente = SoupStrainer(id=self.regiao) if self.regiao else None
+        soup = BeautifulSoup(conteudo, 'html.parser', parse_only=somente)
+
+        licitacoes = []
+        for elemento in soup.find_all(['div', 'tr', 'li'], class_=_RE_CLASSE_RESULTADO):
+            registro = self.extrair_elemento(elemento)
+            if registro:
+                licitacoes.append(registro)
+
+        # Se não encontrou elementos específicos, tentar buscar em tabelas
+        if not licitacoes:
+            for tabela in soup.find_all('table'):
+                for linha in tabela.find_all('tr')[1:]:  # Pular cabeçalho
+                    registro = self.extrair_linha(linha)
+                    if registro:
+                        licitacoes.append(registro)
+        return licitacoes
+
+    def extrair_detalhes(self, conteudo: bytes) -> Dict:
+        """Campos da página de detalhe de uma licitação"""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(conteudo, 'html.parser')
+        for oculto in soup(['script', 'style']):
+            oculto.decompose()
+        return campos_detalhe(soup.stripped_strings)
+
+    @staticmethod
+    def extrair_elemento(elemento) -> Optional[Dict]:
+        """Extrai dados de licitação de um bloco de resultado"""
+        link = elemento.find('a')
+        if not link:
+            return None
+
+        titulo = link.get_text(strip=True)
+        if not titulo or 'licitacao' not in titulo.lower():
+            return None
+
+        # Data e órgão são procurados no elemento pai
+        pai = elemento.parent if elemento.parent else elemento
+        data = pai.find(string=_RE_DATA)
+        orgao = pai.find(string=_RE_ORGAO)
+        return registro_raspado(titulo, link.get('href', ''),
+                                orgao.strip() if orgao else None,
+                                data.strip() if data else None)
+
+    @staticmethod
+    def extrair_linha(linha) -> Optional[Dict]:
+        """Extrai dados de licitação de uma linha de tabela"""
+        celulas = linha.find_all(['td', 'th'])
+        if len(celulas) < 2:
+            return None
+
+        link = celulas[0].find('a')
+        return registro_raspado(celulas[0].get_text(strip=True),
+                                link.get('href', '') if link else '',
+                                celulas[1].get_text(strip=True),
+                                celulas[2].get_text(strip=True) if len(celulas) > 2 else None)
+
+
+class AnalisadorLXML:
+    """
+    lxml (libxml2, em C) com consultas XPath pré-compiladas
+
+    Produz os mesmos registros que o AnalisadorBS4. Com `regiao`, as
+    consultas ficam restritas ao contêiner com esse id.
+    """
+
+    nome = 'lxml'
+
+    def __init__(self, regiao: Optional[str] = None):
+        from lxml import etree, html
+
+        self.regiao = regiao
+        self._html = html
+        self._parser = html.HTMLParser(encoding='utf-8')
+        self._xp_candidatos = etree.XPath(
+            "descendant-or-self::*[self::div or self::tr or self::li][@class]")
+        self._xp_link = etree.XPath("descendant::a[1]")
+        self._xp_tabelas = etree.XPath("descendant-or-self::table")
+        self._xp_linhas = etree.XPath("descendant::tr")
+        self._xp_celulas = etree.XPath("descendant::*[self::td or self::th]")
+
+    def extrair(self, conteudo: bytes) -> List[Dict]:
+        raiz = self._html.document_fromstring(conteudo, parser=self._parser)
+        if self.regiao:
+            raiz = raiz.get_element_by_id(self.regiao, None)
+            if raiz is None:
+                return []
+
+        licitacoes = []
+        for elemento in self._xp_candidatos(raiz):
+            if not any(_RE_CLASSE_RESULTADO.search(c) for c in elemento.get('class').split()):
+                continue
+            registro = self._extrair_elemento(elemento)
+            if registro:
+                licitacoes.append(registro)
+
+        if not licitacoes:
+            for tabela in self._xp_tabelas(raiz):
+                for linha in self._xp_linhas(tabela)[1:]:
+                    registro = self._extrair_linha(linha)
+                    if registro:
+                        licitacoes.append(registro)
+        return licitacoes
+
+    def extrair_detalhes(self, conteudo: bytes) -> Dict:
+        """Campos da página de detalhe de uma licitação"""
+        raiz = self._html.document_fromstring(conteudo, parser=self._parser)
+        textos = []
+        for elemento in raiz.iter():
+            if elemento.tag not in ('script', 'style') and isinstance(elemento.tag, str) and elemento.text:
+                textos.append(elemento.text.strip())
+            if elemento.tail and elemento is not raiz:
+                textos.append(elemento.tail.strip())
+        return campos_detalhe(textos)
+
+    @staticmethod
+    def _texto(elemento) -> str:
+        # Equivalente a get_text(strip=True) do BeautifulSoup
+        return ''.join(parte.strip() for parte in elemento.itertext())
+
+    @staticmethod
+    def _primeiro_texto(elemento, regex) -> Optional[str]:
+        for parte in elemento.itertext():
+            if regex.search(parte):
+                return parte.strip()
+        return None
+
+    def _extrair_elemento(self, elemento) -> Optional[Dict]:
+        links = self._xp_link(elemento)
+        if not links:
+            return None
+
+        titulo = self._texto(links[0])
+        if not titulo or 'licitacao' not in titulo.lower():
+            return None
+
+        pai = elemento.getparent()
+        if pai is None:
+            pai = elemento
+        return registro_raspado(titulo, links[0].get('href', ''),
+                                self._primeiro_texto(pai, _RE_ORGAO),
+                                self._primeiro_texto(pai, _RE_DATA))
+
+    def _extrair_linha(self, linha) -> Optional[Dict]:
+        celulas = self._xp_celulas(linha)
+        if len(celulas) < 2:
+            return None
+
+        links = self._xp_link(celulas[0])
+        return registro_raspado(self._texto(celulas[0]),
+                                links[0].get('href', '') if links else '',
+                                self._texto(celulas[1]),
+                                self._texto(celulas[2]) if len(celulas) > 2 else None)
+
+
+def obter_analisador(nome: str = config.WEB_PARSER, regiao: Optional[str] = config.WEB_REGIAO_RESULTADOS):
+    """
+    Cria o analisador pelo nome: 'lxml', 'html.parser' ou 'auto'
+    (lxml quando instalado, senão html.parser)
+    """
+    if nome == 'auto':
+        try:
+            return AnalisadorLXML(regiao)
+        except ImportError:
+            return AnalisadorBS4(regiao)
+    if nome == 'lxml':
+        try:
+            return AnalisadorLXML(regiao)
+        except ImportError as e:
+            raise ImportError("O analisador lxml requer o pacote lxml (pip install lxml)") from e
+    if nome == 'html.parser':
+        return AnalisadorBS4(regiao)
+    raise ValueError(f"Analisador de HTML desconhecido: {nome} (use {', '.join(ANALISADORES)})")
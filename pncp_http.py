@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Utilitários HTTP compartilhados pelos clientes do PNCP (API e web scraping)
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from pncp_cache import CacheRespostas, obter_cache_padrao
+from pncp_erros import ErroPNCP, RequisicaoCancelada  # noqa: F401 (reexportado)
+from pncp_metricas import metricas
+
+
+# Respostas que indicam falha transitória e justificam nova tentativa
+STATUS_RETENTATIVA = {429, 500, 502, 503, 504}
+
+
+class CircuitoAberto(requests.exceptions.RequestException):
+    """Requisição recusada porque o disjuntor do host está aberto"""
+
+
+class LimitadorHosts:
+    """Limita a quantidade de requisições simultâneas para um mesmo host"""
+
+    def __init__(self, max_por_host: int = config.MAX_CONEXOES_POR_HOST):
+        self.max_por_host = max(1, max_por_host)
+        self._semaforos: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def semaforo(self, url: str) -> threading.BoundedSemaphore:
+        """Retorna o semáforo do host da URL, criando-o se necessário"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaforo = self._semaforos.get(host)
+            if semaforo is None:
+                semaforo = threading.BoundedSemaphore(self.max_por_host)
+                self._semaforos[host] = semaforo
+            return semaforo
+
+
+# Limitador compartilhado por todas as sessões que não recebem um próprio
+limitador_padrao = LimitadorHosts()
+
+
+class DisjuntorCircuito:
+    """
+    Disjuntor (circuit breaker) por host
+
+    Após `limite_falhas` falhas consecutivas o host fica bloqueado por
+    `tempo_aberto` segundos; em seguida uma única requisição de teste é
+    liberada e, se tiver sucesso, o circuito volta a fechar.
+    """
+
+    def __init__(self,
+                 limite_falhas: int = config.CIRCUITO_LIMITE_FALHAS,
+                 tempo_aberto: float = config.CIRCUITO_TEMPO_ABERTO):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self._falhas: Dict[str, int] = {}
+        self._aberto_ate: Dict[str, float] = {}
+        self._testando: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def liberar(self, url: str) -> bool:
+        """
+        Verifica se o host pode receber requisições; lança CircuitoAberto se não
+
+        Retorna True quando a requisição liberada é o teste do circuito
+        meio-aberto: quem chamou deve então registrar o sucesso, a falha
+        ou, se a requisição terminar de outro jeito, chamar encerrar_teste().
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            aberto_ate = self._aberto_ate.get(host)
+            if aberto_ate is None:
+                return False
+            if time.monotonic() < aberto_ate or self._testando.get(host):
+                raise CircuitoAberto(f"Circuito aberto para {host}: muitas falhas consecutivas")
+            # Meio-aberto: deixar passar uma requisição de teste
+            self._testando[host] = True
+            return True
+
+    def encerrar_teste(self, url: str):
+        """Libera um novo teste do host quando o anterior não chegou a um resultado"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._testando.pop(host, None)
+
+    def registrar_sucesso(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._falhas.pop(host, None)
+            self._aberto_ate.pop(host, None)
+            self._testando.pop(host, None)
+
+    def registrar_falha(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            falhas = self._falhas.get(host, 0) + 1
+            self._falhas[host] = falhas
+            if falhas >= self.limite_falhas or self._testando.get(host):
+                self._aberto_ate[host] = time.monotonic() + self.tempo_aberto
+                self._testando.pop(host, None)
+
+    def estado(self, url: str) -> str:
+        """Estado do circuito do host: 'fechado', 'aberto' ou 'meio-aberto'"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            aberto_ate = self._aberto_ate.get(host)
+            if aberto_ate is None:
+                return 'fechado'
+            return 'aberto' if time.monotonic() < aberto_ate else 'meio-aberto'
+
+
+def _segundos_retry_after(resposta: requests.Response) -> Optional[float]:
+    """Interpreta o cabeçalho Retry-After (segundos ou data HTTP)"""
+    valor = resposta.headers.get('Retry-After')
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class SessaoPNCP(requests.Session):
+    """
+    Sessão HTTP usada pelo PNCPClient e pelo PNCPWebScraper
+
+    Pode ser compartilhada entre threads; cada requisição respeita o
+    limite de conexões simultâneas por host do limitador configurado.
+    Com um cache, requisições GET são servidas localmente enquanto a
+    resposta armazenada não expirar. Sem `cache`, usa o cache padrão
+    (se config.CACHE_ENABLED); `cache=False` desativa o cache.
+
+    Falhas transitórias (conexão, timeout, 429 e 5xx) são repetidas até
+    `max_tentativas` vezes com backoff exponencial e jitter; o disjuntor
+    interrompe as requisições a um host que continua falhando.
+
+    Cada tentativa é registrada em pncp_metricas (latência, status, bytes
+    recebidos e retentativas por host), assim como os acertos do cache.
+
+    Depois de cancelar(), nenhuma nova tentativa é feita: as requisições
+    seguintes (e as que estão aguardando o backoff) lançam RequisicaoCancelada.
+
+    Com `condicional`, as últimas respostas GET que trouxeram ETag ou
+    Last-Modified são guardadas (até config.CONDICIONAL_MAX_RESPOSTAS) e
+    revalidadas com If-None-Match/If-Modified-Since; um 304 devolve a
+    resposta guardada sem baixar o corpo de novo.
+    """
+
+    def __init__(self,
+                 limitador: Optional[LimitadorHosts] = None,
+                 cache: Union[CacheRespostas, bool, None] = None,
+                 max_tentativas: int = config.MAX_RETRIES,
+                 atraso_base: float = config.RETRY_DELAY,
+                 disjuntor: Optional[DisjuntorCircuito] = None,
+                 pool_conexoes: int = config.POOL_CONEXOES,
+                 condicional: bool = False):
+        super().__init__()
+        self.limitador = limitador or limitador_padrao
+        if cache is None:
+            cache = obter_cache_padrao()
+        self.cache = cache or None
+        self.max_tentativas = max_tentativas
+        self.atraso_base = atraso_base
+        self.disjuntor = disjuntor or DisjuntorCircuito()
+        self.retentativas = 0
+        self._cancelada = threading.Event()
+        self.condicional = condicional
+        self._validadas: 'OrderedDict[str, requests.Response]' = OrderedDict()
+        self._lock_validadas = threading.Lock()
+
+        adaptador = HTTPAdapter(pool_connections=pool_conexoes, pool_maxsize=pool_conexoes)
+        self.mount('https://', adaptador)
+        self.mount('http://', adaptador)
+
+    def cancelar(self):
+        """Interrompe as requisições desta sessão (as já em andamento terminam sozinhas)"""
+        self._cancelada.set()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def _atraso(self, tentativa: int, resposta: Optional[requests.Response] = None) -> float:
+        """Backoff exponencial com jitter completo, respeitando Retry-After"""
+        if resposta is not None:
+            retry_after = _segundos_retry_after(resposta)
+            if retry_after is not None:
+                return min(retry_after, config.RETRY_MAX_DELAY)
+        limite = min(config.RETRY_MAX_DELAY, self.atraso_base * (2 ** tentativa))
+        return random.uniform(0, limite)
+
+    def request(self, method, url, params=None, **kwargs):
+        usar_cache = self.cache is not None and method.upper() == 'GET' and not kwargs.get('stream')
+        if usar_cache:
+            chave = self.cache.chave(method, url, params)
+            resposta = self.cache.obter(chave)
+            if resposta is not None:
+                metricas.incrementar('pncp_cache_acertos_total')
+                return resposta
+            metricas.incrementar('pncp_cache_falhas_total')
+
+        if self.condicional and method.upper() == 'GET' and not kwargs.get('stream'):
+            resposta = self._request_condicional(method, url, params, **kwargs)
+        else:
+            resposta = self._request_com_retentativas(method, url, params=params, **kwargs)
+
+        if usar_cache:
+            self.cache.armazenar(chave, resposta)
+        return resposta
+
+    def _request_condicional(self, method, url, params, **kwargs) -> requests.Response:
+        chave = CacheRespostas.chave(method, url, params)
+        with self._lock_validadas:
+            anterior = self._validadas.get(chave)
+        if anterior is not None:
+            cabecalhos = dict(kwargs.get('headers') or {})
+            if anterior.headers.get('ETag'):
+                cabecalhos['If-None-Match'] = anterior.headers['ETag']
+            if anterior.headers.get('Last-Modified'):
+                cabecalhos['If-Modified-Since'] = anterior.headers['Last-Modified']
+            kwargs['headers'] = cabecalhos
+
+        resposta = self._request_com_retentativas(method, url, params=params, **kwargs)
+
+        if resposta.status_code == 304 and anterior is not None:
+            metricas.incrementar('pncp_http_nao_modificadas_total', host=urlsplit(url).netloc)
+            with self._lock_validadas:
+                self._validadas.move_to_end(chave)
+            return anterior
+        if resposta.status_code == 200 and ('ETag' in resposta.headers or 'Last-Modified' in resposta.headers):
+            with self._lock_validadas:
+                self._validadas[chave] = resposta
+                self._validadas.move_to_end(chave)
+                while len(self._validadas) > config.CONDICIONAL_MAX_RESPOSTAS:
+                    self._validadas.popitem(last=False)
+        return resposta
+
+    def _request_com_retentativas(self, method, url, **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc
+        tentativa = 0
+        while True:
+            if self._cancelada.is_set():
+                raise RequisicaoCancelada(f"Requisição cancelada: {url}")
+            teste = self.disjuntor.liberar(url)
+            try:
+                try:
+                    with self.limitador.semaforo(url):
+                        inicio = time.perf_counter()
+                        try:
+                            resposta = super().request(method, url, **kwargs)
+                        finally:
+                            metricas.observar('pncp_http_latencia_segundos', time.perf_counter() - inicio, host=host)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    metricas.incrementar('pncp_http_requisicoes_total', host=host, status='erro')
+                    self.disjuntor.registrar_falha(url)
+                    if tentativa >= self.max_tentativas:
+                        raise
+                    resposta = None
+                else:
+                    metricas.incrementar('pncp_http_requisicoes_total', host=host, status=resposta.status_code)
+                    if not kwargs.get('stream'):
+                        metricas.incrementar('pncp_http_bytes_recebidos_total', len(resposta.content), host=host)
+                    if resposta.status_code not in STATUS_RETENTATIVA:
+                        self.disjuntor.registrar_sucesso(url)
+                        return resposta
+                    self.disjuntor.registrar_falha(url)
+                    if tentativa >= self.max_tentativas:
+                        # Esgotadas as tentativas: quem chamou decide via raise_for_status()
+                        return resposta
+            except BaseException:
+                # Redirecionamentos demais, URL inválida, corpo truncado, cancelamento...:
+                # o teste do circuito meio-aberto não pode ficar preso
+                if teste:
+                    self.disjuntor.encerrar_teste(url)
+                raise
+
+            if resposta is not None:
+                resposta.close()
+            # Espera do backoff, interrompida se a sessão for cancelada
+            if self._cancelada.wait(self._atraso(tentativa, resposta)):
+                raise RequisicaoCancelada(f"Requisição cancelada: {url}")
+            tentativa += 1
+            self.retentativas += 1
+            metricas.incrementar('pncp_http_retentativas_total', host=host)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Decodificação das respostas JSON da API: backend rápido opcional (orjson)
+para o corpo inteiro e leitura em fluxo, que entrega cada item da lista
+enquanto o corpo ainda está chegando
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import codecs
+import json
+from typing import Dict, Iterable, Iterator, Optional
+
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKENDS = ['auto', 'orjson', 'json']
+
+
+def obter_carregador(nome: str = config.JSON_BACKEND):
+    """
+    Função que decodifica um corpo JSON (bytes) pelo nome do backend:
+    'orjson', 'json' (biblioteca padrão) ou 'auto' (orjson quando instalado)
+    """
+    if nome == 'auto':
+        return orjson.loads if orjson is not None else json.loads
+    if nome == 'orjson':
+        if orjson is None:
+            raise ImportError("O backend orjson requer o pacote orjson (pip install orjson)")
+        return orjson.loads
+    if nome == 'json':
+        return json.loads
+    raise ValueError(f"Backend de JSON desconhecido: {nome} (use {', '.join(BACKENDS)})")
+
+
+class _Leitor:
+    """Texto decodificado dos blocos de bytes, lido sob demanda"""
+
+    def __init__(self, blocos: Iterable[bytes]):
+        self._blocos = iter(blocos)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decodificar = json.JSONDecoder().raw_decode
+        self.texto = ''
+        self.pos = 0
+        self.fim = False
+
+    def ler_mais(self) -> bool:
+        """
+        Descarta o texto já consumido e acrescenta ao menos tanto texto
+        quanto o que estava pendente (um item grande é redecodificado
+        poucas vezes); False se o corpo já terminou
+        """
+        if self.fim:
+            return False
+        partes = [self.texto[self.pos:]]
+        alvo = max(len(partes[0]), 1)
+        lido = 0
+        for bloco in self._blocos:
+            parte = self._utf8.decode(bloco)
+            partes.append(parte)
+            lido += len(parte)
+            if lido >= alvo:
+                break
+        else:
+            partes.append(self._utf8.decode(b'', final=True))
+            self.fim = True
+        self.texto = ''.join(partes)
+        self.pos = 0
+        return True
+
+    def caractere(self) -> str:
+        """Próximo caractere que não é espaço ('' no fim do corpo), sem consumi-lo"""
+        while True:
+            texto, pos = self.texto, self.pos
+            while pos < len(texto) and texto[pos] in ' \t\r\n':
+                pos += 1
+            self.pos = pos
+            if pos < len(texto):
+                return texto[pos]
+            if not self.ler_mais():
+                return ''
+
+    def esperar(self, esperados: str) -> str:
+        caractere = self.caractere()
+        if not caractere or caractere not in esperados:
+            raise json.JSONDecodeError(f"Esperado um de {esperados!r}", self.texto, self.pos)
+        self.pos += 1
+        return caractere
+
+    def valor(self):
+        """Decodifica o próximo valor JSON, lendo mais blocos enquanto ele estiver incompleto"""
+        while True:
+            self.caractere()
+            try:
+                valor, fim = self._decodificar(self.texto, self.pos)
+                # Terminar exatamente no fim do texto pode ser um número cortado
+                if fim < len(self.texto) or self.fim:
+                    self.pos = fim
+                    return valor
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+            self.ler_mais()
+
+
+def iterar_itens(blocos: Iterable[bytes], campo: str = 'items', metadados: Optional[Dict] = None) -> Iterator:
+    """
+    Gera os elementos da lista `campo` de um objeto JSON à medida que os
+    blocos do corpo chegam (ex: response.iter_content)
+
+    Só o texto ainda não consumido fica em memória, nunca o corpo inteiro.
+    Os demais campos do objeto (ex: 'total') são gravados em `metadados`,
+    inclusive os que vêm depois da lista. Os itens são decodificados pelo
+    json da biblioteca padrão: o orjson não decodifica em partes.
+
+    Raises:
+        json.JSONDecodeError: se o corpo não for um objeto JSON válido
+    """
+    leitor = _Leitor(blocos)
+    leitor.esperar('{')
+    if leitor.caractere() == '}':
+        return
+    while True:
+        chave = leitor.valor()
+        leitor.esperar(':')
+        if chave == campo and leitor.caractere() == '[':
+            leitor.pos += 1
+            if leitor.caractere() == ']':
+                leitor.pos += 1
+            else:
+                while True:
+                    yield leitor.valor()
+                    if leitor.esperar(',]') == ']':
+                        break
+        else:
+            valor = leitor.valor()
+            if metadados is not None:
+                metadados[chave] = valor
+        if leitor.esperar(',}') == '}':
+            break
@@ -7,19 +7,37 @@ Repositório: Thiag086/Licita-oes_geral
 
 import requests
 import json
-import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, Optional
 import argparse
+import queue
 import sys
+import threading
+from urllib.parse import urlsplit
+
+import config
+from pncp_formatacao import LicitacaoProcessor  # noqa: F401 (reexportado)
+from pncp_http import ErroPNCP, SessaoPNCP
+from pncp_json import iterar_itens, obter_carregador
+from pncp_metricas import metricas
+from pncp_registro import Licitacao
+from pncp_sync import chave_licitacao, chave_tempo
 
 
 class PNCPClient:
     """Cliente para acessar a API do PNCP"""
     
-    def __init__(self):
-        self.base_url = "https://pncp.gov.br/api"
-        self.session = requests.Session()
+    def __init__(self,
+                 session: Optional[requests.Session] = None,
+                 compacto: bool = config.REGISTRO_COMPACTO,
+                 fluxo: bool = config.JSON_FLUXO,
+                 backend_json: str = config.JSON_BACKEND):
+        self.base_url = config.API_BASE_URL
+        self.session = session or SessaoPNCP()
+        # Itens como Licitacao (__slots__, textos internados, datas em datetime) em vez de dicts
+        self.compacto = compacto
+        # Itens decodificados enquanto o corpo chega (buscar_licitacoes_em_fluxo)
+        self.fluxo = fluxo
+        self._carregar_json = obter_carregador(backend_json)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json',
@@ -35,7 +53,8 @@ class PNCPClient:
                          data_inicio: Optional[str] = None,
                          data_fim: Optional[str] = None,
                          pagina: int = 1,
-                         tamanho_pagina: int = 20) -> Dict:
+                         tamanho_pagina: int = 20,
+                         ordenacao: str = 'data_publicacao_pncp,desc') -> Dict:
         """
         Busca licitações no PNCP com filtros opcionais
         
@@ -49,45 +68,128 @@ class PNCPClient:
             data_fim: Data de fim (formato: YYYY-MM-DD)
             pagina: Número da página
             tamanho_pagina: Quantidade de itens por página
+            ordenacao: Campo e direção da ordenação (ex: 'data_atualizacao_pncp,desc')
         
         Returns:
-            Dict com os dados das licitações
+            Dict com os dados das licitações. Em caso de falha (após as
+            retentativas), o dict vem vazio e com a chave 'erro'
         """
         
-        # URL da API de busca
-        url = f"{self.base_url}/catalog/items"
+        params = self._parametros(pagina, tamanho_pagina, ordenacao, uf=uf, municipio=municipio, orgao=orgao,
+                                  modalidade=modalidade, situacao=situacao, data_inicio=data_inicio,
+                                  data_fim=data_fim)
         
-        # Parâmetros da consulta
+        if self.fluxo:
+            metadados = {}
+            try:
+                itens = list(self._itens_em_fluxo(params, metadados))
+            except ErroPNCP as e:
+                print(f"Erro ao buscar licitações: {e}")
+                return {"items": [], "total": 0, "erro": str(e)}
+            metadados.pop('quantidade', None)
+            return dict(metadados, items=itens)
+        
+        try:
+            response = self.session.get(f"{self.base_url}/catalog/items", params=params, timeout=config.API_TIMEOUT)
+            response.raise_for_status()
+            with metricas.etapa('decodificacao_json'):
+                resultado = self._carregar_json(response.content)
+                if self.compacto:
+                    resultado['items'] = [Licitacao(item) for item in resultado.get('items') or []]
+            metricas.incrementar('pncp_paginas_total', origem='api')
+            metricas.incrementar('pncp_registros_total', len(resultado.get('items') or []), origem='api')
+            return resultado
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError: corpo que não é JSON (json.JSONDecodeError / orjson.JSONDecodeError)
+            print(f"Erro ao buscar licitações: {e}")
+            return {"items": [], "total": 0, "erro": str(e)}
+    
+    @staticmethod
+    def _parametros(pagina: int, tamanho_pagina: int, ordenacao: str, **filtros) -> Dict:
+        """Parâmetros da consulta à API (filtros vazios são omitidos)"""
         params = {
             'page': pagina,
             'size': tamanho_pagina,
-            'sort': 'data_publicacao_pncp,desc'
+            'sort': ordenacao
         }
+        params.update((nome, valor) for nome, valor in filtros.items() if valor)
+        return params
+    
+    def buscar_licitacoes_em_fluxo(self,
+                                   pagina: int = 1,
+                                   tamanho_pagina: int = 20,
+                                   ordenacao: str = 'data_publicacao_pncp,desc',
+                                   metadados: Optional[Dict] = None,
+                                   **filtros) -> Iterator[Dict]:
+        """
+        Gera os itens de uma página da API enquanto o corpo da resposta chega
         
-        # Adicionar filtros se fornecidos
-        if uf:
-            params['uf'] = uf
-        if municipio:
-            params['municipio'] = municipio
-        if orgao:
-            params['orgao'] = orgao
-        if modalidade:
-            params['modalidade'] = modalidade
-        if situacao:
-            params['situacao'] = situacao
-        if data_inicio:
-            params['data_inicio'] = data_inicio
-        if data_fim:
-            params['data_fim'] = data_fim
+        O corpo é lido em blocos de config.JSON_BLOCO bytes e cada item é
+        entregue assim que termina de chegar, sem guardar a resposta inteira
+        (nem passar pelo cache de respostas). Se a conexão cair no meio do
+        corpo, a página é pedida de novo (até session.max_tentativas vezes)
+        e os itens já entregues são pulados.
         
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+        Args:
+            pagina, tamanho_pagina, ordenacao, **filtros: Como em buscar_licitacoes
+            metadados: Recebe os demais campos da resposta (ex: 'total') e,
+                ao final, 'quantidade' com o número de itens entregues
+        
+        Raises:
+            ErroPNCP: se a página não puder ser obtida ou não for JSON válido
+        """
+        return self._itens_em_fluxo(self._parametros(pagina, tamanho_pagina, ordenacao, **filtros), metadados)
+    
+    def _itens_em_fluxo(self, params: Dict, metadados: Optional[Dict]) -> Iterator[Dict]:
+        url = f"{self.base_url}/catalog/items"
+        host = urlsplit(url).netloc
+        metadados = {} if metadados is None else metadados
+        entregues = 0
+        tentativa = 0
+        
+        while True:
+            try:
+                response = self.session.get(url, params=params, timeout=config.API_TIMEOUT, stream=True)
+            except requests.exceptions.RequestException as e:
+                raise ErroPNCP(f"Erro ao buscar licitações: {e}") from e
             
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar licitações: {e}")
-            return {"items": [], "total": 0}
+            recebidos = 0
+            
+            def blocos():
+                nonlocal recebidos
+                for bloco in response.iter_content(config.JSON_BLOCO):
+                    recebidos += len(bloco)
+                    yield bloco
+            
+            try:
+                response.raise_for_status()
+                lidos = 0
+                for item in iterar_itens(blocos(), metadados=metadados):
+                    lidos += 1
+                    if lidos <= entregues:
+                        # Já entregue antes de a conexão cair
+                        continue
+                    entregues += 1
+                    yield Licitacao(item) if self.compacto else item
+                break
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                if tentativa >= getattr(self.session, 'max_tentativas', 0):
+                    raise ErroPNCP(f"Conexão interrompida durante a resposta: {e}") from e
+                tentativa += 1
+                metricas.incrementar('pncp_http_retentativas_total', host=host)
+            except requests.exceptions.RequestException as e:
+                raise ErroPNCP(f"Erro ao buscar licitações: {e}") from e
+            except ValueError as e:
+                raise ErroPNCP(f"Resposta inválida da API: {e}") from e
+            finally:
+                response.close()
+                metricas.incrementar('pncp_http_bytes_recebidos_total', recebidos, host=host)
+        
+        metadados['quantidade'] = entregues
+        metricas.incrementar('pncp_paginas_total', origem='api')
+        metricas.incrementar('pncp_registros_total', entregues, origem='api')
     
     def buscar_por_cnpj(self, cnpj: str, pagina: int = 1, tamanho_pagina: int = 20) -> Dict:
         """
@@ -117,67 +219,276 @@ class PNCPClient:
             Dict com os dados das licitações
         """
         return self.buscar_licitacoes(municipio=municipio, uf=uf, pagina=pagina, tamanho_pagina=tamanho_pagina)
-
-
-class LicitacaoProcessor:
-    """Processador para analisar e formatar dados das licitações"""
     
-    @staticmethod
-    def formatar_data(data_str: str) -> str:
-        """Formata data para exibição"""
-        if not data_str:
-            return "N/A"
-        try:
-            dt = datetime.fromisoformat(data_str.replace('Z', '+00:00'))
-            return dt.strftime('%d/%m/%Y %H:%M')
-        except:
-            return data_str
-    
-    @staticmethod
-    def extrair_informacoes_principais(licitacao: Dict) -> Dict:
-        """Extrai informações principais de uma licitação"""
-        return {
-            'Título': licitacao.get('title', 'N/A'),
-            'Número PNCP': licitacao.get('numero_controle_pncp', 'N/A'),
-            'Órgão': licitacao.get('orgao_nome', 'N/A'),
-            'Município': licitacao.get('municipio_nome', 'N/A'),
-            'UF': licitacao.get('uf', 'N/A'),
-            'Modalidade': licitacao.get('modalidade_licitacao_nome', 'N/A'),
-            'Situação': licitacao.get('situacao_nome', 'N/A'),
-            'Data Publicação': LicitacaoProcessor.formatar_data(licitacao.get('data_publicacao_pncp')),
-            'Data Início Vigência': LicitacaoProcessor.formatar_data(licitacao.get('data_inicio_vigencia')),
-            'Data Fim Vigência': LicitacaoProcessor.formatar_data(licitacao.get('data_fim_vigencia')),
-            'Valor Global': f"R$ {licitacao.get('valor_global', 0):,.2f}" if licitacao.get('valor_global') else 'N/A',
-            'URL': f"https://pncp.gov.br{licitacao.get('item_url', '')}"
-        }
+    def iterar_paginas(self,
+                       pagina_inicial: int = 1,
+                       tamanho_pagina: int = 20,
+                       max_paginas: Optional[int] = None,
+                       **filtros) -> Iterator[Dict]:
+        """
+        Percorre as páginas de resultados em sequência, sem prefetch
+        
+        Args:
+            pagina_inicial: Primeira página a ser buscada
+            tamanho_pagina: Quantidade de itens por página
+            max_paginas: Limite de páginas a buscar (None = todas)
+            **filtros: Mesmos filtros aceitos por buscar_licitacoes
+        
+        Returns:
+            Iterador com o resultado (Dict) de cada página
+        
+        Raises:
+            ErroPNCP: se alguma página não puder ser obtida
+        """
+        pagina = pagina_inicial
+        paginas_lidas = 0
+        
+        while max_paginas is None or paginas_lidas < max_paginas:
+            resultado = self.buscar_licitacoes(pagina=pagina, tamanho_pagina=tamanho_pagina, **filtros)
+            if 'erro' in resultado:
+                raise ErroPNCP(f"Falha ao buscar a página {pagina}: {resultado['erro']}")
+            items = resultado.get('items', [])
+            if not items:
+                break
+            
+            yield resultado
+            paginas_lidas += 1
+            
+            # Última página: veio incompleta ou já cobrimos o total informado
+            total = resultado.get('total') or 0
+            if len(items) < tamanho_pagina or (total and pagina * tamanho_pagina >= total):
+                break
+            pagina += 1
     
-    @staticmethod
-    def salvar_para_excel(licitacoes: List[Dict], nome_arquivo: str = None):
-        """Salva licitações em arquivo Excel"""
-        if not nome_arquivo:
-            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    def iterar_licitacoes(self,
+                          uf: Optional[str] = None,
+                          municipio: Optional[str] = None,
+                          orgao: Optional[str] = None,
+                          modalidade: Optional[str] = None,
+                          situacao: Optional[str] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None,
+                          pagina_inicial: int = 1,
+                          tamanho_pagina: int = 20,
+                          max_paginas: Optional[int] = None,
+                          prefetch: int = config.PREFETCH_PAGINAS,
+                          ordenacao: str = 'data_publicacao_pncp,desc',
+                          consistente: bool = config.PAGINACAO_CONSISTENTE) -> Iterator[Dict]:
+        """
+        Gera todas as licitações que atendem aos filtros, página a página
+        
+        As páginas são buscadas sob demanda; com prefetch > 0 uma thread
+        de apoio lê no máximo `prefetch` páginas à frente do consumidor,
+        de modo que a memória usada não depende do tamanho do resultado.
+        
+        Com self.fluxo, as páginas são lidas uma por vez e cada item sai
+        enquanto o corpo da página ainda está chegando; `prefetch` é ignorado.
+        
+        Com `consistente`, cada licitação sai uma única vez mesmo que
+        publicações novas desloquem as páginas durante a varredura
+        (ver _paginacao_consistente).
+        
+        Args:
+            uf, municipio, orgao, modalidade, situacao, data_inicio, data_fim:
+                Mesmos filtros de buscar_licitacoes
+            pagina_inicial: Primeira página a ser buscada
+            tamanho_pagina: Quantidade de itens por página
+            max_paginas: Limite de páginas a buscar (None = todas)
+            prefetch: Páginas lidas antecipadamente (0 desativa a thread; ignorado com fluxo)
+            ordenacao: Campo e direção da ordenação
+            consistente: Descartar registros repetidos ou publicados após o início
         
-        # Converter para DataFrame
-        dados_formatados = [LicitacaoProcessor.extrair_informacoes_principais(lic) for lic in licitacoes]
-        df = pd.DataFrame(dados_formatados)
+        Returns:
+            Iterador de licitações (Dict)
+        
+        Raises:
+            ErroPNCP: se alguma página não puder ser obtida
+        """
+        paginas = self.iterar_paginas(
+            pagina_inicial=pagina_inicial,
+            tamanho_pagina=tamanho_pagina,
+            max_paginas=max_paginas,
+            ordenacao=ordenacao,
+            uf=uf,
+            municipio=municipio,
+            orgao=orgao,
+            modalidade=modalidade,
+            situacao=situacao,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+        
+        if self.fluxo:
+            # Cada item sai enquanto o corpo da página ainda está chegando; o
+            # prefetch não se aplica (ele leria as páginas inteiras à frente)
+            itens_por_pagina = self._paginas_em_fluxo(
+                pagina_inicial=pagina_inicial,
+                tamanho_pagina=tamanho_pagina,
+                max_paginas=max_paginas,
+                ordenacao=ordenacao,
+                uf=uf,
+                municipio=municipio,
+                orgao=orgao,
+                modalidade=modalidade,
+                situacao=situacao,
+                data_inicio=data_inicio,
+                data_fim=data_fim
+            )
+        else:
+            if prefetch > 0:
+                paginas = _com_prefetch(paginas, prefetch)
+            itens_por_pagina = (resultado.get('items', []) for resultado in paginas)
         
-        # Salvar Excel
-        df.to_excel(nome_arquivo, index=False, engine='openpyxl')
-        print(f"Dados salvos em: {nome_arquivo}")
+        if consistente:
+            yield from _paginacao_consistente(itens_por_pagina, ordenacao)
+            return
+        
+        for itens in itens_por_pagina:
+            yield from itens
     
-    @staticmethod
-    def salvar_para_csv(licitacoes: List[Dict], nome_arquivo: str = None):
-        """Salva licitações em arquivo CSV"""
-        if not nome_arquivo:
-            nome_arquivo = f"licitacoes_pncp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    def _paginas_em_fluxo(self,
+                          pagina_inicial: int,
+                          tamanho_pagina: int,
+                          max_paginas: Optional[int],
+                          ordenacao: str,
+                          **filtros) -> Iterator[Iterator[Dict]]:
+        """
+        Como iterar_paginas, mas cada página é um gerador de itens em fluxo
+        
+        Cada página precisa ser consumida antes de pedir a seguinte: o fim
+        da paginação é decidido pela quantidade de itens que ela trouxe.
+        """
+        pagina = pagina_inicial
+        paginas_lidas = 0
         
-        # Converter para DataFrame
-        dados_formatados = [LicitacaoProcessor.extrair_informacoes_principais(lic) for lic in licitacoes]
-        df = pd.DataFrame(dados_formatados)
+        while max_paginas is None or paginas_lidas < max_paginas:
+            metadados = {}
+            yield self.buscar_licitacoes_em_fluxo(pagina=pagina, tamanho_pagina=tamanho_pagina,
+                                                  ordenacao=ordenacao, metadados=metadados, **filtros)
+            paginas_lidas += 1
+            
+            quantidade = metadados.get('quantidade', 0)
+            total = metadados.get('total') or 0
+            if quantidade < tamanho_pagina or (total and pagina * tamanho_pagina >= total):
+                break
+            pagina += 1
+
+
+def _paginacao_consistente(paginas: Iterable[Iterable[Dict]], ordenacao: str) -> Iterator[Dict]:
+    """
+    Gera os itens das páginas (cada uma, um iterável de itens) como se a
+    consulta fosse paginada por chave (data da ordenação + identificador)
+    em vez de deslocamento
+
+    A API só pagina por deslocamento: cada publicação nova empurra os
+    registros para a página seguinte, que então repete o fim da anterior.
+    A data do último registro emitido funciona como âncora: um registro
+    que, pela ordenação, viria antes dela já saiu (ou foi publicado depois
+    do início da varredura e fica para a próxima) e é descartado. Empates
+    na âncora são resolvidos pelo identificador (chave_licitacao), guardado
+    só enquanto a âncora não muda, então a memória não cresce com o
+    resultado.
+
+    Se uma página vier fora da ordem pedida (a API ignorou o `sort`), a
+    âncora deixa de valer e os identificadores já emitidos passam a ser
+    lembrados até o fim da varredura. A ordem é conferida item a item,
+    então as páginas podem ser geradores em fluxo; os itens da página
+    emitidos antes de a desordem aparecer também passam a ser lembrados.
+    """
+    campo, _, direcao = ordenacao.partition(',')
+    decrescente = direcao.strip().lower() != 'asc'
+    ordenada = True
+    ancora: Optional[str] = None
+    na_ancora = set()   # identidades emitidas com a data da âncora
+    vistas = set()      # registros sem data (ou todos, se a ordem não for confiável)
+    
+    for itens in paginas:
+        anterior: Optional[str] = None   # data do item anterior desta página
+        na_pagina = []                   # identidades emitidas nesta página pela âncora
         
-        # Salvar CSV
-        df.to_csv(nome_arquivo, index=False, encoding='utf-8-sig')
-        print(f"Dados salvos em: {nome_arquivo}")
+        for item in itens:
+            chave = chave_tempo(item.get(campo))
+            identidade = chave_licitacao(item)
+            
+            if ordenada and chave:
+                if anterior and anterior != chave and (anterior < chave) == decrescente:
+                    ordenada = False
+                    vistas.update(na_ancora)
+                    vistas.update(na_pagina)
+                    na_ancora.clear()
+                anterior = chave
+            
+            if not ordenada or chave is None:
+                if identidade is not None:
+                    if identidade in vistas:
+                        metricas.incrementar('pncp_paginacao_descartados_total', motivo='repetido')
+                        continue
+                    vistas.add(identidade)
+                yield item
+                continue
+            
+            if ancora is not None and chave != ancora:
+                if (chave > ancora) == decrescente:
+                    # Anterior à âncora na ordenação: deslocado ou publicado depois do início
+                    metricas.incrementar('pncp_paginacao_descartados_total', motivo='fora_da_janela')
+                    continue
+                na_ancora.clear()
+            ancora = chave
+            
+            if identidade is not None:
+                if identidade in na_ancora:
+                    metricas.incrementar('pncp_paginacao_descartados_total', motivo='repetido')
+                    continue
+                na_ancora.add(identidade)
+                na_pagina.append(identidade)
+            yield item
+
+
+_FIM = object()
+
+
+def _com_prefetch(iteravel: Iterable, tamanho: int) -> Iterator:
+    """
+    Consome `iteravel` em uma thread de apoio, mantendo no máximo
+    `tamanho` elementos prontos à frente do consumidor
+    """
+    fila = queue.Queue(maxsize=tamanho)
+    parar = threading.Event()
+    
+    def colocar(item) -> bool:
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produtor():
+        try:
+            for item in iteravel:
+                if not colocar(item):
+                    return
+        except Exception as e:
+            colocar(e)
+        finally:
+            colocar(_FIM)
+    
+    thread = threading.Thread(target=produtor, name='pncp-prefetch', daemon=True)
+    thread.start()
+    
+    try:
+        while True:
+            item = fila.get()
+            if item is _FIM:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Consumidor encerrou (ou abandonou o iterador): liberar o produtor
+        parar.set()
+        thread.join(timeout=1)
 
 
 def main():
@@ -221,6 +532,9 @@ def main():
             tamanho_pagina=args.tamanho
         )
     
+    if 'erro' in resultado:
+        sys.exit(1)
+    
     licitacoes = resultado.get('items', [])
     total = resultado.get('total', 0)
     
@@ -231,8 +545,7 @@ def main():
     print(f"Exibindo: {len(licitacoes)} licitações\n")
     
     # Exibir licitações
-    for i, licitacao in enumerate(licitacoes, 1):
-        info = processor.extrair_informacoes_principais(licitacao)
+    for i, info in enumerate(processor.extrair_informacoes_lote(licitacoes), 1):
         print(f"--- LICITAÇÃO {i} ---")
         for chave, valor in info.items():
             print(f"{chave}: {valor}")
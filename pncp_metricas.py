@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Métricas de execução (latência, bytes, retentativas, cache, registros e
+tempo por etapa) e perfil cProfile para o main.py
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import config
+
+
+# Descrição (HELP) e tipo de cada métrica conhecida, usados na saída Prometheus
+METRICAS = {
+    'pncp_http_requisicoes_total': ('counter', 'Requisições HTTP feitas ao PNCP, por host e status'),
+    'pncp_http_latencia_segundos': ('histogram', 'Latência de cada tentativa de requisição HTTP'),
+    'pncp_http_bytes_recebidos_total': ('counter', 'Bytes recebidos nos corpos das respostas HTTP'),
+    'pncp_http_retentativas_total': ('counter', 'Novas tentativas após falhas transitórias'),
+    'pncp_http_nao_modificadas_total': ('counter', 'Respostas 304 (revalidação condicional sem novo download)'),
+    'pncp_cache_acertos_total': ('counter', 'Requisições servidas pelo cache local'),
+    'pncp_cache_falhas_total': ('counter', 'Requisições não encontradas no cache local'),
+    'pncp_paginas_total': ('counter', 'Páginas de resultado lidas, por origem'),
+    'pncp_registros_total': ('counter', 'Registros lidos, formatados ou exportados, por origem'),
+    'pncp_paginacao_descartados_total': ('counter', 'Registros descartados pela paginação consistente, por motivo'),
+    'pncp_etapa_segundos_total': ('counter', 'Tempo acumulado em cada etapa da execução'),
+    'pncp_execucao_segundos': ('gauge', 'Duração total da execução'),
+    'pncp_corrida_total': ('counter', 'Corridas API x web em --metodo auto, por fonte vencedora'),
+    'pncp_vigia_consultas_total': ('counter', 'Consultas feitas pelo modo vigia'),
+    'pncp_vigia_novas_total': ('counter', 'Licitações novas encontradas pelo modo vigia'),
+    'pncp_vigia_intervalo_segundos': ('gauge', 'Intervalo atual entre as consultas do modo vigia'),
+    'pncp_alertas_total': ('counter', 'Licitações que atenderam a pelo menos um perfil de alerta'),
+    'pncp_corrida_economia_segundos': ('gauge', 'Tempo economizado pela corrida em relação à busca sequencial'),
+}
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def _rotulos(rotulos: Dict) -> Rotulos:
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + '}'
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+class _Histograma:
+    """Contagem por balde (não cumulativa), soma e máximo das observações"""
+
+    __slots__ = ('baldes', 'contagem', 'soma', 'maximo')
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.baldes = [0] * (len(limites) + 1)  # o último é o +Inf
+        self.contagem = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+
+class Metricas:
+    """
+    Registro de métricas do processo: contadores, histogramas e gauges com rótulos
+
+    Pode ser usado por várias threads ao mesmo tempo. O histograma de
+    latência usa baldes fixos (config.METRICAS_BALDES_LATENCIA), então a
+    memória não cresce com o número de requisições.
+    """
+
+    def __init__(self, limites: Tuple[float, ...] = config.METRICAS_BALDES_LATENCIA):
+        self.limites = tuple(sorted(limites))
+        self._contadores: Dict[Tuple[str, Rotulos], float] = {}
+        self._gauges: Dict[Tuple[str, Rotulos], float] = {}
+        self._histogramas: Dict[Tuple[str, Rotulos], _Histograma] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos):
+        chave = (nome, _rotulos(rotulos))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def definir(self, nome: str, valor: float, **rotulos):
+        with self._lock:
+            self._gauges[(nome, _rotulos(rotulos))] = valor
+
+    def observar(self, nome: str, valor: float, **rotulos):
+        chave = (nome, _rotulos(rotulos))
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = _Histograma(self.limites)
+            histograma.baldes[indice] += 1
+            histograma.contagem += 1
+            histograma.soma += valor
+            if valor > histograma.maximo:
+                histograma.maximo = valor
+
+    @contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        """Soma o tempo do bloco ao total da etapa (pncp_etapa_segundos_total)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.incrementar('pncp_etapa_segundos_total', time.perf_counter() - inicio, etapa=nome)
+
+    def valor(self, nome: str, **rotulos) -> float:
+        """Valor atual de um contador ou gauge (0 se nunca registrado)"""
+        chave = (nome, _rotulos(rotulos))
+        with self._lock:
+            return self._contadores.get(chave, self._gauges.get(chave, 0))
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._gauges.clear()
+            self._histogramas.clear()
+
+    def _quantil(self, histograma: _Histograma, q: float) -> Optional[float]:
+        # Estimativa pelo limite superior do balde, como o histogram_quantile do Prometheus
+        if not histograma.contagem:
+            return None
+        alvo = q * histograma.contagem
+        acumulado = 0
+        for limite, quantidade in zip(self.limites, histograma.baldes):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min(limite, histograma.maximo)
+        return histograma.maximo
+
+    def resumo(self) -> Dict:
+        """Métricas em um dicionário serializável em JSON"""
+        with self._lock:
+            contadores = dict(self._contadores)
+            gauges = dict(self._gauges)
+            histogramas = {chave: (list(h.baldes), h.contagem, h.soma, h.maximo)
+                           for chave, h in self._histogramas.items()}
+
+        resultado: Dict = {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'etapas': {},
+            'contadores': {},
+            'gauges': {},
+            'histogramas': {},
+        }
+        for (nome, rotulos), valor in sorted(contadores.items()):
+            if nome == 'pncp_etapa_segundos_total':
+                resultado['etapas'][dict(rotulos)['etapa']] = round(valor, 6)
+            resultado['contadores'].setdefault(nome, []).append({'rotulos': dict(rotulos), 'valor': valor})
+        for (nome, rotulos), valor in sorted(gauges.items()):
+            resultado['gauges'].setdefault(nome, []).append({'rotulos': dict(rotulos), 'valor': valor})
+        for (nome, rotulos), (baldes, contagem, soma, maximo) in sorted(histogramas.items()):
+            h = _Histograma(self.limites)
+            h.baldes, h.contagem, h.soma, h.maximo = baldes, contagem, soma, maximo
+            resultado['histogramas'].setdefault(nome, []).append({
+                'rotulos': dict(rotulos),
+                'contagem': contagem,
+                'soma': soma,
+                'media': soma / contagem if contagem else None,
+                'max': maximo,
+                'p50': self._quantil(h, 0.50),
+                'p95': self._quantil(h, 0.95),
+                'p99': self._quantil(h, 0.99),
+                'baldes': {_numero(limite): quantidade
+                           for limite, quantidade in zip(self.limites + (float('inf'),), baldes)},
+            })
+        return resultado
+
+    def para_prometheus(self) -> str:
+        """Métricas no formato texto do Prometheus (textfile collector do node_exporter)"""
+        with self._lock:
+            series: Dict[str, List] = {}
+            for (nome, rotulos), valor in self._contadores.items():
+                series.setdefault(nome, []).append((rotulos, valor))
+            for (nome, rotulos), valor in self._gauges.items():
+                series.setdefault(nome, []).append((rotulos, valor))
+            for (nome, rotulos), h in self._histogramas.items():
+                series.setdefault(nome, []).append((rotulos, (list(h.baldes), h.contagem, h.soma)))
+
+        linhas = []
+        for nome in sorted(series):
+            tipo, descricao = METRICAS.get(nome, ('untyped', ''))
+            if descricao:
+                linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for rotulos, valor in sorted(series[nome]):
+                if tipo != 'histogram':
+                    linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}')
+                    continue
+                baldes, contagem, soma = valor
+                acumulado = 0
+                for limite, quantidade in zip(self.limites + (float('inf'),), baldes):
+                    acumulado += quantidade
+                    le = '+Inf' if limite == float('inf') else _numero(limite)
+                    linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos, ("le", le))} {acumulado}')
+                linhas.append(f'{nome}_sum{_formatar_rotulos(rotulos)} {_numero(soma)}')
+                linhas.append(f'{nome}_count{_formatar_rotulos(rotulos)} {contagem}')
+        return '\n'.join(linhas) + '\n'
+
+    def salvar(self, caminho: str):
+        """
+        Grava as métricas em `caminho`: formato Prometheus se terminar em
+        .prom, JSON nos demais casos
+
+        A gravação é atômica (arquivo temporário + rename), como o textfile
+        collector exige.
+        """
+        if caminho.endswith('.prom'):
+            conteudo = self.para_prometheus()
+        else:
+            conteudo = json.dumps(self.resumo(), ensure_ascii=False, indent=2) + '\n'
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+
+# Registro compartilhado por clientes, scraper, processador e escritores
+metricas = Metricas()
+
+
+@contextmanager
+def perfilar(arquivo: Optional[str]) -> Iterator[None]:
+    """
+    Executa o bloco sob o cProfile e grava as estatísticas em `arquivo`
+    (sem arquivo, o bloco roda normalmente)
+
+    O resultado pode ser lido com `python -m pstats arquivo` ou snakeviz.
+    """
+    if not arquivo:
+        yield
+        return
+
+    import cProfile
+
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        perfil.dump_stats(arquivo)
+        print(f"Perfil salvo em: {arquivo} (python -m pstats {arquivo})")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Registro compacto de licitação (Licitacao): campos em __slots__, textos
+repetidos internados e datas convertidas para datetime
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Um dict da API carrega a própria tabela de ~50 chaves e sua cópia de
+textos como orgao_nome, unidade_nome ou modalidade_licitacao_nome, que
+se repetem em milhares de registros. Licitacao guarda os campos conhecidos
+em slots, compartilha uma única cópia de cada texto repetido (sys.intern)
+e guarda as datas como datetime. Continua sendo um mapeamento (get, [],
+in, keys, items, copy), então o código que lê dicts lê Licitacao.
+"""
+
+import itertools
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Dict, Iterator
+
+from pncp_sync import ler_data_iso
+
+
+# Campos de um item da API, na ordem em que ela os envia
+CAMPOS = (
+    'id', 'index', 'doc_type', 'title', 'description', 'item_url', 'document_type', 'createdAt',
+    'numero', 'ano', 'numero_sequencial', 'numero_sequencial_compra_ata', 'numero_controle_pncp',
+    'orgao_id', 'orgao_cnpj', 'orgao_nome', 'orgao_subrogado_id', 'orgao_subrogado_nome',
+    'unidade_id', 'unidade_codigo', 'unidade_nome', 'esfera_id', 'esfera_nome', 'poder_id', 'poder_nome',
+    'municipio_id', 'municipio_nome', 'uf', 'modalidade_licitacao_id', 'modalidade_licitacao_nome',
+    'situacao_id', 'situacao_nome', 'data_publicacao_pncp', 'data_atualizacao_pncp', 'data_assinatura',
+    'data_inicio_vigencia', 'data_fim_vigencia', 'cancelado', 'valor_global', 'tem_resultado',
+    'tipo_id', 'tipo_nome', 'tipo_contrato_id', 'tipo_contrato_nome', 'fonte_orcamentaria',
+    'fonte_orcamentaria_id', 'fonte_orcamentaria_nome', 'exigencia_conteudo_nacional',
+    'tipo_margem_preferencia', 'tipo_margem_preferencia_id', 'tipo_margem_preferencia_nome',
+)
+_SLOTS = frozenset(CAMPOS)
+
+# Textos que se repetem entre registros (categorias, órgão, unidade e município)
+CAMPOS_INTERNADOS = frozenset({
+    'index', 'doc_type', 'document_type', 'ano',
+    'orgao_id', 'orgao_cnpj', 'orgao_nome', 'orgao_subrogado_id', 'orgao_subrogado_nome',
+    'unidade_id', 'unidade_codigo', 'unidade_nome', 'esfera_id', 'esfera_nome', 'poder_id', 'poder_nome',
+    'municipio_id', 'municipio_nome', 'uf', 'modalidade_licitacao_id', 'modalidade_licitacao_nome',
+    'situacao_id', 'situacao_nome', 'tipo_id', 'tipo_nome', 'tipo_contrato_id', 'tipo_contrato_nome',
+    'fonte_orcamentaria_id', 'fonte_orcamentaria_nome', 'tipo_margem_preferencia_id',
+    'tipo_margem_preferencia_nome',
+})
+
+CAMPOS_DATA = frozenset({
+    'createdAt', 'data_publicacao_pncp', 'data_atualizacao_pncp', 'data_assinatura',
+    'data_inicio_vigencia', 'data_fim_vigencia',
+})
+
+_intern = sys.intern
+
+
+def _para_datetime(valor):
+    """Texto ISO vira datetime (fração limitada a microssegundos, fuso preservado); o resto fica como veio"""
+    if isinstance(valor, str):
+        data = ler_data_iso(valor)
+        if data is not None:
+            return data
+    return valor
+
+
+class Licitacao(MutableMapping):
+    """
+    Licitação com os campos da API em __slots__
+
+    Campos ausentes no registro de origem continuam ausentes (`in`, `get`
+    e `keys` se comportam como no dict); chaves fora de CAMPOS ficam em um
+    dict à parte. As datas saem como datetime, e `para_dict()` devolve o
+    registro no formato da API, com as datas em texto ISO 8601.
+    """
+
+    __slots__ = CAMPOS + ('_extras',)
+
+    def __init__(self, dados=(), **campos):
+        self._extras = None
+        if hasattr(dados, 'items'):
+            dados = dados.items()
+        # Mesmo tratamento de __setitem__, sem uma chamada de método por campo
+        for chave, valor in itertools.chain(dados, campos.items()):
+            if chave in _SLOTS:
+                if chave in CAMPOS_INTERNADOS:
+                    if type(valor) is str:
+                        valor = _intern(valor)
+                elif chave in CAMPOS_DATA:
+                    valor = _para_datetime(valor)
+                setattr(self, chave, valor)
+            else:
+                self[chave] = valor
+
+    def __setitem__(self, chave, valor):
+        if chave in _SLOTS:
+            if type(valor) is str and chave in CAMPOS_INTERNADOS:
+                valor = _intern(valor)
+            elif chave in CAMPOS_DATA:
+                valor = _para_datetime(valor)
+            setattr(self, chave, valor)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[chave] = valor
+
+    def __getitem__(self, chave):
+        if chave in _SLOTS:
+            try:
+                return getattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        if self._extras is not None and chave in self._extras:
+            return self._extras[chave]
+        raise KeyError(chave)
+
+    def get(self, chave, padrao=None):
+        # Sem exceção por campo ausente: é o acesso mais frequente
+        if chave in _SLOTS:
+            return getattr(self, chave, padrao)
+        return self._extras.get(chave, padrao) if self._extras is not None else padrao
+
+    def __contains__(self, chave) -> bool:
+        if chave in _SLOTS:
+            return hasattr(self, chave)
+        return self._extras is not None and chave in self._extras
+
+    def __delitem__(self, chave):
+        if chave in _SLOTS:
+            try:
+                delattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        elif self._extras is not None and chave in self._extras:
+            del self._extras[chave]
+        else:
+            raise KeyError(chave)
+
+    def __iter__(self) -> Iterator[str]:
+        for campo in CAMPOS:
+            if hasattr(self, campo):
+                yield campo
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> 'Licitacao':
+        """Cópia rasa (os textos e datetimes são imutáveis e compartilhados)"""
+        copia = Licitacao.__new__(Licitacao)
+        for campo in CAMPOS:
+            if hasattr(self, campo):
+                setattr(copia, campo, getattr(self, campo))
+        copia._extras = dict(self._extras) if self._extras else None
+        return copia
+
+    def para_dict(self) -> Dict:
+        """Registro no formato da API (datas em texto ISO 8601)"""
+        return {chave: valor.isoformat() if isinstance(valor, datetime) else valor
+                for chave, valor in self.items()}
+
+    def __repr__(self) -> str:
+        return f"Licitacao({self.para_dict()!r})"
+
+
+def para_json(objeto):
+    """`default` do json.dumps: Licitacao vira dict e datetime, texto ISO"""
+    if isinstance(objeto, Licitacao):
+        return objeto.para_dict()
+    if isinstance(objeto, datetime):
+        return objeto.isoformat()
+    raise TypeError(f"Objeto do tipo {type(objeto).__name__} não é serializável em JSON")
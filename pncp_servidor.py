@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Serviço HTTP (JSON) do painel index.html: licitações paginadas no servidor,
+estatísticas e listas dos filtros, com gzip e ETag/304
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+
+Uso:
+    python pncp_servidor.py                      # base local (--salvar-local)
+    python pncp_servidor.py --fonte api --porta 8080
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import config
+from pncp_erros import ErroPNCP
+from pncp_sync import chave_licitacao
+
+
+ARQUIVO_PAINEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+
+# Campos usados pelos cartões do painel; o restante do registro não é enviado
+_CAMPOS_PAINEL = [
+    'title',
+    'numero_controle_pncp',
+    'orgao_nome',
+    'municipio_nome',
+    'uf',
+    'modalidade_licitacao_nome',
+    'situacao_nome',
+    'data_publicacao_pncp',
+    'data_inicio_vigencia',
+    'data_fim_vigencia',
+    'valor_global',
+    'item_url',
+]
+
+# Parâmetros de consulta repassados às fontes (mesmos nomes do objeto `filtros` do painel)
+_FILTROS = ['uf', 'municipio', 'orgao', 'modalidade', 'data_inicio', 'data_fim']
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro de consulta inválido (resposta 400)"""
+
+
+def _inicio_novas() -> datetime:
+    return datetime.now() - timedelta(hours=config.NOVAS_JANELA_HORAS)
+
+
+def _painel(licitacao: Dict, nova: bool) -> Dict:
+    registro = {campo: licitacao.get(campo) for campo in _CAMPOS_PAINEL}
+    registro['is_new'] = nova
+    return registro
+
+
+class FonteLocal:
+    """Licitações da base local (ArmazemLocal); novas são as gravadas há pouco"""
+
+    def __init__(self, armazem):
+        self.armazem = armazem
+
+    def pagina(self, filtros: Dict, apenas_novas: bool, pagina: int, por_pagina: int) -> Tuple[List[Dict], int]:
+        desde = _inicio_novas().isoformat(timespec='seconds')
+        resultado = self.armazem.buscar_licitacoes(pagina=pagina, tamanho_pagina=por_pagina,
+                                                   visto_desde=desde if apenas_novas else None, **filtros)
+        itens = resultado['items']
+        if apenas_novas:
+            novas = None
+        else:
+            novas = self.armazem.chaves_vistas_desde((chave_licitacao(item) for item in itens), desde)
+        return [_painel(item, novas is None or chave_licitacao(item) in novas) for item in itens], resultado['total']
+
+    def estatisticas(self) -> Dict:
+        return self.armazem.estatisticas()
+
+    def modalidades(self) -> List[str]:
+        return self.armazem.modalidades() or list(config.MODALIDADES_DISPONIVEIS)
+
+
+class FonteAPI:
+    """
+    Licitações consultadas na API do PNCP a cada requisição; novas são as
+    publicadas há pouco (a API não sabe o que o painel já mostrou)
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def _buscar(self, filtros: Dict, apenas_novas: bool, pagina: int, por_pagina: int) -> Dict:
+        filtros = dict(filtros)
+        if apenas_novas:
+            inicio = _inicio_novas().date().isoformat()
+            filtros['data_inicio'] = max(filtros.get('data_inicio') or inicio, inicio)
+        resultado = self.client.buscar_licitacoes(pagina=pagina, tamanho_pagina=por_pagina, **filtros)
+        if 'erro' in resultado:
+            raise ErroPNCP(resultado['erro'])
+        return resultado
+
+    def pagina(self, filtros: Dict, apenas_novas: bool, pagina: int, por_pagina: int) -> Tuple[List[Dict], int]:
+        resultado = self._buscar(filtros, apenas_novas, pagina, por_pagina)
+        desde = _inicio_novas().isoformat()
+        itens = [_painel(item, (item.get('data_publicacao_pncp') or '') >= desde)
+                 for item in resultado.get('items') or []]
+        return itens, resultado.get('total', len(itens))
+
+    def estatisticas(self) -> Dict:
+        # Sem base local, só os totais saem baratos (páginas de um item)
+        total = self._buscar({}, False, 1, 1).get('total', 0)
+        novas = self._buscar({}, True, 1, 1).get('total', 0)
+        return {'total_licitacoes': total, 'novas_hoje': novas, 'top_estados': [], 'top_orgaos': []}
+
+    def modalidades(self) -> List[str]:
+        return list(config.MODALIDADES_DISPONIVEIS)
+
+
+def _inteiro(consulta: Dict, nome: str, padrao: int, minimo: int, maximo: int) -> int:
+    try:
+        valor = int(consulta.get(nome, padrao))
+    except ValueError:
+        raise ParametroInvalido(f"'{nome}' deve ser um número inteiro")
+    return max(minimo, min(valor, maximo))
+
+
+def consultar_licitacoes(fonte, consulta: Dict) -> Dict:
+    """Resposta de /api/licitacoes: uma página de licitações e os dados da paginação"""
+    filtros = {nome: consulta[nome].strip() for nome in _FILTROS if consulta.get(nome, '').strip()}
+    apenas_novas = consulta.get('apenas_novas', '').lower() in ('1', 'true', 'sim')
+    pagina = _inteiro(consulta, 'page', 1, 1, 10 ** 6)
+    por_pagina = _inteiro(consulta, 'per_page', config.DEFAULT_PAGE_SIZE, 1, config.MAX_PAGE_SIZE)
+    for nome in ('data_inicio', 'data_fim'):
+        if nome in filtros:
+            try:
+                datetime.strptime(filtros[nome], '%Y-%m-%d')
+            except ValueError:
+                raise ParametroInvalido(f"'{nome}' deve estar no formato AAAA-MM-DD")
+
+    itens, total = fonte.pagina(filtros, apenas_novas, pagina, por_pagina)
+    paginas = (total + por_pagina - 1) // por_pagina
+    return {
+        'items': itens,
+        'pagination': {
+            'page': pagina,
+            'per_page': por_pagina,
+            'total': total,
+            'total_pages': paginas,
+            'has_next': pagina < paginas,
+            'has_prev': pagina > 1,
+        },
+    }
+
+
+def _etag(corpo: bytes) -> str:
+    # Fraca: o mesmo conteúdo pode sair com ou sem gzip
+    return f'W/"{hashlib.sha1(corpo).hexdigest()[:20]}"'
+
+
+def criar_servidor(fonte, host: str = config.SERVIDOR_HOST, porta: int = config.SERVIDOR_PORTA,
+                   arquivo_painel: str = ARQUIVO_PAINEL) -> ThreadingHTTPServer:
+    """Servidor HTTP do painel; `fonte` é uma FonteLocal ou FonteAPI"""
+
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, formato, *args):
+            sys.stderr.write(f"{self.address_string()} {formato % args}\n")
+
+        def _responder(self, status: int, corpo: bytes, tipo: str):
+            etag = _etag(corpo)
+            if status == 200 and etag in [valor.strip() for valor in
+                                          self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            comprimido = ('gzip' in self.headers.get('Accept-Encoding', '')
+                          and len(corpo) >= config.SERVIDOR_GZIP_MINIMO)
+            if comprimido:
+                corpo = gzip.compress(corpo, compresslevel=6, mtime=0)
+
+            self.send_response(status)
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(corpo)))
+            self.send_header('Vary', 'Accept-Encoding')
+            if status == 200:
+                # O navegador guarda a resposta, mas confirma (If-None-Match) antes de usar
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if comprimido:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(corpo)
+
+        def _json(self, status: int, dados):
+            corpo = json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._responder(status, corpo, 'application/json; charset=utf-8')
+
+        def do_GET(self):
+            partes = urlsplit(self.path)
+            consulta = {chave: valores[0] for chave, valores in parse_qs(partes.query).items()}
+            try:
+                if partes.path in ('/', '/index.html'):
+                    with open(arquivo_painel, 'rb') as f:
+                        self._responder(200, f.read(), 'text/html; charset=utf-8')
+                elif partes.path == '/api/licitacoes':
+                    self._json(200, consultar_licitacoes(fonte, consulta))
+                elif partes.path == '/api/estatisticas':
+                    self._json(200, fonte.estatisticas())
+                elif partes.path == '/api/estados':
+                    self._json(200, sorted(config.ESTADOS_BRASIL))
+                elif partes.path == '/api/modalidades':
+                    self._json(200, fonte.modalidades())
+                else:
+                    self._json(404, {'erro': 'recurso não encontrado'})
+            except ParametroInvalido as e:
+                self._json(400, {'erro': str(e)})
+            except ErroPNCP as e:
+                self._json(502, {'erro': f'falha ao consultar o PNCP: {e}'})
+
+        do_HEAD = do_GET
+
+    servidor = ThreadingHTTPServer((host, porta), Manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servir o painel index.html com dados do PNCP')
+    parser.add_argument('--fonte', choices=['local', 'api'], default='local',
+                        help='Base local (--salvar-local do main.py) ou consulta direta à API')
+    parser.add_argument('--banco', default=config.ARMAZEM_ARQUIVO, help='Arquivo da base local (SQLite)')
+    parser.add_argument('--host', default=config.SERVIDOR_HOST, help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=config.SERVIDOR_PORTA, help='Porta HTTP (0 = qualquer livre)')
+    args = parser.parse_args()
+
+    if args.fonte == 'local':
+        from pncp_store import ArmazemLocal
+
+        if not os.path.exists(args.banco):
+            print(f"⚠ Base local {args.banco} não existe; use `main.py --salvar-local` para preenchê-la")
+        armazem = ArmazemLocal(args.banco)
+        fonte = FonteLocal(armazem)
+    else:
+        from pncp_licitacoes import PNCPClient
+
+        armazem = None
+        fonte = FonteAPI(PNCPClient())
+
+    servidor = criar_servidor(fonte, args.host, args.porta)
+    host, porta = servidor.server_address[:2]
+    print(f"✓ Painel em http://{host}:{porta}/ (fonte: {args.fonte})", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        if armazem is not None:
+            armazem.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Armazenamento local (SQLite) de licitações do PNCP, com consultas offline
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+from pncp_busca import consulta_fts, texto_indexavel
+from pncp_consultas import expandir_lista
+from pncp_registro import para_json
+from pncp_sync import chave_licitacao
+
+
+# Colunas extraídas do registro para filtragem; o registro completo fica em `dados`
+_COLUNAS = [
+    'id',
+    'numero_controle_pncp',
+    'uf',
+    'municipio_id',
+    'municipio_nome',
+    'modalidade_licitacao_id',
+    'modalidade_licitacao_nome',
+    'orgao_cnpj',
+    'orgao_nome',
+    'situacao_id',
+    'situacao_nome',
+    'data_publicacao_pncp',
+    'data_atualizacao_pncp',
+]
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS licitacoes (
+    seq INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE,
+    {', '.join(f'{coluna} TEXT' for coluna in _COLUNAS)},
+    visto_em TEXT NOT NULL,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_uf ON licitacoes (uf);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_municipio_id ON licitacoes (municipio_id);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_municipio_nome ON licitacoes (municipio_nome COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_modalidade ON licitacoes (modalidade_licitacao_id);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_orgao_cnpj ON licitacoes (orgao_cnpj);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_situacao ON licitacoes (situacao_id);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_publicacao ON licitacoes (data_publicacao_pncp);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_visto_em ON licitacoes (visto_em);
+"""
+
+# Pesos do bm25 por coluna do índice: título, descrição, órgão
+_PESOS_BUSCA = (3.0, 1.0, 2.0)
+
+# Índice textual: título, descrição e órgão já reduzidos a radicais (pncp_busca);
+# o rowid de cada linha é o `seq` da licitação
+_ESQUEMA_BUSCA = f"""
+CREATE VIRTUAL TABLE licitacoes_fts USING fts5(
+    titulo, descricao, orgao,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+INSERT INTO licitacoes_fts (licitacoes_fts, rank) VALUES ('rank', 'bm25({', '.join(str(p) for p in _PESOS_BUSCA)})');
+"""
+
+# Contagens mantidas pelo próprio SQLite a cada gravação: dimensão -> expressão
+# sobre a linha de `licitacoes` (NULL não é contado)
+_DIMENSOES = {
+    'total': "''",
+    'uf': '{linha}.uf',
+    'orgao': '{linha}.orgao_nome',
+    'modalidade': '{linha}.modalidade_licitacao_nome',
+    'dia_publicacao': 'substr({linha}.data_publicacao_pncp, 1, 10)',
+    'dia_visto': 'substr({linha}.visto_em, 1, 10)',
+}
+
+
+def _somar(linha: str, delta: str) -> str:
+    """Comandos de gatilho que somam `delta` às contagens dos valores de `linha` (NEW/OLD)"""
+    comandos = []
+    for dimensao, expressao in _DIMENSOES.items():
+        valor = expressao.format(linha=linha)
+        if delta == '+ 1':
+            comandos.append(
+                f"INSERT INTO agregados (dimensao, valor, contagem) SELECT '{dimensao}', {valor}, 1 "
+                f"WHERE {valor} IS NOT NULL "
+                f"ON CONFLICT (dimensao, valor) DO UPDATE SET contagem = contagem + 1;"
+            )
+        else:
+            comandos.append(
+                f"UPDATE agregados SET contagem = contagem - 1 WHERE dimensao = '{dimensao}' AND valor = {valor};"
+                f"DELETE FROM agregados WHERE dimensao = '{dimensao}' AND valor = {valor} AND contagem <= 0;"
+            )
+    return '\n    '.join(comandos)
+
+
+# Agregados do painel: contagem por dimensão e valor, mais a quantidade de
+# valores distintos por dimensão (dimensão '#distintos'); o índice por
+# contagem responde aos "top K" lendo só K entradas
+_ESQUEMA_AGREGADOS = f"""
+CREATE TABLE agregados (
+    dimensao TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    contagem INTEGER NOT NULL,
+    PRIMARY KEY (dimensao, valor)
+) WITHOUT ROWID;
+CREATE INDEX idx_agregados_contagem ON agregados (dimensao, contagem DESC, valor);
+
+CREATE TRIGGER agregados_distintos_mais AFTER INSERT ON agregados WHEN NEW.dimensao <> '#distintos' BEGIN
+    INSERT INTO agregados (dimensao, valor, contagem) VALUES ('#distintos', NEW.dimensao, 1)
+    ON CONFLICT (dimensao, valor) DO UPDATE SET contagem = contagem + 1;
+END;
+CREATE TRIGGER agregados_distintos_menos AFTER DELETE ON agregados WHEN OLD.dimensao <> '#distintos' BEGIN
+    UPDATE agregados SET contagem = contagem - 1 WHERE dimensao = '#distintos' AND valor = OLD.dimensao;
+END;
+
+CREATE TRIGGER licitacoes_agregar AFTER INSERT ON licitacoes BEGIN
+    {_somar('NEW', '+ 1')}
+END;
+CREATE TRIGGER licitacoes_reagregar AFTER UPDATE ON licitacoes
+WHEN OLD.uf IS NOT NEW.uf OR OLD.orgao_nome IS NOT NEW.orgao_nome
+    OR OLD.modalidade_licitacao_nome IS NOT NEW.modalidade_licitacao_nome
+    OR OLD.data_publicacao_pncp IS NOT NEW.data_publicacao_pncp BEGIN
+    {_somar('OLD', '- 1')}
+    {_somar('NEW', '+ 1')}
+END;
+CREATE TRIGGER licitacoes_desagregar AFTER DELETE ON licitacoes BEGIN
+    {_somar('OLD', '- 1')}
+END;
+"""
+
+
+def _texto(valor) -> Optional[str]:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return None if valor is None or valor == '' else str(valor)
+
+
+class ArmazemLocal:
+    """
+    Base local de licitações em SQLite
+
+    Os registros são gravados (upsert) pela chave numero_controle_pncp/id
+    e podem ser consultados com os mesmos filtros do PNCPClient, sem
+    acesso à rede. Pode ser compartilhado entre threads; entre processos,
+    uma gravação espera até `timeout` segundos pelas outras conexões.
+    """
+
+    def __init__(self, caminho: str = config.ARMAZEM_ARQUIVO, timeout: float = config.ARMAZEM_TIMEOUT):
+        self.caminho = caminho
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(caminho, timeout=timeout, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_ESQUEMA)
+
+        existe_busca = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'licitacoes_fts'").fetchone()
+        if not existe_busca:
+            self._conn.executescript(_ESQUEMA_BUSCA)
+            self.reindexar_busca()
+
+        existem_agregados = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'agregados'").fetchone()
+        if not existem_agregados:
+            self._conn.executescript(_ESQUEMA_AGREGADOS)
+            self.reconstruir_agregados()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+    # Gravação
+
+    def salvar(self, licitacoes: Iterable[Dict]) -> int:
+        """
+        Grava (insere ou atualiza) as licitações
+
+        Returns:
+            Quantidade de registros gravados
+        """
+        agora = datetime.now().isoformat(timespec='seconds')
+        # Uma linha por chave (vale a última): a mesma licitação pode vir em
+        # duas páginas ou janelas do mesmo lote, e o índice textual só aceita uma
+        por_chave: Dict[str, Dict] = {}
+        for licitacao in licitacoes:
+            chave = chave_licitacao(licitacao)
+            if chave:
+                por_chave[chave] = licitacao
+        linhas = [
+            (chave,)
+            + tuple(_texto(licitacao.get(coluna)) for coluna in _COLUNAS)
+            + (agora, json.dumps(licitacao, ensure_ascii=False, default=para_json))
+            for chave, licitacao in por_chave.items()
+        ]
+
+        atualizacoes = ', '.join(f'{coluna} = excluded.{coluna}' for coluna in _COLUNAS + ['dados'])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO licitacoes (chave, {', '.join(_COLUNAS)}, visto_em, dados) "
+                f"VALUES ({', '.join('?' * (len(_COLUNAS) + 3))}) "
+                f"ON CONFLICT(chave) DO UPDATE SET {atualizacoes}",
+                linhas
+            )
+            self._indexar_texto(list(por_chave.items()))
+        return len(linhas)
+
+    def _indexar_texto(self, registros: List[Tuple[str, Dict]]):
+        """Atualiza o índice textual das licitações (chamar dentro da transação)"""
+        self._conn.executemany(
+            'DELETE FROM licitacoes_fts WHERE rowid = (SELECT seq FROM licitacoes WHERE chave = ?)',
+            [(chave,) for chave, _ in registros]
+        )
+        self._conn.executemany(
+            'INSERT INTO licitacoes_fts (rowid, titulo, descricao, orgao) '
+            'SELECT seq, ?, ?, ? FROM licitacoes WHERE chave = ?',
+            [
+                (texto_indexavel(licitacao.get('title') or ''),
+                 texto_indexavel(licitacao.get('description') or ''),
+                 texto_indexavel(licitacao.get('orgao_nome') or ''),
+                 chave)
+                for chave, licitacao in registros
+            ]
+        )
+
+    def reindexar_busca(self, lote: int = 1000):
+        """Reconstrói o índice textual a partir das licitações armazenadas"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM licitacoes_fts')
+            cursor = self._conn.execute('SELECT chave, dados FROM licitacoes')
+            while True:
+                linhas = cursor.fetchmany(lote)
+                if not linhas:
+                    break
+                self._indexar_texto([(chave, json.loads(dados)) for chave, dados in linhas])
+
+    def reconstruir_agregados(self):
+        """Recalcula as contagens do painel a partir das licitações armazenadas"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM agregados')
+            for dimensao, expressao in _DIMENSOES.items():
+                valor = expressao.format(linha='licitacoes')
+                self._conn.execute(
+                    f"INSERT INTO agregados (dimensao, valor, contagem) "
+                    f"SELECT '{dimensao}', {valor}, COUNT(*) FROM licitacoes "
+                    f"WHERE {valor} IS NOT NULL GROUP BY {valor}"
+                )
+
+    def gravar_fluxo(self, licitacoes: Iterable[Dict], lote: int = 500) -> Iterator[Dict]:
+        """
+        Repassa as licitações adiante, gravando-as em lotes pelo caminho
+
+        Útil para armazenar um fluxo (ex: --todas-paginas) sem materializá-lo.
+        """
+        pendentes = []
+        try:
+            for licitacao in licitacoes:
+                pendentes.append(licitacao)
+                if len(pendentes) >= lote:
+                    self.salvar(pendentes)
+                    pendentes = []
+                yield licitacao
+        finally:
+            if pendentes:
+                self.salvar(pendentes)
+
+    # Consulta
+
+    def _filtros_sql(self,
+                     uf: Optional[str] = None,
+                     municipio: Optional[str] = None,
+                     orgao: Optional[str] = None,
+                     modalidade: Optional[str] = None,
+                     situacao: Optional[str] = None,
+                     data_inicio: Optional[str] = None,
+                     data_fim: Optional[str] = None,
+                     visto_desde: Optional[str] = None) -> Tuple[str, List]:
+        """Monta a cláusula WHERE; uf, modalidade e situação aceitam listas"""
+        condicoes = []
+        parametros: List = []
+
+        def em(coluna: str, valores: List[str], nocase: bool = False):
+            colacao = ' COLLATE NOCASE' if nocase else ''
+            condicoes.append(f"{coluna}{colacao} IN ({', '.join('?' * len(valores))})")
+            parametros.extend(valores)
+
+        def id_ou_nome(coluna_id: str, coluna_nome: str, valor: Optional[str]):
+            valores = [v for v in expandir_lista(valor) if v]
+            if not valores:
+                return
+            ids = [v for v in valores if v.isdigit()]
+            nomes = [v for v in valores if not v.isdigit()]
+            partes = []
+            if ids:
+                partes.append(f"{coluna_id} IN ({', '.join('?' * len(ids))})")
+                parametros.extend(ids)
+            if nomes:
+                partes.append(f"{coluna_nome} COLLATE NOCASE IN ({', '.join('?' * len(nomes))})")
+                parametros.extend(nomes)
+            condicoes.append(f"({' OR '.join(partes)})")
+
+        ufs = [v.upper() for v in expandir_lista(uf, config.ESTADOS_BRASIL) if v]
+        if ufs:
+            em('uf', ufs)
+        id_ou_nome('municipio_id', 'municipio_nome', municipio)
+        id_ou_nome('modalidade_licitacao_id', 'modalidade_licitacao_nome', modalidade)
+        id_ou_nome('situacao_id', 'situacao_nome', situacao)
+
+        if orgao:
+            cnpj = ''.join(c for c in orgao if c.isdigit())
+            if len(cnpj) == 14:
+                condicoes.append('orgao_cnpj = ?')
+                parametros.append(cnpj)
+            else:
+                condicoes.append('orgao_nome LIKE ?')
+                parametros.append(f'%{orgao}%')
+
+        if data_inicio:
+            condicoes.append('data_publicacao_pncp >= ?')
+            parametros.append(data_inicio)
+        if data_fim:
+            # data_fim é inclusiva: tudo antes do dia seguinte
+            condicoes.append('data_publicacao_pncp < ?')
+            parametros.append((date.fromisoformat(data_fim) + timedelta(days=1)).isoformat())
+        if visto_desde:
+            condicoes.append('visto_em >= ?')
+            parametros.append(visto_desde)
+
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        return where, parametros
+
+    def buscar_licitacoes(self,
+                          uf: Optional[str] = None,
+                          municipio: Optional[str] = None,
+                          orgao: Optional[str] = None,
+                          modalidade: Optional[str] = None,
+                          situacao: Optional[str] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None,
+                          pagina: int = 1,
+                          tamanho_pagina: int = 20,
+                          visto_desde: Optional[str] = None) -> Dict:
+        """
+        Busca licitações na base local (mesma interface de PNCPClient.buscar_licitacoes)
+
+        Municípios, modalidades e situações podem ser informados por id ou
+        por nome; órgão por CNPJ (14 dígitos) ou parte do nome. Com
+        `visto_desde`, só as gravadas pela primeira vez a partir desse
+        instante (ISO).
+
+        Returns:
+            Dict com 'items' (página pedida) e 'total'
+        """
+        where, parametros = self._filtros_sql(uf, municipio, orgao, modalidade, situacao, data_inicio, data_fim,
+                                              visto_desde)
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM licitacoes {where}', parametros).fetchone()[0]
+            linhas = self._conn.execute(
+                f'SELECT dados FROM licitacoes {where} '
+                f'ORDER BY data_publicacao_pncp DESC, chave LIMIT ? OFFSET ?',
+                parametros + [tamanho_pagina, (max(pagina, 1) - 1) * tamanho_pagina]
+            ).fetchall()
+        return {'items': [json.loads(dados) for (dados,) in linhas], 'total': total}
+
+    def iterar_licitacoes(self,
+                          uf: Optional[str] = None,
+                          municipio: Optional[str] = None,
+                          orgao: Optional[str] = None,
+                          modalidade: Optional[str] = None,
+                          situacao: Optional[str] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None,
+                          lote: int = 500) -> Iterator[Dict]:
+        """Gera todas as licitações da base que atendem aos filtros"""
+        where, parametros = self._filtros_sql(uf, municipio, orgao, modalidade, situacao, data_inicio, data_fim)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(f'SELECT dados FROM licitacoes {where} ORDER BY data_publicacao_pncp DESC, chave',
+                           parametros)
+        try:
+            while True:
+                with self._lock:
+                    linhas = cursor.fetchmany(lote)
+                if not linhas:
+                    break
+                for (dados,) in linhas:
+                    yield json.loads(dados)
+        finally:
+            cursor.close()
+
+    def buscar_texto(self,
+                     termo: str,
+                     pagina: int = 1,
+                     tamanho_pagina: int = 20,
+                     **filtros) -> Dict:
+        """
+        Busca textual em título, descrição e órgão, ordenada por relevância
+
+        A comparação ignora acentos e variações de gênero, número e
+        flexão verbal ('credenciamento' encontra 'credenciar').
+
+        Args:
+            termo: Palavras procuradas (todas precisam aparecer)
+            pagina: Número da página
+            tamanho_pagina: Quantidade de itens por página
+            **filtros: Mesmos filtros de buscar_licitacoes
+
+        Returns:
+            Dict com 'items' (página pedida, mais relevantes primeiro) e 'total'
+        """
+        expressao = consulta_fts(termo)
+        if not expressao:
+            return {'items': [], 'total': 0}
+
+        filtro, parametros = self._filtros_sql(**filtros)
+        where = 'WHERE licitacoes_fts MATCH ?' + (' AND ' + filtro[len('WHERE '):] if filtro else '')
+        parametros = [expressao] + parametros
+
+        # CROSS JOIN força o SQLite a partir do índice textual; a relevância
+        # (bm25 com os pesos de _PESOS_BUSCA) é a coluna `rank` do FTS5 e só
+        # as linhas da página pedida têm o registro completo lido
+        juncao = 'FROM licitacoes_fts CROSS JOIN licitacoes ON licitacoes.seq = licitacoes_fts.rowid'
+        consulta = (
+            f'SELECT licitacoes.dados FROM ('
+            f'SELECT licitacoes_fts.rowid AS seq, licitacoes_fts.rank AS relevancia {juncao} {where} '
+            f'ORDER BY licitacoes_fts.rank LIMIT ? OFFSET ?'
+            f') encontrados CROSS JOIN licitacoes ON licitacoes.seq = encontrados.seq '
+            f'ORDER BY encontrados.relevancia'
+        )
+        if filtro:
+            contagem = f'SELECT COUNT(*) {juncao} {where}'
+        else:
+            contagem = 'SELECT COUNT(*) FROM licitacoes_fts WHERE licitacoes_fts MATCH ?'
+
+        with self._lock:
+            total = self._conn.execute(contagem, parametros).fetchone()[0]
+            linhas = self._conn.execute(
+                consulta,
+                parametros + [tamanho_pagina, (max(pagina, 1) - 1) * tamanho_pagina]
+            ).fetchall()
+        return {'items': [json.loads(dados) for (dados,) in linhas], 'total': total}
+
+    def contar(self) -> int:
+        """Quantidade de licitações armazenadas"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM licitacoes').fetchone()[0]
+
+    def existentes(self, chaves: Iterable[str]) -> set:
+        """Quais das chaves já estão na base"""
+        chaves = list(chaves)
+        if not chaves:
+            return set()
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT chave FROM licitacoes WHERE chave IN ({', '.join('?' * len(chaves))})", chaves
+            ).fetchall()
+        return {chave for (chave,) in linhas}
+
+    def chaves_vistas_desde(self, chaves: Iterable[str], desde: str) -> set:
+        """Quais das chaves foram gravadas pela primeira vez a partir de `desde` (ISO)"""
+        chaves = list(chaves)
+        if not chaves:
+            return set()
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT chave FROM licitacoes WHERE chave IN ({', '.join('?' * len(chaves))}) AND visto_em >= ?",
+                chaves + [desde]
+            ).fetchall()
+        return {chave for (chave,) in linhas}
+
+    def contagens(self, dimensao: str, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Valores mais frequentes de uma dimensão ('uf', 'orgao', 'modalidade',
+        'dia_publicacao' ou 'dia_visto') com as contagens, do maior para o menor
+
+        Lê os agregados mantidos a cada gravação, sem percorrer as licitações.
+        """
+        if dimensao not in _DIMENSOES:
+            raise ValueError(f"Dimensão desconhecida: {dimensao}")
+        with self._lock:
+            return self._conn.execute(
+                'SELECT valor, contagem FROM agregados WHERE dimensao = ? '
+                'ORDER BY contagem DESC, valor LIMIT ?',
+                (dimensao, -1 if top is None else top)
+            ).fetchall()
+
+    def _contagem(self, dimensao: str, valor: str) -> int:
+        linha = self._conn.execute('SELECT contagem FROM agregados WHERE dimensao = ? AND valor = ?',
+                                   (dimensao, valor)).fetchone()
+        return linha[0] if linha else 0
+
+    def estatisticas(self, top: int = 5) -> Dict:
+        """
+        Totais do painel: licitações, gravadas pela primeira vez hoje, UFs
+        e órgãos distintos e os `top` mais frequentes de cada
+
+        Custo constante: só consulta os agregados (ver _ESQUEMA_AGREGADOS).
+        """
+        with self._lock:
+            resultado = {
+                'total_licitacoes': self._contagem('total', ''),
+                'novas_hoje': self._contagem('dia_visto', date.today().isoformat()),
+                'estados_ativos': self._contagem('#distintos', 'uf'),
+                'orgaos_ativos': self._contagem('#distintos', 'orgao'),
+            }
+        resultado['top_estados'] = [uf for uf, _ in self.contagens('uf', top)]
+        resultado['top_orgaos'] = [orgao for orgao, _ in self.contagens('orgao', top)]
+        return resultado
+
+    def modalidades(self) -> List[str]:
+        """Nomes de modalidade presentes na base, em ordem alfabética"""
+        return sorted(nome for nome, _ in self.contagens('modalidade'))
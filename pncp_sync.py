@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Sincronização incremental de licitações usando marcas d'água de data_atualizacao_pncp
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+import config
+
+
+_RE_TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?(?:[.,](\d+))?)?')
+_RE_FUSO = re.compile(r'\s*(?:(Z)|([+-])(\d{2}):?(\d{2})?)$', re.IGNORECASE)
+
+
+def chave_tempo(timestamp) -> Optional[str]:
+    """
+    Normaliza um timestamp ISO para comparação como texto
+
+    '2025-10-17T07:42:39.136772030' e '2025-10-17T07:42:39.1' passam a ter
+    o mesmo formato (fração com 9 dígitos), de modo que a ordem do texto
+    coincide com a ordem cronológica.
+    """
+    if not timestamp:
+        return None
+    if isinstance(timestamp, datetime):
+        # Datas já convertidas (Licitacao): microssegundos completados até 9 dígitos
+        return f"{timestamp.isoformat(timespec='microseconds')[:26]}000"
+    m = _RE_TIMESTAMP.match(timestamp.strip())
+    if not m:
+        return None
+    data, hora, minuto, segundo, fracao = m.groups()
+    return f"{data}T{hora or '00'}:{minuto or '00'}:{segundo or '00'}.{(fracao or '')[:9]:0<9}"
+
+
+def ler_data_iso(timestamp: str) -> Optional[datetime]:
+    """
+    Texto ISO 8601 como datetime (None se não for uma data válida)
+
+    A fração é limitada a microssegundos e o fuso, se houver ('Z',
+    '-03:00', '+0000'), é preservado: '2025-03-31T15:20:00Z' vira um
+    datetime em UTC, não um horário local sem fuso.
+    """
+    texto = timestamp.strip()
+    m = _RE_TIMESTAMP.match(texto)
+    if not m:
+        return None
+    data, hora, minuto, segundo, fracao = m.groups()
+    fuso = ''
+    if hora is not None and m.end() < len(texto):
+        f = _RE_FUSO.match(texto, m.end())
+        if f:
+            utc, sinal, horas, minutos = f.groups()
+            fuso = '+00:00' if utc else f"{sinal}{horas}:{minutos or '00'}"
+    try:
+        return datetime.fromisoformat(
+            f"{data}T{hora or '00'}:{minuto or '00'}:{segundo or '00'}.{(fracao or '')[:6]:0<6}{fuso}")
+    except ValueError:
+        # Formato válido, data impossível (ex: 2025-02-30) ou fuso fora do intervalo
+        return None
+
+
+class EstadoSincronizacao:
+    """
+    Marcas d'água (maior data_atualizacao_pncp já recebida) por consulta
+
+    Junto com cada marca ficam os identificadores das licitações já
+    entregues com exatamente esse timestamp, para que as demais com o
+    mesmo timestamp não sejam descartadas na sincronização seguinte.
+    O estado é gravado em um arquivo JSON, de forma atômica, e pode ser
+    compartilhado entre threads.
+    """
+
+    def __init__(self, caminho: str = config.SYNC_ESTADO_ARQUIVO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._marcas: Dict[str, Dict] = {}
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                marcas = json.load(f)
+            # Arquivos anteriores guardam só o texto da marca
+            self._marcas = {chave: valor if isinstance(valor, dict) else {'marca': valor, 'entregues': []}
+                            for chave, valor in marcas.items()}
+
+    @staticmethod
+    def chave_consulta(filtros: Dict) -> str:
+        """Identifica a consulta pelos filtros informados (ignorando os vazios)"""
+        return json.dumps({k: v for k, v in filtros.items() if v}, sort_keys=True, ensure_ascii=False)
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._lock:
+            estado = self._marcas.get(chave)
+            return estado['marca'] if estado else None
+
+    def entregues(self, chave: str) -> Set[str]:
+        """Identificadores já entregues com o timestamp da marca d'água"""
+        with self._lock:
+            estado = self._marcas.get(chave)
+            return set(estado['entregues']) if estado else set()
+
+    def atualizar(self, chave: str, marca: str, entregues: Iterable[str] = ()):
+        """Registra a nova marca d'água da consulta (e o que já saiu com ela) e grava o arquivo"""
+        with self._lock:
+            self._marcas[chave] = {'marca': marca, 'entregues': sorted(entregues)}
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self._marcas, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.caminho)
+
+
+def chave_licitacao(licitacao: Dict) -> Optional[str]:
+    """
+    Identificador estável do registro: número de controle PNCP, id ou URL
+
+    Usado na sincronização, no modo vigia, na paginação consistente e no
+    armazenamento local, para que todos reconheçam o mesmo registro.
+    """
+    return licitacao.get('numero_controle_pncp') or licitacao.get('id') or licitacao.get('item_url') or None
+
+
+def sincronizar(client,
+                estado: EstadoSincronizacao,
+                tamanho_pagina: int = config.MAX_PAGE_SIZE,
+                **filtros) -> Iterator[Dict]:
+    """
+    Gera apenas as licitações atualizadas desde a última sincronização
+
+    As páginas são pedidas em ordem decrescente de data_atualizacao_pncp;
+    a paginação é interrompida no primeiro registro anterior à marca
+    d'água. Dos registros com o mesmo timestamp da marca, só são pulados
+    os já entregues (o estado guarda seus identificadores).
+
+    A nova marca só é gravada depois que o fluxo for consumido por
+    completo, então uma execução interrompida será repetida.
+
+    Args:
+        client: PNCPClient usado nas consultas
+        estado: Onde as marcas d'água são lidas e gravadas
+        tamanho_pagina: Quantidade de itens por página
+        **filtros: Mesmos filtros aceitos por PNCPClient.iterar_licitacoes
+
+    Returns:
+        Iterador de licitações novas ou atualizadas
+    """
+    chave = estado.chave_consulta(filtros)
+    marca = estado.obter(chave)
+    entregues = estado.entregues(chave)
+    nova_marca = marca
+    novos_entregues = set(entregues)
+
+    # Sem prefetch: nenhuma página além da que cruza a marca é baixada
+    licitacoes = client.iterar_licitacoes(
+        tamanho_pagina=tamanho_pagina,
+        ordenacao='data_atualizacao_pncp,desc',
+        prefetch=0,
+        **filtros
+    )
+    try:
+        for licitacao in licitacoes:
+            atualizacao = chave_tempo(licitacao.get('data_atualizacao_pncp'))
+            identidade = chave_licitacao(licitacao)
+            if marca and atualizacao:
+                if atualizacao < marca:
+                    break
+                if atualizacao == marca and identidade in entregues:
+                    # Já recebido na sincronização anterior; outras com o mesmo
+                    # timestamp (ex: publicadas depois da consulta) ainda saem
+                    continue
+            if atualizacao:
+                if nova_marca is None or atualizacao > nova_marca:
+                    nova_marca = atualizacao
+                    novos_entregues = set()
+                if atualizacao == nova_marca and identidade:
+                    novos_entregues.add(identidade)
+            yield licitacao
+    finally:
+        # Encerrar o iterador interrompe a paginação (e a thread de prefetch)
+        licitacoes.close()
+
+    if nova_marca and (nova_marca != marca or novos_entregues != entregues):
+        estado.atualizar(chave, nova_marca, novos_entregues)
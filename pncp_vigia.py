@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Modo vigia: consulta a API periodicamente e emite só as licitações ainda não vistas
+Autor: Thiago
+Repositório: Thiag086/Licita-oes_geral
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+
+import config
+from pncp_erros import ErroPNCP
+from pncp_metricas import metricas
+from pncp_sync import chave_licitacao, chave_tempo
+
+
+class VigiaLicitacoes:
+    """
+    Consulta as primeiras páginas (mais recentes primeiro) em intervalos
+    adaptativos e devolve só as licitações que ainda não apareceram
+
+    Usa um único PNCPClient, de preferência com uma SessaoPNCP condicional:
+    páginas que não mudaram voltam como 304, sem novo download. Cada
+    consulta lê páginas até encontrar um registro já visto (ou anterior à
+    publicação mais recente já vista), no máximo `max_paginas`.
+
+    O intervalo volta ao mínimo quando há novidades e é multiplicado por
+    `fator` a cada consulta sem novidades (ou com falha), até `intervalo_max`.
+    Os identificadores vistos ficam em memória, limitados a `memoria`.
+    """
+
+    def __init__(self,
+                 client,
+                 filtros: Optional[Dict] = None,
+                 tamanho_pagina: int = config.MAX_PAGE_SIZE,
+                 intervalo: float = config.VIGIA_INTERVALO,
+                 intervalo_max: float = config.VIGIA_INTERVALO_MAX,
+                 fator: float = config.VIGIA_FATOR,
+                 max_paginas: int = config.VIGIA_MAX_PAGINAS,
+                 memoria: int = config.VIGIA_MEMORIA,
+                 ja_vistas: Optional[Callable[[List[str]], set]] = None):
+        self.client = client
+        self.filtros = {k: v for k, v in (filtros or {}).items() if v}
+        self.tamanho_pagina = tamanho_pagina
+        self.intervalo_min = intervalo
+        self.intervalo_max = max(intervalo, intervalo_max)
+        self.fator = fator
+        self.max_paginas = max_paginas
+        self.memoria = memoria
+        self.ja_vistas = ja_vistas
+        self.intervalo = intervalo
+        self.consultas = 0
+        self._vistas: 'OrderedDict[str, None]' = OrderedDict()
+        self._marca: Optional[str] = None  # publicação mais recente já vista
+        self._parar = threading.Event()
+
+    def parar(self):
+        """Encerra a vigia (também interrompe a espera entre consultas)"""
+        self._parar.set()
+
+    def _lembrar(self, identidade: str):
+        self._vistas[identidade] = None
+        if len(self._vistas) > self.memoria:
+            self._vistas.popitem(last=False)
+
+    def consultar(self) -> List[Dict]:
+        """
+        Uma consulta: licitações novas desde a anterior, mais recentes primeiro
+
+        Na primeira consulta só a primeira página é lida; ela serve de
+        referência para as seguintes.
+
+        Raises:
+            ErroPNCP: se alguma página não puder ser obtida
+        """
+        primeira = self.consultas == 0
+        self.consultas += 1
+        novas = []
+        for pagina in range(1, (1 if primeira else self.max_paginas) + 1):
+            resultado = self.client.buscar_licitacoes(pagina=pagina, tamanho_pagina=self.tamanho_pagina,
+                                                      **self.filtros)
+            if 'erro' in resultado:
+                raise ErroPNCP(resultado['erro'])
+            itens = resultado.get('items') or []
+
+            candidatas = [item for item in itens if chave_licitacao(item) not in self._vistas]
+            if candidatas and self.ja_vistas:
+                # Registros já gravados na base local contam como vistos
+                gravadas = self.ja_vistas([chave_licitacao(item) for item in candidatas])
+                candidatas = [item for item in candidatas if chave_licitacao(item) not in gravadas]
+
+            alcancou_vistas = len(candidatas) < len(itens)
+            for item in candidatas:
+                publicacao = chave_tempo(item.get('data_publicacao_pncp'))
+                if self._marca and publicacao and publicacao < self._marca:
+                    alcancou_vistas = True
+                    continue
+                novas.append(item)
+            for item in itens:
+                if chave_licitacao(item):
+                    self._lembrar(chave_licitacao(item))
+
+            if alcancou_vistas or len(itens) < self.tamanho_pagina:
+                break
+
+        for item in novas:
+            publicacao = chave_tempo(item.get('data_publicacao_pncp'))
+            if publicacao and (self._marca is None or publicacao > self._marca):
+                self._marca = publicacao
+        metricas.incrementar('pncp_vigia_consultas_total')
+        metricas.incrementar('pncp_vigia_novas_total', len(novas))
+        return novas
+
+    def _proximo_intervalo(self, houve_novidade: bool) -> float:
+        if houve_novidade:
+            self.intervalo = self.intervalo_min
+        else:
+            self.intervalo = min(self.intervalo * self.fator, self.intervalo_max)
+        # Variação de ±10% para que várias vigias não consultem em sincronia
+        return self.intervalo * random.uniform(0.9, 1.1)
+
+    def executar(self, avisar=print, apos_consulta: Optional[Callable[[], None]] = None) -> Iterator[Dict]:
+        """
+        Gera as licitações novas indefinidamente, até parar() ou Ctrl+C
+
+        Falhas de uma consulta são avisadas e tratadas como consulta sem
+        novidades (o intervalo aumenta); a vigia continua. `apos_consulta`
+        é chamada depois de cada consulta (ex: gravar as métricas).
+        """
+        try:
+            while not self._parar.is_set():
+                try:
+                    novas = self.consultar()
+                except ErroPNCP as e:
+                    avisar(f"⚠ Consulta da vigia falhou: {e}")
+                    novas = []
+                espera = self._proximo_intervalo(bool(novas))
+                metricas.definir('pncp_vigia_intervalo_segundos', self.intervalo)
+                avisar(f"Vigia: {len(novas)} nova(s); próxima consulta em {espera:.1f}s")
+                if apos_consulta:
+                    apos_consulta()
+                yield from novas
+                if self._parar.wait(espera):
+                    break
+        except KeyboardInterrupt:
+            avisar("\nVigia encerrada.")
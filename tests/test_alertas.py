@@ -0,0 +1,73 @@
+"""Testes do motor de alertas (pncp_alertas)"""
+
+import random
+
+from pncp_alertas import MotorAlertas, PerfilAlerta
+
+
+def _licitacao(titulo='', uf=None, modalidade_id=None, modalidade=None, valor=None):
+    return {'title': titulo, 'description': '', 'uf': uf, 'modalidade_licitacao_id': modalidade_id,
+            'modalidade_licitacao_nome': modalidade, 'valor_global': valor}
+
+
+def test_palavras_chave_com_acentos_e_expressoes():
+    motor = MotorAlertas([
+        PerfilAlerta('saúde', palavras=['medicamentos', 'material hospitalar']),
+        PerfilAlerta('obras no PR', palavras=['pavimentação'], ufs=['pr']),
+    ])
+    assert motor.avaliar(_licitacao('Aquisição de MATERIAL HOSPITALAR', uf='SP')) == ['saúde']
+    assert motor.avaliar(_licitacao('Pavimentacao de vias', uf='PR')) == ['obras no PR']
+    assert motor.avaliar(_licitacao('Pavimentacao de vias', uf='SC')) == []
+    # Expressão incompleta não atende
+    assert motor.avaliar(_licitacao('Material de escritório')) == []
+
+
+def test_perfis_sem_palavras_por_uf_modalidade_e_valor():
+    motor = MotorAlertas([
+        PerfilAlerta('pregões', modalidades=['Pregão Eletrônico']),
+        PerfilAlerta('modalidade 6 no PR', ufs=['PR'], modalidades=['6']),
+        PerfilAlerta('grandes', valor_min=1_000_000),
+        PerfilAlerta('faixa', valor_min=10_000, valor_max=50_000),
+        PerfilAlerta('tudo'),
+    ])
+    pregao_pr = _licitacao(uf='PR', modalidade_id=6, modalidade='Pregao eletronico', valor=50_000)
+    assert motor.avaliar(pregao_pr) == ['pregões', 'modalidade 6 no PR', 'faixa', 'tudo']
+    assert motor.avaliar(_licitacao(uf='SP', modalidade_id=8, valor=2_000_000)) == ['grandes', 'tudo']
+    # Sem valor, perfis com faixa não atendem
+    assert motor.avaliar(_licitacao(uf='SP')) == ['tudo']
+
+
+def test_indice_equivale_a_conferir_todos_os_perfis():
+    sorteio = random.Random(7)
+    limites = [None, 0, 1000, 5000, 10_000, 50_000, 100_000]
+    perfis = [PerfilAlerta(f"perfil {i}",
+                           palavras=sorteio.choice([[], [], ['obra'], ['software licença']]),
+                           ufs=sorteio.sample(['PR', 'SP', 'SC'], sorteio.randint(0, 2)),
+                           modalidades=sorteio.sample(['6', '8', 'Concorrência'], sorteio.randint(0, 2)),
+                           valor_min=sorteio.choice(limites),
+                           valor_max=sorteio.choice(limites))
+              for i in range(300)]
+    motor = MotorAlertas(perfis)
+
+    for _ in range(500):
+        licitacao = _licitacao(sorteio.choice(['', 'Obra de escola', 'Software: licença anual']),
+                               uf=sorteio.choice([None, 'PR', 'SP', 'SC', 'RS']),
+                               modalidade_id=sorteio.choice([None, 6, 8, 4]),
+                               modalidade=sorteio.choice([None, 'Concorrência', 'Pregão']),
+                               valor=sorteio.choice([None, 0, 999.5, 1000, 7000, 50_000, 10 ** 7]))
+        esperado = [perfil.nome for perfil in perfis if _atende(perfil, licitacao)]
+        assert motor.avaliar(licitacao) == esperado
+
+
+def _atende(perfil, licitacao):
+    """Conferência direta de um perfil, sem os índices do motor"""
+    sozinho = MotorAlertas([perfil])
+    return bool(sozinho.avaliar(licitacao)) if perfil.palavras else _atributos(perfil, licitacao)
+
+
+def _atributos(perfil, licitacao):
+    from pncp_alertas import _chave_modalidade, _valor
+
+    modalidades = tuple(m for m in (_chave_modalidade(licitacao['modalidade_licitacao_id']),
+                                    _chave_modalidade(licitacao['modalidade_licitacao_nome'])) if m)
+    return perfil.atende_atributos((licitacao['uf'] or '').upper() or None, modalidades, _valor(licitacao))
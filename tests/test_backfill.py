@@ -0,0 +1,139 @@
+"""Testes da carga histórica (pncp_backfill)"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import config
+import pncp_backfill
+from pncp_backfill import CheckpointBackfill, DestinoNDJSON, DestinoSQLite, montar_fatias
+from pncp_store import ArmazemLocal
+
+
+def test_fatias_por_uf_mes_e_modalidade():
+    fatias = montar_fatias('2024-01-15', '2024-03-10', uf='PR,SP', modalidade='Pregão Eletrônico')
+    assert [fatia['id'] for fatia in fatias] == [
+        'PR_2024-01_pregao-eletronico', 'PR_2024-02_pregao-eletronico', 'PR_2024-03_pregao-eletronico',
+        'SP_2024-01_pregao-eletronico', 'SP_2024-02_pregao-eletronico', 'SP_2024-03_pregao-eletronico']
+    assert (fatias[0]['data_inicio'], fatias[0]['data_fim']) == ('2024-01-15', '2024-01-31')
+    assert (fatias[2]['data_inicio'], fatias[2]['data_fim']) == ('2024-03-01', '2024-03-10')
+    assert all(fatia['estado'] == 'pendente' and fatia['pagina'] == 1 for fatia in fatias)
+
+
+def test_checkpoint_retomado_mantem_o_progresso(tmp_path):
+    caminho = str(tmp_path / 'checkpoint.json')
+    checkpoint = CheckpointBackfill(caminho, intervalo=60)
+    checkpoint.iniciar({'data_inicio': '2024-01-01'}, montar_fatias('2024-01-01', '2024-02-29', uf='PR'))
+    checkpoint.atualizar('PR_2024-01', estado='concluida')
+    checkpoint.atualizar('PR_2024-02', pagina=3, posicao=1234)
+    checkpoint.salvar()
+    # Dentro do intervalo, o progresso não é gravado de novo
+    checkpoint.atualizar('PR_2024-02', pagina=4, posicao=2000)
+    checkpoint.salvar(forcar=False)
+
+    retomado = CheckpointBackfill(caminho)
+    assert retomado.parametros == {'data_inicio': '2024-01-01'}
+    assert [(fatia['id'], fatia['pagina'], fatia['posicao']) for fatia in retomado.pendentes()] == [
+        ('PR_2024-02', 3, 1234)]
+
+
+def _linhas(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha)['n'] for linha in f]
+
+
+def test_ndjson_descarta_o_que_foi_gravado_depois_da_posicao(tmp_path):
+    destino = DestinoNDJSON(str(tmp_path))
+    destino.preparar()
+    destino.abrir('PR_2024-01', None)
+    destino.gravar([{'n': 1}, {'n': 2}])
+    posicao = destino.confirmar()
+    # Página gravada mas não confirmada (o processo morreu antes do checkpoint)
+    destino.gravar([{'n': 3}, {'n': 4}])
+    destino.fechar()
+
+    destino.abrir('PR_2024-01', posicao)
+    destino.gravar([{'n': 3}, {'n': 4}])
+    assert destino.confirmar() > posicao
+    destino.fechar()
+    assert _linhas(str(tmp_path / 'PR_2024-01.ndjson')) == [1, 2, 3, 4]
+
+
+class _ClientPaginas:
+    """PNCPClient falso: páginas de 2 itens, a partir da página pedida"""
+
+    def __init__(self, paginas: int):
+        self.paginas = paginas
+        self.pedidos = []
+
+    def iterar_paginas(self, pagina_inicial, tamanho_pagina, **filtros):
+        self.pedidos.append(pagina_inicial)
+        for pagina in range(pagina_inicial, self.paginas + 1):
+            yield {'items': [{'n': 2 * pagina - 1}, {'n': 2 * pagina}], 'total': 2 * self.paginas}
+
+
+def test_fatia_retomada_continua_da_pagina_do_checkpoint(tmp_path, monkeypatch):
+    destino = DestinoNDJSON(str(tmp_path))
+    destino.preparar()
+    fila = queue.Queue()
+    client = _ClientPaginas(paginas=4)
+    monkeypatch.setattr(pncp_backfill, '_PROCESSO', {'fila': fila, 'parar': threading.Event(),
+                                                     'destino': destino, 'tamanho_pagina': 2, 'client': client})
+    fatia = montar_fatias('2024-01-01', '2024-01-31', uf='PR')[0]
+
+    # Primeira execução: duas páginas confirmadas e uma gravada pela metade
+    destino.abrir(fatia['id'], None)
+    destino.gravar([{'n': 1}, {'n': 2}, {'n': 3}, {'n': 4}])
+    fatia.update(pagina=3, posicao=destino.confirmar())
+    destino.gravar([{'n': 5}])
+    destino.fechar()
+
+    pncp_backfill._processar_fatia(fatia)
+    mensagens = []
+    while not fila.empty():
+        mensagens.append(fila.get())
+    assert client.pedidos == [3]
+    assert [tipo for tipo, _, _ in mensagens] == ['iniciada', 'pagina', 'pagina', 'concluida']
+    assert mensagens[-2][2]['pagina'] == 5
+    assert _linhas(str(tmp_path / f"{fatia['id']}.ndjson")) == list(range(1, 9))
+
+
+def _segurar_escrita(caminho, segundos, pronto):
+    """Outra conexão (como outro processo da carga) com uma gravação em andamento"""
+    conn = sqlite3.connect(caminho)
+    conn.execute('BEGIN IMMEDIATE')
+    pronto.set()
+    time.sleep(segundos)
+    conn.rollback()
+    conn.close()
+
+
+def test_destino_sqlite_espera_a_gravacao_dos_outros_processos(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'base.sqlite3')
+    monkeypatch.setattr(config, 'BACKFILL_SQLITE_TIMEOUT', 10)
+    destino = DestinoSQLite(caminho)
+    destino.preparar()
+    destino.abrir('PR_2024-03', None)
+
+    pronto = threading.Event()
+    outro = threading.Thread(target=_segurar_escrita, args=(caminho, 1.0, pronto))
+    outro.start()
+    pronto.wait()
+
+    # Com o tempo de espera padrão curto, a mesma disputa falharia
+    apressado = ArmazemLocal(caminho, timeout=0.1)
+    with pytest.raises(sqlite3.OperationalError, match='locked'):
+        apressado.salvar([{'numero_controle_pncp': 'x'}])
+    apressado.fechar()
+
+    destino.gravar([{'numero_controle_pncp': '1', 'uf': 'PR'}])
+    destino.fechar()
+    outro.join()
+
+    armazem = ArmazemLocal(caminho)
+    assert armazem.buscar_licitacoes()['total'] == 1
+    armazem.fechar()
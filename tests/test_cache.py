@@ -0,0 +1,48 @@
+"""Testes do cache de respostas (pncp_cache)"""
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from pncp_cache import CacheRespostas  # noqa: E402
+
+
+def _resposta(conteudo: bytes) -> 'requests.Response':
+    resposta = requests.Response()
+    resposta.status_code = 200
+    resposta.url = 'https://pncp.gov.br/api/catalog/items'
+    resposta._content = conteudo
+    return resposta
+
+
+def _total(cache: CacheRespostas) -> int:
+    return cache._conn.execute('SELECT bytes FROM total').fetchone()[0]
+
+
+def test_total_acompanha_gravacoes_substituicoes_e_remocoes(tmp_path):
+    cache = CacheRespostas(str(tmp_path), max_bytes=250)
+
+    cache.armazenar('a', _resposta(b'x' * 100))
+    cache.armazenar('b', _resposta(b'x' * 100))
+    cache.armazenar('a', _resposta(b'x' * 50))
+    assert _total(cache) == 150
+    assert cache.estatisticas()['tamanho_bytes'] == 150
+
+    # Passa do limite: sai a menos acessada ('b', já que 'a' foi regravada depois)
+    cache.armazenar('c', _resposta(b'x' * 150))
+    assert cache.obter('b') is None
+    assert cache.obter('a') is not None
+    assert _total(cache) == cache.estatisticas()['tamanho_bytes'] == 200
+
+    cache.limpar()
+    assert _total(cache) == 0
+
+
+def test_total_recalculado_ao_abrir(tmp_path):
+    cache = CacheRespostas(str(tmp_path))
+    cache.armazenar('a', _resposta(b'x' * 100))
+    # Cache criado por uma versão sem a tabela de total
+    cache._conn.executescript('DROP TABLE total; DROP TRIGGER respostas_total_ai; '
+                              'DROP TRIGGER respostas_total_ad; DROP TRIGGER respostas_total_au;')
+
+    assert _total(CacheRespostas(str(tmp_path))) == 100
@@ -0,0 +1,160 @@
+"""Testes do plano de consultas e da execução em paralelo (pncp_consultas)"""
+
+import threading
+import time
+
+from pncp_consultas import executar_plano, montar_plano
+
+
+def test_montar_plano_combina_os_filtros():
+    plano = montar_plano(uf='PR,SP', modalidade='Pregão Eletrônico,Concorrência',
+                         data_inicio='2025-01-01', data_fim='2025-01-20', janela_dias=10)
+    assert len(plano) == 2 * 2 * 2
+    assert {(p['uf'], p['modalidade']) for p in plano} == {
+        ('PR', 'Pregão Eletrônico'), ('PR', 'Concorrência'), ('SP', 'Pregão Eletrônico'), ('SP', 'Concorrência')}
+    assert sorted({(p['data_inicio'], p['data_fim']) for p in plano}) == [
+        ('2025-01-01', '2025-01-10'), ('2025-01-11', '2025-01-20')]
+
+
+def _buscar(uf=None, **filtros):
+    for i in range(3):
+        if uf == 'SP' and i == 1:
+            raise RuntimeError('API fora do ar')
+        yield {'uf': uf, 'i': i}
+
+
+def test_executar_plano_entrega_tudo_e_junta_os_erros():
+    plano = montar_plano(uf='PR,SP,SC')
+    erros = []
+    itens = list(executar_plano(plano, _buscar, max_workers=2, erros=erros))
+
+    # SP entregou o primeiro registro antes de falhar
+    assert sorted((item['uf'], item['i']) for item in itens) == sorted(
+        [('PR', i) for i in range(3)] + [('SC', i) for i in range(3)] + [('SP', 0)])
+    assert len(erros) == 1
+    filtros, erro = erros[0]
+    assert filtros['uf'] == 'SP' and str(erro) == 'API fora do ar'
+
+
+def test_executar_plano_para_quando_o_consumidor_encerra():
+    iniciadas = []
+    lock = threading.Lock()
+
+    def buscar(uf=None, **filtros):
+        with lock:
+            iniciadas.append(uf)
+        for i in range(1000):
+            yield {'uf': uf, 'i': i}
+
+    plano = montar_plano(uf='todas')
+    fluxo = executar_plano(plano, buscar, max_workers=2, tamanho_fila=5)
+    assert next(fluxo)['i'] == 0
+    fluxo.close()
+    time.sleep(0.3)
+    # As consultas ainda não iniciadas foram descartadas
+    assert len(iniciadas) < len(plano)
+
+
+def test_reserva_vence_e_a_principal_e_cancelada():
+    from pncp_consultas import correr_com_reserva
+
+    canceladas = []
+    liberar = threading.Event()
+
+    def principal():
+        liberar.wait(5)
+        return ['atrasado']
+
+    def cancelar_principal():
+        canceladas.append('principal')
+        liberar.set()
+
+    corrida = correr_com_reserva(principal, lambda: ['web'], atraso=0.05,
+                                 cancelar={'principal': cancelar_principal, 'reserva': lambda: None})
+    assert corrida['vencedor'] == 'reserva'
+    assert corrida['resultados'] == {'reserva': ['web']}
+    assert canceladas == ['principal']
+    assert corrida['fim']['principal'] is None
+    assert corrida['inicio']['reserva'] >= 0.05
+
+
+def test_principal_sem_resultado_inicia_a_reserva_na_hora():
+    from pncp_consultas import correr_com_reserva
+
+    corrida = correr_com_reserva(lambda: [], lambda: ['web'], atraso=30)
+    assert corrida['vencedor'] == 'reserva'
+    assert corrida['decisao'] < 5
+
+
+def test_principal_com_erro_usa_a_reserva_e_sem_dados_nao_ha_vencedor():
+    from pncp_consultas import correr_com_reserva
+
+    def falhar():
+        raise RuntimeError('API fora do ar')
+
+    corrida = correr_com_reserva(falhar, lambda: [], atraso=30)
+    assert corrida['vencedor'] is None
+    assert isinstance(corrida['resultados']['principal'], RuntimeError)
+    assert corrida['resultados']['reserva'] == []
+
+
+def test_principal_rapida_dispensa_a_reserva():
+    from pncp_consultas import correr_com_reserva
+
+    iniciou = []
+    corrida = correr_com_reserva(lambda: ['api'], lambda: iniciou.append(True), atraso=30)
+    assert corrida['vencedor'] == 'principal'
+    assert 'reserva' not in corrida['inicio'] and not iniciou
+
+
+class _SessaoFalsa:
+    def __init__(self):
+        self.cancelada = threading.Event()
+
+    def cancelar(self):
+        self.cancelada.set()
+
+
+def test_buscar_em_corrida_cancela_a_api_lenta(monkeypatch, capsys):
+    from types import SimpleNamespace
+
+    import main
+
+    sessoes = []
+
+    def nova_sessao():
+        sessoes.append(_SessaoFalsa())
+        return sessoes[-1]
+
+    def api_lenta(args, plano, sessao, avisar=print):
+        sessao.cancelada.wait(5)
+        avisar('mensagem da API depois de cancelada')
+        return [], 'cancelada', []
+
+    def web(args, plano, sessao, avisar=print):
+        return [{'title': 'do web scraping'}], None, []
+
+    monkeypatch.setattr(main, 'buscar_via_api', api_lenta)
+    monkeypatch.setattr(main, 'buscar_via_web', web)
+    licitacoes, erro, erros = main.buscar_em_corrida(SimpleNamespace(atraso_web=0.05), [{}], nova_sessao)
+
+    assert licitacoes == [{'title': 'do web scraping'}] and erro is None
+    assert sessoes[0].cancelada.is_set() and not sessoes[1].cancelada.is_set()
+    time.sleep(0.1)
+    saida = capsys.readouterr().out
+    assert 'web scraping venceu' in saida
+    assert 'depois de cancelada' not in saida
+
+
+def test_buscar_em_corrida_sem_dados_da_api_usa_o_web(monkeypatch, capsys):
+    from types import SimpleNamespace
+
+    import main
+
+    monkeypatch.setattr(main, 'buscar_via_api', lambda args, plano, sessao, avisar=print: ([], None, []))
+    monkeypatch.setattr(main, 'buscar_via_web',
+                        lambda args, plano, sessao, avisar=print: ([{'title': 'web'}], None, []))
+    licitacoes, erro, _ = main.buscar_em_corrida(SimpleNamespace(atraso_web=30), [{}], _SessaoFalsa)
+
+    assert licitacoes == [{'title': 'web'}] and erro is None
+    assert 'API terminou sem dados' in capsys.readouterr().out
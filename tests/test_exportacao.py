@@ -0,0 +1,107 @@
+"""Testes da exportação (pncp_exportacao)"""
+
+import csv
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import config
+from pncp_exportacao import EscritorCSV, EscritorExcel, EscritorJSON, EscritorNDJSON, EscritorParquet, _para_data
+
+
+def _registros(quantidade):
+    """Gerador: os escritores nunca recebem a lista inteira"""
+    for numero in range(quantidade):
+        yield {'numero_controle_pncp': str(numero), 'title': f'Aquisição {numero}', 'valor_global': numero * 1.5}
+
+
+def test_data_impossivel_vira_nula():
+    assert _para_data('2025-02-30T10:00:00') is None
+    assert _para_data('2025-02-28T10:00:00.5').isoformat() == '2025-02-28T10:00:00.500000'
+    assert _para_data('2025-02-28T10:00:00Z').isoformat() == '2025-02-28T10:00:00+00:00'
+
+
+def test_parquet_com_data_impossivel_grava_todos_os_registros(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    caminho = str(tmp_path / 'licitacoes.parquet')
+    with EscritorParquet(caminho) as escritor:
+        escritor.escrever({'numero_controle_pncp': '1', 'data_publicacao_pncp': '2025-02-30T10:00:00'})
+        escritor.escrever({'numero_controle_pncp': '2', 'data_publicacao_pncp': '2025-02-28T10:00:00'})
+
+    tabela = pq.read_table(caminho)
+    assert tabela.num_rows == 2
+    assert tabela.column('data_publicacao_pncp').to_pylist()[0] is None
+
+
+def test_datas_com_fuso_no_parquet_em_utc(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    caminho = str(tmp_path / 'licitacoes.parquet')
+    with EscritorParquet(caminho) as escritor:
+        escritor.escrever({'numero_controle_pncp': '1', 'data_publicacao_pncp': '2025-03-31T15:20:00Z'})
+        escritor.escrever({'numero_controle_pncp': '2', 'data_publicacao_pncp': '2025-03-31T15:20:00-03:00'})
+        # Sem fuso: horário de Brasília (config.PARQUET_FUSO_PADRAO)
+        escritor.escrever({'numero_controle_pncp': '3', 'data_publicacao_pncp': '2025-03-31T15:20:00'})
+
+    datas = pq.read_table(caminho).column('data_publicacao_pncp').to_pylist()
+    assert [data.astimezone(timezone.utc).replace(tzinfo=None) for data in datas] == [
+        datetime(2025, 3, 31, 15, 20), datetime(2025, 3, 31, 18, 20), datetime(2025, 3, 31, 18, 20)]
+
+
+@pytest.mark.parametrize('quantidade', [0, 1, 3])
+def test_json_gravado_item_a_item_e_valido(tmp_path, quantidade):
+    caminho = tmp_path / 'licitacoes.json'
+    with EscritorJSON(str(caminho)) as escritor:
+        for registro in _registros(quantidade):
+            escritor.escrever(registro)
+
+    dados = json.loads(caminho.read_text(encoding='utf-8'))
+    assert dados == {'items': list(_registros(quantidade)), 'total': quantidade}
+
+
+def test_ndjson_um_registro_por_linha(tmp_path):
+    caminho = tmp_path / 'licitacoes.ndjson'
+    with EscritorNDJSON(str(caminho)) as escritor:
+        for registro in _registros(3):
+            escritor.escrever(registro)
+
+    linhas = caminho.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(linha) for linha in linhas] == list(_registros(3))
+    assert escritor.total == 3
+
+
+def test_csv_com_cabecalho_das_colunas(tmp_path):
+    caminho = tmp_path / 'licitacoes.csv'
+    with EscritorCSV(str(caminho), ['numero_controle_pncp', 'title']) as escritor:
+        for registro in _registros(2):
+            escritor.escrever(registro)
+
+    with open(caminho, encoding=config.CSV_ENCODING, newline='') as arquivo:
+        linhas = list(csv.reader(arquivo))
+    assert linhas == [['numero_controle_pncp', 'title'], ['0', 'Aquisição 0'], ['1', 'Aquisição 1']]
+
+
+def test_csv_sem_colunas_usa_as_chaves_do_primeiro_registro(tmp_path):
+    caminho = tmp_path / 'licitacoes.csv'
+    with EscritorCSV(str(caminho)) as escritor:
+        for registro in _registros(1):
+            escritor.escrever(registro)
+
+    with open(caminho, encoding=config.CSV_ENCODING, newline='') as arquivo:
+        linhas = list(csv.reader(arquivo))
+    assert linhas == [['numero_controle_pncp', 'title', 'valor_global'], ['0', 'Aquisição 0', '0.0']]
+
+
+def test_excel_gravado_linha_a_linha(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+
+    caminho = str(tmp_path / 'licitacoes.xlsx')
+    with EscritorExcel(caminho, ['numero_controle_pncp', 'title']) as escritor:
+        for registro in _registros(2):
+            escritor.escrever(registro)
+
+    planilha = openpyxl.load_workbook(caminho)['Sheet1']
+    assert list(planilha.values) == [('numero_controle_pncp', 'title'), ('0', 'Aquisição 0'), ('1', 'Aquisição 1')]
+    assert planilha['A1'].font.bold
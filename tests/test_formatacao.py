@@ -0,0 +1,44 @@
+"""Testes da formatação das licitações (pncp_formatacao)"""
+
+import pytest
+
+from pncp_formatacao import LicitacaoProcessor
+
+
+REGISTROS = [
+    {
+        'title': 'Aquisição de papel',
+        'numero_controle_pncp': '1',
+        'orgao_nome': 'Prefeitura',
+        'uf': 'PR',
+        'data_publicacao_pncp': '2025-10-17T07:42:39',
+        'valor_global': 1500.5,
+        'item_url': '/app/editais/1',
+    },
+    {
+        # Sem município, datas, valor nem URL: no DataFrame, células vazias
+        'title': 'Serviço de limpeza',
+        'numero_controle_pncp': '2',
+        'orgao_nome': 'Câmara',
+        'municipio_nome': 'Curitiba',
+        'uf': 'SC',
+    },
+]
+
+
+def test_lote_de_registros_igual_ao_por_registro():
+    esperado = [LicitacaoProcessor.extrair_informacoes_principais(r) for r in REGISTROS]
+    assert LicitacaoProcessor.extrair_informacoes_lote(REGISTROS) == esperado
+
+
+def test_lote_de_dataframe_com_celulas_vazias_igual_ao_por_registro():
+    pd = pytest.importorskip('pandas')
+
+    esperado = [LicitacaoProcessor.extrair_informacoes_principais(r) for r in REGISTROS]
+    obtido = LicitacaoProcessor.extrair_informacoes_lote(pd.DataFrame(REGISTROS))
+
+    assert obtido == esperado
+    assert obtido[1]['Valor Global'] == 'N/A'
+    assert obtido[1]['Data Publicação'] == 'N/A'
+    assert obtido[1]['URL'] == 'https://pncp.gov.br'
+    assert obtido[0]['Município'] == 'N/A'
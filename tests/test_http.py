@@ -0,0 +1,139 @@
+"""Testes do disjuntor de circuito e da sessão HTTP (pncp_http)"""
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from pncp_http import CircuitoAberto, DisjuntorCircuito, SessaoPNCP  # noqa: E402
+
+URL = 'https://pncp.exemplo/api/search/'
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr('pncp_http.time.monotonic', relogio)
+    return relogio
+
+
+def _abrir(disjuntor):
+    for _ in range(disjuntor.limite_falhas):
+        assert disjuntor.liberar(URL) is False
+        disjuntor.registrar_falha(URL)
+
+
+def test_disjuntor_abre_e_fecha_com_teste_bem_sucedido(relogio):
+    disjuntor = DisjuntorCircuito(limite_falhas=3, tempo_aberto=60)
+    _abrir(disjuntor)
+    assert disjuntor.estado(URL) == 'aberto'
+    with pytest.raises(CircuitoAberto):
+        disjuntor.liberar(URL)
+
+    relogio.agora += 61
+    assert disjuntor.estado(URL) == 'meio-aberto'
+    assert disjuntor.liberar(URL) is True
+    # Só um teste por vez
+    with pytest.raises(CircuitoAberto):
+        disjuntor.liberar(URL)
+
+    disjuntor.registrar_sucesso(URL)
+    assert disjuntor.estado(URL) == 'fechado'
+    assert disjuntor.liberar(URL) is False
+
+
+def test_disjuntor_reabre_quando_o_teste_falha(relogio):
+    disjuntor = DisjuntorCircuito(limite_falhas=3, tempo_aberto=60)
+    _abrir(disjuntor)
+    relogio.agora += 61
+    assert disjuntor.liberar(URL) is True
+
+    disjuntor.registrar_falha(URL)
+    assert disjuntor.estado(URL) == 'aberto'
+    relogio.agora += 61
+    assert disjuntor.liberar(URL) is True
+
+
+def test_teste_interrompido_por_outra_excecao_nao_prende_o_circuito(relogio, monkeypatch):
+    disjuntor = DisjuntorCircuito(limite_falhas=1, tempo_aberto=60)
+    sessao = SessaoPNCP(cache=False, max_tentativas=0, disjuntor=disjuntor)
+    _abrir(disjuntor)
+    relogio.agora += 61
+
+    def redirecionamentos_demais(self, method, url, **kwargs):
+        raise requests.exceptions.TooManyRedirects('Exceeded 30 redirects.')
+
+    monkeypatch.setattr(requests.Session, 'request', redirecionamentos_demais)
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        sessao.get(URL)
+
+    # Sem resultado do teste, o próximo pedido volta a testar o host
+    assert disjuntor.estado(URL) == 'meio-aberto'
+    assert disjuntor.liberar(URL) is True
+
+
+def _resposta(status, corpo=b'', cabecalhos=None):
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta._content = corpo
+    resposta.headers.update(cabecalhos or {})
+    return resposta
+
+
+class ServidorCondicional:
+    """Responde 304 quando o If-None-Match confere com o ETag atual"""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.corpo = b'{"items": [1]}'
+        self.pedidos = []
+
+    def responder(self, method, url, **kwargs):
+        cabecalhos = kwargs.get('headers') or {}
+        self.pedidos.append(dict(cabecalhos))
+        if cabecalhos.get('If-None-Match') == self.etag:
+            return _resposta(304, cabecalhos={'ETag': self.etag})
+        return _resposta(200, self.corpo, {'ETag': self.etag, 'Last-Modified': 'Mon, 31 Mar 2025 15:20:00 GMT'})
+
+
+def test_sessao_condicional_reaproveita_o_corpo_no_304(monkeypatch):
+    servidor = ServidorCondicional()
+    monkeypatch.setattr(requests.Session, 'request',
+                        lambda sessao, method, url, **kwargs: servidor.responder(method, url, **kwargs))
+    sessao = SessaoPNCP(cache=False, max_tentativas=0, condicional=True)
+
+    primeira = sessao.get(URL, params={'page': 1})
+    assert primeira.status_code == 200 and 'If-None-Match' not in servidor.pedidos[0]
+
+    segunda = sessao.get(URL, params={'page': 1})
+    assert servidor.pedidos[1]['If-None-Match'] == '"v1"'
+    assert servidor.pedidos[1]['If-Modified-Since'] == 'Mon, 31 Mar 2025 15:20:00 GMT'
+    assert segunda is primeira and segunda.content == b'{"items": [1]}'
+
+    # Conteúdo novo: 200 com o corpo novo, que passa a ser o revalidado
+    servidor.etag, servidor.corpo = '"v2"', b'{"items": [2]}'
+    terceira = sessao.get(URL, params={'page': 1})
+    assert terceira.status_code == 200 and terceira.content == b'{"items": [2]}'
+    assert sessao.get(URL, params={'page': 1}) is terceira
+
+    # Outra página é outra chave: sem cabeçalhos condicionais
+    sessao.get(URL, params={'page': 2})
+    assert 'If-None-Match' not in servidor.pedidos[-1]
+
+
+def test_sessao_sem_condicional_nao_envia_validadores(monkeypatch):
+    servidor = ServidorCondicional()
+    monkeypatch.setattr(requests.Session, 'request',
+                        lambda sessao, method, url, **kwargs: servidor.responder(method, url, **kwargs))
+    sessao = SessaoPNCP(cache=False, max_tentativas=0)
+
+    sessao.get(URL)
+    sessao.get(URL)
+    assert all('If-None-Match' not in pedido for pedido in servidor.pedidos)
@@ -0,0 +1,21 @@
+"""Orçamento de inicialização do main.py (benchmarks/bench_inicio.py)"""
+
+import importlib.util
+import os
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _bench_inicio():
+    spec = importlib.util.spec_from_file_location('bench_inicio',
+                                                  os.path.join(RAIZ, 'benchmarks', 'bench_inicio.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def test_inicio_dentro_do_orcamento_e_sem_dependencias_pesadas(tmp_path):
+    bench = _bench_inicio()
+    for nome, _, extra_ms, pesados in bench.medir(str(tmp_path), repeticoes=5):
+        assert not pesados, f"{nome} importou {', '.join(pesados)}"
+        assert extra_ms <= bench.ORCAMENTO_MS, f"{nome}: +{extra_ms:.1f} ms (orçamento {bench.ORCAMENTO_MS} ms)"
@@ -0,0 +1,60 @@
+"""Testes da decodificação em fluxo (pncp_json)"""
+
+import json
+
+import pytest
+
+from pncp_json import iterar_itens
+
+CORPO = json.dumps({
+    'antes': {'aninhado': [1, {'x': 'y'}]},
+    'items': [
+        {'title': 'Aquisição de café — lote único', 'valor_global': 1234.5, 'tags': ['ç', 'ã', '€']},
+        {'title': 'Contratação "urgente"\n', 'valor_global': 10, 'vazio': {}},
+        {'title': 'Último', 'valor_global': None},
+    ],
+    'total': 123456789,
+}, ensure_ascii=False).encode('utf-8')
+
+
+def _blocos(corpo: bytes, tamanho: int):
+    return [corpo[i:i + tamanho] for i in range(0, len(corpo), tamanho)]
+
+
+@pytest.mark.parametrize('tamanho', list(range(1, 40)) + [len(CORPO)])
+def test_itens_iguais_ao_json_inteiro_em_qualquer_corte(tamanho):
+    esperado = json.loads(CORPO)
+    metadados = {}
+    itens = list(iterar_itens(_blocos(CORPO, tamanho), metadados=metadados))
+    assert itens == esperado['items']
+    # Inclusive o número do fim, que pode chegar cortado entre dois blocos
+    assert metadados == {'antes': esperado['antes'], 'total': 123456789}
+
+
+def test_itens_saem_antes_do_fim_do_corpo():
+    lidos = []
+
+    def blocos():
+        for bloco in _blocos(CORPO, 16):
+            lidos.append(bloco)
+            yield bloco
+
+    itens = iterar_itens(blocos())
+    next(itens)
+    assert sum(map(len, lidos)) < len(CORPO)
+
+
+@pytest.mark.parametrize('corpo, esperado', [
+    (b'{}', []),
+    (b'{"items": []}', []),
+    (b' {\n "total": 0 ,\n "items" : [ ] } ', []),
+    (b'{"items": [1, 2.5, "tres", null, true]}', [1, 2.5, 'tres', None, True]),
+])
+def test_corpos_pequenos(corpo, esperado):
+    assert list(iterar_itens(_blocos(corpo, 3))) == esperado
+
+
+@pytest.mark.parametrize('corpo', [b'', b'[1, 2]', b'{"items": [1, 2', b'{"items": [1 2]}', b'{"items": [{"a": }]}'])
+def test_corpo_invalido(corpo):
+    with pytest.raises(json.JSONDecodeError):
+        list(iterar_itens(_blocos(corpo, 4)))
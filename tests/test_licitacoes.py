@@ -0,0 +1,226 @@
+"""Testes do cliente da API (pncp_licitacoes)"""
+
+import json
+from typing import Dict
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from pncp_erros import ErroPNCP  # noqa: E402
+from pncp_licitacoes import PNCPClient  # noqa: E402
+
+
+def _item(i):
+    return {'numero_controle_pncp': f'{i}', 'title': f'Licitação {i}',
+            'data_publicacao_pncp': f'2025-10-17T07:{59 - i:02d}:00'}
+
+
+class Resposta:
+    def __init__(self, corpo: Dict, status: int = 200):
+        self.content = json.dumps(corpo).encode('utf-8')
+        self.status_code = status
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Server Error")
+
+
+class SessaoPaginas:
+    """API falsa: devolve as páginas informadas e registra as páginas pedidas"""
+
+    def __init__(self, paginas, falha_na_pagina=None):
+        self.headers = {}
+        self.paginas = paginas
+        self.falha_na_pagina = falha_na_pagina
+        self.pedidas = []
+
+    def get(self, url, params=None, timeout=None):
+        self.pedidas.append(params['page'])
+        if params['page'] == self.falha_na_pagina:
+            return Resposta({}, status=503)
+        itens = self.paginas[params['page'] - 1] if params['page'] <= len(self.paginas) else []
+        return Resposta({'items': itens, 'total': sum(map(len, self.paginas))})
+
+
+def test_iterar_licitacoes_percorre_as_paginas_sob_demanda():
+    sessao = SessaoPaginas([[_item(i) for i in range(3)], [_item(i) for i in range(3, 6)], [_item(6)]])
+    client = PNCPClient(sessao, fluxo=False)
+
+    licitacoes = client.iterar_licitacoes(tamanho_pagina=3, prefetch=0, consistente=False)
+    assert next(licitacoes)['numero_controle_pncp'] == '0'
+    assert sessao.pedidas == [1]
+    assert [item['numero_controle_pncp'] for item in licitacoes] == [str(i) for i in range(1, 7)]
+    # A página 3 veio incompleta: não há pedido de uma quarta
+    assert sessao.pedidas == [1, 2, 3]
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_iterar_licitacoes_com_limite_de_paginas(prefetch):
+    sessao = SessaoPaginas([[_item(i) for i in range(j, j + 2)] for j in range(0, 20, 2)])
+    client = PNCPClient(sessao, fluxo=False)
+
+    itens = list(client.iterar_licitacoes(tamanho_pagina=2, max_paginas=3, prefetch=prefetch))
+    assert [item['numero_controle_pncp'] for item in itens] == [str(i) for i in range(6)]
+    assert sessao.pedidas == [1, 2, 3]
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_falha_em_uma_pagina_interrompe_a_iteracao(prefetch):
+    sessao = SessaoPaginas([[_item(i) for i in range(j, j + 2)] for j in range(0, 8, 2)], falha_na_pagina=2)
+    client = PNCPClient(sessao, fluxo=False)
+
+    licitacoes = client.iterar_licitacoes(tamanho_pagina=2, prefetch=prefetch)
+    assert [next(licitacoes)['numero_controle_pncp'] for _ in range(2)] == ['0', '1']
+    with pytest.raises(ErroPNCP, match='página 2'):
+        next(licitacoes)
+
+
+class RespostaEmBlocos:
+    """Resposta HTTP cujo corpo chega em blocos, contando os blocos já lidos"""
+
+    def __init__(self, corpo: bytes, tamanho_bloco: int):
+        self.blocos = [corpo[i:i + tamanho_bloco] for i in range(0, len(corpo), tamanho_bloco)]
+        self.lidos = 0
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, tamanho):
+        for bloco in self.blocos:
+            self.lidos += 1
+            yield bloco
+
+    def close(self):
+        pass
+
+
+class SessaoEmBlocos:
+    max_tentativas = 0
+
+    def __init__(self, paginas, tamanho_bloco=64):
+        self.headers = {}
+        self.paginas = paginas
+        self.tamanho_bloco = tamanho_bloco
+        self.respostas = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        assert stream, 'a leitura em fluxo deve pedir stream=True'
+        itens = self.paginas[params['page'] - 1] if params['page'] <= len(self.paginas) else []
+        corpo = json.dumps({'items': itens, 'total': sum(map(len, self.paginas))}).encode('utf-8')
+        resposta = RespostaEmBlocos(corpo, self.tamanho_bloco)
+        self.respostas.append(resposta)
+        return resposta
+
+
+def test_pagina_em_fluxo_entrega_o_primeiro_item_antes_do_fim_do_corpo():
+    sessao = SessaoEmBlocos([[_item(i) for i in range(20)]])
+    client = PNCPClient(sessao, fluxo=True)
+
+    itens = client.buscar_licitacoes_em_fluxo(pagina=1, tamanho_pagina=20)
+    assert next(itens)['numero_controle_pncp'] == '0'
+
+    resposta = sessao.respostas[0]
+    assert resposta.lidos < len(resposta.blocos)
+    assert [item['numero_controle_pncp'] for item in itens] == [str(i) for i in range(1, 20)]
+    assert resposta.lidos == len(resposta.blocos)
+
+
+def test_todas_as_paginas_em_fluxo_ignoram_o_prefetch():
+    sessao = SessaoEmBlocos([[_item(i) for i in range(10)], [_item(i) for i in range(10, 15)]])
+    client = PNCPClient(sessao, fluxo=True)
+
+    # prefetch padrão (> 0): mesmo assim o primeiro item sai com a primeira página incompleta
+    licitacoes = client.iterar_licitacoes(tamanho_pagina=10)
+    assert next(licitacoes)['numero_controle_pncp'] == '0'
+    assert len(sessao.respostas) == 1
+    assert sessao.respostas[0].lidos < len(sessao.respostas[0].blocos)
+
+    assert [item['numero_controle_pncp'] for item in licitacoes] == [str(i) for i in range(1, 15)]
+    assert len(sessao.respostas) == 2
+
+
+def _pub(numero, data):
+    return {'numero_controle_pncp': numero, 'data_publicacao_pncp': data}
+
+
+def _numeros(itens):
+    return [item['numero_controle_pncp'] for item in itens]
+
+
+def test_paginacao_consistente_descarta_o_fim_repetido_da_pagina_anterior():
+    from pncp_licitacoes import _paginacao_consistente
+
+    # Uma publicação nova empurrou 'C' para a página 2, que repete o fim da 1
+    paginas = [
+        [_pub('A', '2025-03-31T10:00:00'), _pub('B', '2025-03-31T09:00:00'), _pub('C', '2025-03-31T09:00:00')],
+        [_pub('C', '2025-03-31T09:00:00'), _pub('D', '2025-03-31T08:00:00'), _pub('E', '2025-03-31T07:00:00')],
+    ]
+    itens = _paginacao_consistente(paginas, 'data_publicacao_pncp,desc')
+    assert _numeros(itens) == ['A', 'B', 'C', 'D', 'E']
+
+
+def test_paginacao_consistente_descarta_registros_anteriores_a_ancora():
+    from pncp_licitacoes import _paginacao_consistente
+
+    # 'N' foi publicado durante a varredura e apareceu no meio da página 2
+    paginas = [
+        [_pub('A', '2025-03-31T10:00:00'), _pub('B', '2025-03-31T09:00:00')],
+        [_pub('N', '2025-03-31T11:00:00'), _pub('C', '2025-03-31T08:00:00')],
+    ]
+    itens = _paginacao_consistente(paginas, 'data_publicacao_pncp,desc')
+    assert _numeros(itens) == ['A', 'B', 'C']
+
+
+def test_paginacao_consistente_fora_de_ordem_lembra_os_identificadores():
+    from pncp_licitacoes import _paginacao_consistente
+
+    # A API ignorou o sort: a ordem quebra já na página 1 e as seguintes se repetem
+    paginas = [
+        [_pub('A', '2025-03-31T10:00:00'), _pub('B', '2025-03-31T12:00:00')],
+        [_pub('C', '2025-03-31T08:00:00'), _pub('A', '2025-03-31T10:00:00'), _pub('D', '2025-03-31T12:00:00')],
+        [_pub('C', '2025-03-31T08:00:00'), _pub('B', '2025-03-31T12:00:00'), _pub('E', '2025-03-31T01:00:00')],
+    ]
+    itens = _paginacao_consistente(paginas, 'data_publicacao_pncp,desc')
+    assert _numeros(itens) == ['A', 'B', 'C', 'D', 'E']
+
+
+class RespostaInterrompida(RespostaEmBlocos):
+    """Corpo que cai depois de `blocos_ate_cair` blocos"""
+
+    def __init__(self, corpo: bytes, tamanho_bloco: int, blocos_ate_cair: int):
+        super().__init__(corpo, tamanho_bloco)
+        self.blocos_ate_cair = blocos_ate_cair
+
+    def iter_content(self, tamanho):
+        for bloco in self.blocos[:self.blocos_ate_cair]:
+            self.lidos += 1
+            yield bloco
+        raise requests.exceptions.ChunkedEncodingError('Connection broken: IncompleteRead')
+
+
+def test_conexao_interrompida_no_meio_do_corpo_repete_a_pagina_sem_duplicar():
+    itens = [_item(i) for i in range(20)]
+    corpo = json.dumps({'items': itens, 'total': 20}).encode('utf-8')
+    sessao = SessaoEmBlocos([itens])
+    sessao.max_tentativas = 1
+    respostas = [RespostaInterrompida(corpo, 64, blocos_ate_cair=8), RespostaEmBlocos(corpo, 64)]
+    sessao.get = lambda url, params=None, timeout=None, stream=False: respostas.pop(0)
+
+    metadados = {}
+    client = PNCPClient(sessao, fluxo=True)
+    entregues = list(client.buscar_licitacoes_em_fluxo(pagina=1, tamanho_pagina=20, metadados=metadados))
+    assert [item['numero_controle_pncp'] for item in entregues] == [str(i) for i in range(20)]
+    assert metadados == {'total': 20, 'quantidade': 20}
+    assert not respostas
+
+
+def test_conexao_interrompida_sem_tentativas_lanca_erro():
+    itens = [_item(i) for i in range(20)]
+    corpo = json.dumps({'items': itens}).encode('utf-8')
+    sessao = SessaoEmBlocos([itens])
+    sessao.get = lambda url, params=None, timeout=None, stream=False: RespostaInterrompida(corpo, 64, 8)
+
+    fluxo = PNCPClient(sessao, fluxo=True).buscar_licitacoes_em_fluxo(pagina=1, tamanho_pagina=20)
+    with pytest.raises(ErroPNCP, match='interrompida'):
+        list(fluxo)
@@ -0,0 +1,60 @@
+"""Testes do registro compacto (pncp_registro)"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from pncp_registro import Licitacao, para_json
+
+REGISTRO = {
+    'numero_controle_pncp': '12345678000190-1-000007/2025',
+    'title': 'Pregão Eletrônico 7/2025',
+    'uf': 'PR',
+    'valor_global': 1234.5,
+    'data_publicacao_pncp': '2025-03-31T15:20:00',
+    'data_atualizacao_pncp': '2025-03-31T15:20:00.136772030',
+    'campo_novo_da_api': [1, 2],
+}
+
+
+def test_mapeamento_igual_ao_dict():
+    licitacao = Licitacao(REGISTRO)
+    assert set(licitacao) == set(REGISTRO)
+    assert len(licitacao) == len(REGISTRO)
+    assert 'description' not in licitacao and licitacao.get('description') is None
+    assert licitacao['campo_novo_da_api'] == [1, 2]
+    assert licitacao['data_publicacao_pncp'] == datetime(2025, 3, 31, 15, 20)
+    # Fração limitada a microssegundos
+    assert licitacao['data_atualizacao_pncp'].microsecond == 136772
+
+    del licitacao['uf']
+    assert 'uf' not in licitacao and len(licitacao) == len(REGISTRO) - 1
+
+
+def test_copia_independente():
+    licitacao = Licitacao(REGISTRO)
+    copia = licitacao.copy()
+    copia['uf'] = 'SC'
+    copia['outro'] = True
+    assert isinstance(copia, Licitacao)
+    assert licitacao['uf'] == 'PR' and 'outro' not in licitacao
+    assert copia['title'] is licitacao['title']
+
+
+def test_para_dict_ida_e_volta():
+    dados = Licitacao(REGISTRO).para_dict()
+    assert dados['data_publicacao_pncp'] == '2025-03-31T15:20:00'
+    assert dados['data_atualizacao_pncp'] == '2025-03-31T15:20:00.136772'
+    assert Licitacao(dados).para_dict() == dados
+    assert json.loads(json.dumps(Licitacao(dados), default=para_json)) == dados
+
+
+def test_datas_com_fuso_preservam_o_deslocamento():
+    licitacao = Licitacao({'data_publicacao_pncp': '2025-03-31T15:20:00Z',
+                           'data_atualizacao_pncp': '2025-03-31T12:20:00.5-03:00'})
+    assert licitacao['data_publicacao_pncp'] == datetime(2025, 3, 31, 15, 20, tzinfo=timezone.utc)
+    assert licitacao['data_atualizacao_pncp'].utcoffset() == timedelta(hours=-3)
+
+    dados = licitacao.para_dict()
+    assert dados == {'data_publicacao_pncp': '2025-03-31T15:20:00+00:00',
+                     'data_atualizacao_pncp': '2025-03-31T12:20:00.500000-03:00'}
+    assert Licitacao(dados).para_dict() == dados
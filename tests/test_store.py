@@ -0,0 +1,78 @@
+"""Testes da base local (pncp_store)"""
+
+import pytest
+
+pytest.importorskip('sqlite3')
+
+from pncp_store import ArmazemLocal  # noqa: E402
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemLocal(str(tmp_path / 'licitacoes.sqlite3'))
+    yield armazem
+    armazem.fechar()
+
+
+def test_salvar_lote_com_chave_repetida_grava_a_ultima(armazem):
+    lote = [
+        {'numero_controle_pncp': '1', 'uf': 'PR', 'title': 'Aquisição de papel'},
+        {'numero_controle_pncp': '2', 'uf': 'SC', 'title': 'Serviço de limpeza'},
+        {'numero_controle_pncp': '1', 'uf': 'PR', 'title': 'Aquisição de computadores'},
+    ]
+
+    assert armazem.salvar(lote) == 2
+    assert armazem.contar() == 2
+    assert armazem.contagens('uf') == [('PR', 1), ('SC', 1)]
+    assert armazem.buscar_texto('computadores')['total'] == 1
+    assert armazem.buscar_texto('papel')['total'] == 0
+
+
+LICITACOES = [
+    {'numero_controle_pncp': 'a', 'uf': 'PR', 'municipio_id': '4106902', 'municipio_nome': 'Curitiba',
+     'modalidade_licitacao_id': '6', 'modalidade_licitacao_nome': 'Pregão - Eletrônico',
+     'situacao_nome': 'Divulgada no PNCP', 'orgao_cnpj': '76417005000186', 'orgao_nome': 'Município de Curitiba',
+     'data_publicacao_pncp': '2025-03-31T15:20:00', 'title': 'Aquisição de medicamentos'},
+    {'numero_controle_pncp': 'b', 'uf': 'PR', 'municipio_nome': 'Londrina',
+     'modalidade_licitacao_id': '8', 'modalidade_licitacao_nome': 'Dispensa',
+     'orgao_nome': 'Município de Londrina', 'data_publicacao_pncp': '2025-04-01T09:00:00',
+     'title': 'Pavimentação'},
+    {'numero_controle_pncp': 'c', 'uf': 'SC', 'municipio_nome': 'Joinville',
+     'modalidade_licitacao_id': '6', 'modalidade_licitacao_nome': 'Pregão - Eletrônico',
+     'orgao_nome': 'Hospital Regional', 'data_publicacao_pncp': '2025-03-30T23:59:59',
+     'title': 'Material hospitalar'},
+]
+
+
+def _numeros(resultado):
+    return [item['numero_controle_pncp'] for item in resultado['items']]
+
+
+@pytest.mark.parametrize('filtros, esperado', [
+    ({}, ['b', 'a', 'c']),
+    ({'uf': 'pr'}, ['b', 'a']),
+    ({'uf': 'PR,SC'}, ['b', 'a', 'c']),
+    ({'municipio': 'curitiba'}, ['a']),
+    ({'municipio': '4106902'}, ['a']),
+    ({'modalidade': '6'}, ['a', 'c']),
+    ({'modalidade': 'dispensa'}, ['b']),
+    ({'situacao': 'Divulgada no PNCP'}, ['a']),
+    ({'orgao': '76.417.005/0001-86'}, ['a']),
+    ({'orgao': 'hospital'}, ['c']),
+    ({'data_inicio': '2025-03-31'}, ['b', 'a']),
+    ({'data_fim': '2025-03-31'}, ['a', 'c']),
+    ({'data_inicio': '2025-03-31', 'data_fim': '2025-03-31', 'uf': 'PR'}, ['a']),
+])
+def test_consulta_offline_com_os_filtros_da_api(armazem, filtros, esperado):
+    armazem.salvar(LICITACOES)
+    resultado = armazem.buscar_licitacoes(**filtros)
+    assert _numeros(resultado) == esperado
+    assert resultado['total'] == len(esperado)
+
+
+def test_paginacao_e_registro_completo(armazem):
+    armazem.salvar(LICITACOES)
+    assert _numeros(armazem.buscar_licitacoes(pagina=2, tamanho_pagina=2)) == ['c']
+    assert armazem.buscar_licitacoes(pagina=2, tamanho_pagina=2)['total'] == 3
+    assert armazem.buscar_licitacoes(uf='SC')['items'] == [LICITACOES[2]]
+    assert armazem.existentes(['a', 'x', 'c']) == {'a', 'c'}
@@ -0,0 +1,48 @@
+"""Testes da sincronização incremental (pncp_sync)"""
+
+import json
+
+from pncp_sync import EstadoSincronizacao, sincronizar
+
+
+class ClienteFalso:
+    """Devolve os registros em ordem decrescente de data_atualizacao_pncp, como a API"""
+
+    def __init__(self, registros):
+        self.registros = registros
+
+    def iterar_licitacoes(self, **parametros):
+        return (r for r in sorted(self.registros, key=lambda r: r['data_atualizacao_pncp'], reverse=True))
+
+
+def _registro(numero, atualizacao):
+    return {'numero_controle_pncp': numero, 'data_atualizacao_pncp': atualizacao}
+
+
+def test_registro_novo_com_o_timestamp_da_marca_nao_se_perde(tmp_path):
+    estado = EstadoSincronizacao(str(tmp_path / 'sync.json'))
+    registros = [_registro('1', '2025-10-17T07:00:00'), _registro('2', '2025-10-17T08:00:00')]
+
+    primeira = [r['numero_controle_pncp'] for r in sincronizar(ClienteFalso(registros), estado, uf='PR')]
+    assert primeira == ['2', '1']
+
+    # Publicado com o mesmo timestamp da marca depois da primeira sincronização
+    registros.append(_registro('3', '2025-10-17T08:00:00'))
+    segunda = [r['numero_controle_pncp'] for r in sincronizar(ClienteFalso(registros), estado, uf='PR')]
+    assert segunda == ['3']
+
+    terceira = list(sincronizar(ClienteFalso(registros), EstadoSincronizacao(str(tmp_path / 'sync.json')), uf='PR'))
+    assert terceira == []
+
+
+def test_estado_no_formato_anterior_e_lido(tmp_path):
+    caminho = tmp_path / 'sync.json'
+    chave = EstadoSincronizacao.chave_consulta({'uf': 'PR'})
+    caminho.write_text(json.dumps({chave: '2025-10-17T08:00:00.000000000'}), encoding='utf-8')
+
+    estado = EstadoSincronizacao(str(caminho))
+    registros = [_registro('1', '2025-10-17T07:00:00'), _registro('2', '2025-10-17T09:00:00')]
+
+    assert [r['numero_controle_pncp'] for r in sincronizar(ClienteFalso(registros), estado, uf='PR')] == ['2']
+    assert estado.obter(chave) == '2025-10-17T09:00:00.000000000'
+    assert estado.entregues(chave) == {'2'}
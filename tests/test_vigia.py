@@ -0,0 +1,72 @@
+"""Testes do modo vigia (pncp_vigia)"""
+
+import pytest
+
+from pncp_erros import ErroPNCP
+from pncp_vigia import VigiaLicitacoes
+
+
+class ClientRecentes:
+    """API falsa com as licitações mais recentes primeiro"""
+
+    def __init__(self, quantidade: int):
+        self.licitacoes = [self._licitacao(i) for i in reversed(range(quantidade))]
+        self.paginas_pedidas = []
+        self.falhar = False
+
+    @staticmethod
+    def _licitacao(i):
+        return {'numero_controle_pncp': str(i), 'data_publicacao_pncp': f'2025-03-31T{i // 60:02d}:{i % 60:02d}:00'}
+
+    def publicar(self, *numeros):
+        self.licitacoes[:0] = [self._licitacao(i) for i in sorted(numeros, reverse=True)]
+
+    def buscar_licitacoes(self, pagina, tamanho_pagina, **filtros):
+        self.paginas_pedidas.append(pagina)
+        if self.falhar:
+            return {'items': [], 'total': 0, 'erro': '503 Service Unavailable'}
+        inicio = (pagina - 1) * tamanho_pagina
+        return {'items': self.licitacoes[inicio:inicio + tamanho_pagina], 'total': len(self.licitacoes)}
+
+
+def _numeros(licitacoes):
+    return [licitacao['numero_controle_pncp'] for licitacao in licitacoes]
+
+
+def test_vigia_emite_so_as_novas():
+    client = ClientRecentes(50)
+    vigia = VigiaLicitacoes(client, tamanho_pagina=10, max_paginas=5)
+
+    # A primeira consulta lê só a primeira página, que vira referência
+    assert _numeros(vigia.consultar()) == [str(i) for i in range(49, 39, -1)]
+    assert client.paginas_pedidas == [1]
+
+    client.paginas_pedidas.clear()
+    assert vigia.consultar() == []
+    assert client.paginas_pedidas == [1]
+
+    # Doze novas: a segunda página alcança as já vistas
+    client.paginas_pedidas.clear()
+    client.publicar(*range(50, 62))
+    assert _numeros(vigia.consultar()) == [str(i) for i in range(61, 49, -1)]
+    assert client.paginas_pedidas == [1, 2]
+
+
+def test_vigia_considera_a_base_local():
+    client = ClientRecentes(5)
+    vigia = VigiaLicitacoes(client, tamanho_pagina=10, ja_vistas=lambda chaves: {'4', '3'})
+    assert _numeros(vigia.consultar()) == ['2', '1', '0']
+
+
+def test_intervalo_adaptativo():
+    client = ClientRecentes(5)
+    vigia = VigiaLicitacoes(client, intervalo=10, intervalo_max=35, fator=2)
+    assert 9 <= vigia._proximo_intervalo(False) <= 22
+    vigia._proximo_intervalo(False)
+    assert vigia.intervalo == 35
+    vigia._proximo_intervalo(True)
+    assert vigia.intervalo == 10
+
+    client.falhar = True
+    with pytest.raises(ErroPNCP):
+        vigia.consultar()
@@ -0,0 +1,73 @@
+"""Testes do enriquecimento pelas páginas de detalhe (pncp_web_scraper)"""
+
+import pytest
+
+requests = pytest.importorskip('requests')
+pytest.importorskip('bs4')
+
+from pncp_web_scraper import PNCPWebScraper  # noqa: E402
+
+URL_COMPRA = '/app/editais/12345678000190/2025/7'
+
+
+class Resposta:
+    def __init__(self, conteudo: bytes):
+        self.content = conteudo
+
+    def raise_for_status(self):
+        pass
+
+
+class SessaoDetalhes:
+    def __init__(self, falhas: int = 0):
+        self.headers = {}
+        self.falhas = falhas
+        self.pedidos = 0
+
+    def get(self, url, timeout=None):
+        self.pedidos += 1
+        if self.pedidos <= self.falhas:
+            raise requests.exceptions.ConnectionError('conexão recusada')
+        return Resposta(b'detalhe')
+
+
+class AnalisadorDetalhes:
+    def __init__(self, campos):
+        self.campos = campos
+
+    def extrair_detalhes(self, conteudo):
+        return dict(self.campos)
+
+
+def _licitacao():
+    return {'title': 'Pregão 7/2025', 'item_url': URL_COMPRA, 'numero_controle_pncp': None,
+            'uf': None, 'municipio_nome': None, 'modalidade_licitacao_nome': None,
+            'situacao_nome': None, 'valor_global': None}
+
+
+def test_numero_de_controle_vem_da_pagina_de_detalhe():
+    # Sequencial com '-2-' no meio: a URL não permite deduzir o número certo
+    analisador = AnalisadorDetalhes({'numero_controle_pncp': '12345678000190-2-000007/2025', 'uf': 'PR'})
+    scraper = PNCPWebScraper(SessaoDetalhes(), analisador=analisador, compacto=False)
+
+    enriquecida = scraper.enriquecer_licitacao(_licitacao())
+    assert enriquecida['numero_controle_pncp'] == '12345678000190-2-000007/2025'
+    assert enriquecida['uf'] == 'PR'
+
+
+def test_numero_de_controle_deduzido_da_url_sem_detalhe():
+    scraper = PNCPWebScraper(SessaoDetalhes(falhas=1), analisador=AnalisadorDetalhes({}), compacto=False)
+
+    enriquecida = scraper.enriquecer_licitacao(_licitacao())
+    assert enriquecida['numero_controle_pncp'] == '12345678000190-1-000007/2025'
+
+
+def test_falha_no_detalhe_nao_fica_guardada():
+    sessao = SessaoDetalhes(falhas=1)
+    scraper = PNCPWebScraper(sessao, analisador=AnalisadorDetalhes({'uf': 'PR'}), compacto=False)
+
+    assert scraper.obter_detalhes(URL_COMPRA) == {}
+    assert scraper.obter_detalhes(URL_COMPRA) == {'uf': 'PR'}
+    # Depois do sucesso, a página não é baixada de novo
+    assert scraper.obter_detalhes(URL_COMPRA) == {'uf': 'PR'}
+    assert sessao.pedidos == 2